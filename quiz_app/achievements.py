@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+
+
+QUIZ_COMPLETED = 'quiz_completed'
+ANSWER_RECORDED = 'answer_recorded'
+DAILY_ANSWERED = 'daily_answered'
+
+# Counters copied from UserProgress into the snapshot
+PROGRESS_COUNTERS = ('total_attempts', 'questions_answered', 'correct_answers')
+
+
+@dataclass(frozen=True)
+class Rule:
+    condition: str
+    events: frozenset
+    reads: tuple
+    check: object
+
+
+RULES = {}
+
+
+def rule(condition, events, reads):
+    """Register a check for an Achievement.condition value"""
+    def decorator(check):
+        RULES[condition] = Rule(condition, frozenset(events), tuple(reads), check)
+        return check
+    return decorator
+
+
+@rule('first_quiz', events=[QUIZ_COMPLETED], reads=['total_attempts'])
+def first_quiz(stats):
+    return stats['total_attempts'] >= 1
+
+
+@rule('perfect_score', events=[QUIZ_COMPLETED], reads=['quiz_score', 'quiz_total'])
+def perfect_score(stats):
+    return stats['quiz_total'] > 0 and stats['quiz_score'] == stats['quiz_total']
+
+
+@rule('100_questions', events=[ANSWER_RECORDED], reads=['questions_answered'])
+def hundred_questions(stats):
+    return stats['questions_answered'] >= 100
+
+
+@rule('500_questions', events=[ANSWER_RECORDED], reads=['questions_answered'])
+def five_hundred_questions(stats):
+    return stats['questions_answered'] >= 500
+
+
+@rule('5_quizzes', events=[QUIZ_COMPLETED, DAILY_ANSWERED], reads=['total_attempts'])
+def five_quizzes(stats):
+    return stats['total_attempts'] >= 5
+
+
+@rule('20_quizzes', events=[QUIZ_COMPLETED, DAILY_ANSWERED], reads=['total_attempts'])
+def twenty_quizzes(stats):
+    return stats['total_attempts'] >= 20
+
+
+@rule('90_percent_accuracy', events=[ANSWER_RECORDED], reads=['questions_answered', 'correct_answers'])
+def ninety_percent_accuracy(stats):
+    if stats['questions_answered'] == 0:
+        return False
+    return stats['correct_answers'] / stats['questions_answered'] >= 0.9
+
+
+def build_snapshot(user, reads, user_progress=None, **context):
+    """Collect the counters the given rules read into a plain dict"""
+    from .models import UserProgress
+
+    snapshot = dict(context)
+    if any(counter in PROGRESS_COUNTERS for counter in reads):
+        if user_progress is not None:
+            snapshot.update({counter: getattr(user_progress, counter) for counter in PROGRESS_COUNTERS})
+        else:
+            values = UserProgress.objects.filter(user=user).values(*PROGRESS_COUNTERS).first()
+            snapshot.update(values or dict.fromkeys(PROGRESS_COUNTERS, 0))
+    return snapshot
+
+
+def evaluate(user, events, user_progress=None, **context):
+    """
+    Run the rules interested in any of `events` and unlock the achievements
+    whose conditions now hold. Costs at most three queries however many rules
+    exist: locked candidates, progress counters (skipped when the caller passes
+    `user_progress`) and one batched insert. Returns the new achievements.
+    """
+    from .models import Achievement, UserAchievement
+
+    events = set(events)
+    conditions = [r.condition for r in RULES.values() if r.events & events]
+    if not conditions:
+        return []
+
+    candidates = list(
+        Achievement.objects.filter(condition__in=conditions).exclude(userachievement__user=user)
+    )
+    if not candidates:
+        return []
+
+    reads = {counter for achievement in candidates for counter in RULES[achievement.condition].reads}
+    stats = build_snapshot(user, reads, user_progress=user_progress, **context)
+
+    unlocked = [achievement for achievement in candidates if RULES[achievement.condition].check(stats)]
+    UserAchievement.objects.bulk_create(
+        [UserAchievement(user=user, achievement=achievement) for achievement in unlocked],
+        ignore_conflicts=True,
+    )
+    return unlocked
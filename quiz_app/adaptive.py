@@ -0,0 +1,196 @@
+from threading import Lock
+
+import numpy as np
+
+from .sampling import question_index
+
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+# The user's most recent answers: excluded from the draw and used for per-difficulty accuracy
+RECENT_ANSWERS = 500
+
+# Floor added to every weakness so mastered areas still come up now and then
+BASE_WEIGHT = 0.2
+
+
+class BankArrays:
+    """
+    A question index flattened into NumPy arrays. `bucket_ids` holds the
+    IDs of each (category, difficulty) bucket, indexed by bucket code, and
+    `bucket_sizes` their lengths; `bucket_categories` and
+    `bucket_difficulties` map each code to a position in `categories` and
+    in DIFFICULTIES. `ids` is every question ID sorted, with `bucket_codes`
+    giving each one's bucket. Rebuilt whenever the index moves to a new
+    bank version.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.version = None
+        self.ids = np.empty(0, dtype=np.int64)
+        self.bucket_codes = np.empty(0, dtype=np.int32)
+        self.bucket_ids = []
+        self.bucket_sizes = np.empty(0, dtype=np.int64)
+        self.bucket_categories = np.empty(0, dtype=np.intp)
+        self.bucket_difficulties = np.empty(0, dtype=np.intp)
+        self.categories = []
+        self._lock = Lock()
+
+    def build(self):
+        """Flatten the index's buckets; a million questions take about 12 MB"""
+        buckets = self.index.buckets
+        categories = sorted({category_id for category_id, _ in buckets}, key=lambda c: (c is None, c))
+        category_position = {category_id: i for i, category_id in enumerate(categories)}
+
+        bucket_ids, codes = [], [np.empty(0, dtype=np.int32)]
+        bucket_categories, bucket_difficulties = [], []
+        for code, ((category_id, difficulty), bucket) in enumerate(buckets.items()):
+            bucket_ids.append(np.frombuffer(bucket, dtype=np.int64))
+            codes.append(np.full(len(bucket_ids[-1]), code, dtype=np.int32))
+            bucket_categories.append(category_position[category_id])
+            # Unknown difficulties are weighted as medium
+            bucket_difficulties.append(DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else 1)
+
+        ids = np.concatenate([np.empty(0, dtype=np.int64)] + bucket_ids)
+        order = np.argsort(ids, kind='stable')
+        self.ids = ids[order]
+        self.bucket_codes = np.concatenate(codes)[order]
+        self.bucket_ids = bucket_ids
+        self.bucket_sizes = np.array([len(bucket) for bucket in bucket_ids], dtype=np.int64)
+        self.bucket_categories = np.array(bucket_categories, dtype=np.intp)
+        self.bucket_difficulties = np.array(bucket_difficulties, dtype=np.intp)
+        self.categories = categories
+
+    def refresh(self):
+        """Reload the index if needed, then rebuild the arrays if it changed"""
+        self.index.refresh()
+        version = self.index.version
+        if version == self.version:
+            return self
+        with self._lock:
+            if version != self.version:
+                self.build()
+                self.version = version
+        return self
+
+    def locate(self, question_ids):
+        """The distinct `question_ids` that are in the bank, sorted, and their bucket codes"""
+        question_ids = np.unique(question_ids)
+        if not len(question_ids) or not len(self.ids):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+        # ids is sorted, so the questions are located by binary search
+        positions = np.minimum(np.searchsorted(self.ids, question_ids), len(self.ids) - 1)
+        found = self.ids[positions] == question_ids
+        return question_ids[found], self.bucket_codes[positions[found]]
+
+
+bank_arrays = BankArrays(question_index)
+
+
+def smoothed_accuracy(correct, attempted):
+    """Laplace-smoothed accuracy, so untried areas count as 50% rather than 0% or 100%"""
+    return (correct + 1.0) / (attempted + 2.0)
+
+
+def load_profile(user, categories):
+    """
+    Return the user's accuracy per category (aligned with `categories`) and
+    per difficulty as arrays, plus the IDs of their recently answered
+    questions. Costs two queries.
+    """
+    from .models import UserAnswer, UserCategoryStats
+
+    category_correct = np.zeros(len(categories))
+    category_attempted = np.zeros(len(categories))
+    position = {category_id: i for i, category_id in enumerate(categories)}
+    for category_id, attempted, correct in UserCategoryStats.objects.filter(user=user).values_list(
+        'category_id', 'attempted', 'correct'
+    ):
+        if category_id in position:
+            category_attempted[position[category_id]] = attempted
+            category_correct[position[category_id]] = correct
+
+    recent = list(
+        UserAnswer.objects.filter(user=user).order_by('-id')
+        .values_list('question_id', 'is_correct', 'question__difficulty')[:RECENT_ANSWERS]
+    )
+    difficulty_correct = np.zeros(len(DIFFICULTIES))
+    difficulty_attempted = np.zeros(len(DIFFICULTIES))
+    for question_id, is_correct, difficulty in recent:
+        if difficulty in DIFFICULTIES:
+            difficulty_attempted[DIFFICULTIES.index(difficulty)] += 1
+            difficulty_correct[DIFFICULTIES.index(difficulty)] += is_correct
+
+    return (
+        smoothed_accuracy(category_correct, category_attempted),
+        smoothed_accuracy(difficulty_correct, difficulty_attempted),
+        np.fromiter((question_id for question_id, _, _ in recent), dtype=np.int64, count=len(recent)),
+    )
+
+
+def bucket_weights(bank, category_accuracy, difficulty_accuracy):
+    """
+    The sampling weight of a question in each bucket. Weights depend only on
+    category and difficulty, so one vectorized pass over the bucket table
+    weighs the whole bank.
+    """
+    category_weight = BASE_WEIGHT + (1.0 - category_accuracy)
+    difficulty_weight = BASE_WEIGHT + (1.0 - difficulty_accuracy)
+    return category_weight[bank.bucket_categories] * difficulty_weight[bank.bucket_difficulties]
+
+
+def weighted_sample(bank, weights, excluded_ids, count, rng=None):
+    """
+    Draw up to `count` distinct questions with probability proportional to
+    their bucket's weight, never returning `excluded_ids`. Each draw picks a
+    bucket by its weight times the questions it has left; the questions are
+    then drawn uniformly without replacement within each bucket. The cost
+    depends on the number of buckets and `count`, not on the bank size.
+    """
+    rng = rng or np.random.default_rng()
+    excluded_ids, excluded_codes = bank.locate(excluded_ids)
+    skipped = np.bincount(excluded_codes, minlength=len(bank.bucket_sizes))
+    remaining = bank.bucket_sizes - skipped
+    count = min(count, int(remaining.sum()))
+    if count <= 0:
+        return []
+
+    taken = np.zeros(len(remaining), dtype=np.int64)
+    for draw in rng.random(count):
+        cdf = np.cumsum(weights * remaining)
+        code = min(int(np.searchsorted(cdf, draw * cdf[-1], side='right')), len(cdf) - 1)
+        remaining[code] -= 1
+        taken[code] += 1
+
+    excluded = set(excluded_ids.tolist())
+    picked = []
+    for code in np.flatnonzero(taken).tolist():
+        # Over-draw by the bucket's excluded questions so enough are left once they are dropped
+        bucket = bank.bucket_ids[code]
+        positions = rng.choice(len(bucket), int(taken[code] + skipped[code]), replace=False)
+        picked += [pk for pk in bucket[positions].tolist() if pk not in excluded][:int(taken[code])]
+    rng.shuffle(picked)
+    return picked
+
+
+def select_adaptive_ids(user, count, rng=None, bank=None):
+    """
+    IDs for an adaptive quiz: weighted toward the user's weak categories and
+    difficulties. Draws from the shared question bank unless `bank` is given.
+    """
+    if bank is None:
+        bank = bank_arrays.refresh()
+    category_accuracy, difficulty_accuracy, recent_ids = load_profile(user, bank.categories)
+    weights = bucket_weights(bank, category_accuracy, difficulty_accuracy)
+    ids = weighted_sample(bank, weights, recent_ids, count, rng)
+    if not ids and count > 0:
+        # Every question was answered recently: fall back to ignoring recency
+        ids = weighted_sample(bank, weights, np.empty(0, dtype=np.int64), count, rng)
+    return ids
+
+
+def adaptive_questions(user, count):
+    from .question_cache import get_questions
+
+    return get_questions(select_adaptive_ids(user, count))
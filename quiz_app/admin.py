@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Question, QuizResult, UserProgress, UserAnswer, Category, Leaderboard, Achievement, UserAchievement, DailyQuestion
+from .models import Question, QuizResult, UserProgress, UserAnswer, Category, Leaderboard, Achievement, UserAchievement, DailyQuestion, BackgroundJob, UserCategoryStats, SiteCounter, QuizAttempt
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -8,9 +8,10 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ('question_text', 'category', 'difficulty', 'correct_option', 'created_at')
+    list_display = ('question_text', 'category', 'difficulty', 'irt_difficulty', 'correct_option', 'created_at')
     list_filter = ('category', 'difficulty', 'created_at')
     search_fields = ('question_text',)
+    readonly_fields = ('irt_difficulty', 'irt_discrimination', 'irt_answers')
 
 @admin.register(QuizResult)
 class QuizResultAdmin(admin.ModelAdmin):
@@ -36,7 +37,7 @@ class UserAnswerAdmin(admin.ModelAdmin):
 
 @admin.register(Leaderboard)
 class LeaderboardAdmin(admin.ModelAdmin):
-    list_display = ('user', 'score', 'rank', 'updated_at')
+    list_display = ('user', 'score', 'updated_at')
     readonly_fields = ('updated_at',)
     ordering = ('-score', 'updated_at')
 
@@ -54,4 +55,30 @@ class UserAchievementAdmin(admin.ModelAdmin):
 @admin.register(DailyQuestion)
 class DailyQuestionAdmin(admin.ModelAdmin):
     list_display = ('date', 'question')
-    list_filter = ('date',)
\ No newline at end of file
+    list_filter = ('date',)
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('key', 'kind', 'user', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    search_fields = ('key', 'user__username')
+    readonly_fields = ('created_at', 'finished_at')
+
+@admin.register(UserCategoryStats)
+class UserCategoryStatsAdmin(admin.ModelAdmin):
+    list_display = ('user', 'category', 'attempted', 'correct', 'accuracy', 'last_answered')
+    list_filter = ('category',)
+    search_fields = ('user__username',)
+
+@admin.register(SiteCounter)
+class SiteCounterAdmin(admin.ModelAdmin):
+    list_display = ('name', 'value', 'updated_at')
+    readonly_fields = ('updated_at',)
+
+@admin.register(QuizAttempt)
+class QuizAttemptAdmin(admin.ModelAdmin):
+    list_display = ('token', 'user', 'quiz_type', 'status', 'started_at', 'quiz_result')
+    list_filter = ('quiz_type', 'status')
+    search_fields = ('token', 'user__username')
+    readonly_fields = ('token', 'started_at')
+    exclude = ('question_ids',)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class QuizAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quiz_app'
+
+    def ready(self):
+        # Register background job handlers
+        from . import tasks  # noqa: F401
@@ -0,0 +1,106 @@
+import secrets
+from array import array
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+
+def new_attempt_token():
+    return secrets.token_hex(16)
+
+
+def pack_ids(ids):
+    return array('q', ids).tobytes()
+
+
+def unpack_ids(data):
+    ids = array('q')
+    ids.frombytes(bytes(data))
+    return ids.tolist()
+
+
+def attempt_ttl():
+    """How long an unsubmitted attempt stays valid, in seconds"""
+    return getattr(settings, 'QUIZ_ATTEMPT_TTL', 6 * 60 * 60)
+
+
+def _cache_key(token):
+    return f'quiz_app:attempt:{token}'
+
+
+def _cache(attempt):
+    cache.set(_cache_key(attempt.token), (
+        attempt.pk, attempt.user_id, attempt.quiz_type, bytes(attempt.question_ids), attempt.started_at,
+    ), attempt_ttl())
+
+
+def start_attempt(user, quiz_type, question_ids):
+    """Record a new attempt with one INSERT and cache it for the submission"""
+    from .models import QuizAttempt
+
+    attempt = QuizAttempt.objects.create(user=user, quiz_type=quiz_type, question_ids=pack_ids(question_ids))
+    transaction.on_commit(lambda: _cache(attempt))
+    return attempt
+
+
+def get_active_attempt(token, user):
+    """
+    Return the user's active, unexpired attempt for `token`, or None. Served
+    from the cache while the attempt is active, from the database otherwise.
+    """
+    from .models import QuizAttempt
+
+    if not token:
+        return None
+    cached = cache.get(_cache_key(token))
+    if cached is not None:
+        pk, user_id, quiz_type, question_ids, started_at = cached
+        attempt = QuizAttempt(
+            pk=pk, token=token, user_id=user_id, quiz_type=quiz_type,
+            question_ids=question_ids, started_at=started_at, status='active',
+        )
+    else:
+        attempt = QuizAttempt.objects.filter(token=token, status='active').first()
+        if attempt is None:
+            return None
+        _cache(attempt)
+
+    if attempt.user_id != user.pk or attempt.started_at < timezone.now() - timedelta(seconds=attempt_ttl()):
+        return None
+    return attempt
+
+
+def claim_attempt(attempt):
+    """
+    Mark an active attempt submitted. Returns False when another request
+    already claimed it, so a double-posted form is graded only once. Call
+    inside the transaction that records the result.
+    """
+    from .models import QuizAttempt
+
+    claimed = QuizAttempt.objects.filter(pk=attempt.pk, status='active').update(status='submitted')
+    transaction.on_commit(lambda: cache.delete(_cache_key(attempt.token)))
+    return bool(claimed)
+
+
+def attach_result(attempt, quiz_result):
+    from .models import QuizAttempt
+
+    QuizAttempt.objects.filter(pk=attempt.pk).update(quiz_result=quiz_result)
+
+
+def purge_stale_attempts(batch_size=1000):
+    """Delete active attempts older than the TTL; returns how many were removed"""
+    from .models import QuizAttempt
+
+    cutoff = timezone.now() - timedelta(seconds=attempt_ttl())
+    stale = QuizAttempt.objects.filter(status='active', started_at__lt=cutoff)
+    removed = 0
+    while True:
+        ids = list(stale.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return removed
+        removed += QuizAttempt.objects.filter(id__in=ids).delete()[0]
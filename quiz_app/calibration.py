@@ -0,0 +1,241 @@
+import os
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .sampling import bump_bank_version
+
+
+# Answers read per keyset page; each page is one vectorized update
+CHUNK_SIZE = 50000
+
+# Step size for the per-chunk gradient updates
+LEARNING_RATE = 0.5
+
+# Discrimination is kept in a sane range so a few answers cannot blow it up
+MIN_DISCRIMINATION = 0.25
+MAX_DISCRIMINATION = 4.0
+
+# Relabeling only trusts questions with at least this many answers
+RELABEL_MIN_ANSWERS = 30
+
+# Calibrated difficulty below EASY_BELOW is 'easy', above HARD_ABOVE is 'hard'
+EASY_BELOW = -0.5
+HARD_ABOVE = 0.5
+
+
+def checkpoint_path():
+    return getattr(settings, 'QUIZ_CALIBRATION_CHECKPOINT', os.path.join(settings.BASE_DIR, 'calibration.npz'))
+
+
+def _grow(values, size, fill):
+    if size <= len(values):
+        return values
+    grown = np.full(max(size, len(values) * 2), fill, dtype=values.dtype)
+    grown[:len(values)] = values
+    return grown
+
+
+class ItemCalibrator:
+    """
+    Online two-parameter logistic (2PL) IRT model: P(correct) is
+    sigmoid(a * (ability - b)) with a per-question difficulty `b` and
+    discrimination `a`, and a per-user ability. Parameters live in dense
+    arrays indexed by primary key, so memory grows with the number of users
+    and questions, never with the number of answers. With `rasch` the
+    discrimination stays fixed at 1.
+    """
+
+    def __init__(self, rasch=False):
+        self.rasch = rasch
+        self.last_answer_id = 0
+        self.ability = np.zeros(0)
+        self.difficulty = np.zeros(0)
+        self.discrimination = np.ones(0)
+        self.answers = np.zeros(0, dtype=np.int64)
+
+    def update(self, user_ids, question_ids, correct, learning_rate=LEARNING_RATE):
+        """
+        One gradient step on the log posterior for a chunk of answers. Each
+        parameter's step is averaged over its answers in the chunk, and a
+        standard normal prior (log-normal for discrimination) keeps sparse
+        parameters near zero. Returns the IDs of the questions touched.
+        """
+        self.ability = _grow(self.ability, int(user_ids.max()) + 1, 0.0)
+        self.difficulty = _grow(self.difficulty, int(question_ids.max()) + 1, 0.0)
+        self.discrimination = _grow(self.discrimination, len(self.difficulty), 1.0)
+        self.answers = _grow(self.answers, len(self.difficulty), 0)
+
+        users, user_index = np.unique(user_ids, return_inverse=True)
+        questions, question_index = np.unique(question_ids, return_inverse=True)
+        a = self.discrimination[question_ids]
+        gap = self.ability[user_ids] - self.difficulty[question_ids]
+        residual = correct - 1.0 / (1.0 + np.exp(-a * gap))
+
+        user_counts = np.bincount(user_index)
+        question_counts = np.bincount(question_index)
+        ability_step = np.bincount(user_index, a * residual) - self.ability[users]
+        difficulty_step = -np.bincount(question_index, a * residual) - self.difficulty[questions]
+
+        self.ability[users] += learning_rate * ability_step / (user_counts + 1)
+        self.difficulty[questions] += learning_rate * difficulty_step / (question_counts + 1)
+        if not self.rasch:
+            discrimination_step = np.bincount(question_index, gap * residual) - (self.discrimination[questions] - 1.0)
+            self.discrimination[questions] = np.clip(
+                self.discrimination[questions] + learning_rate * discrimination_step / (question_counts + 1),
+                MIN_DISCRIMINATION, MAX_DISCRIMINATION,
+            )
+        self.answers[questions] += question_counts
+        return questions
+
+    def save(self, path):
+        """Write the checkpoint atomically, so an interrupted run leaves the previous one intact"""
+        temporary = f'{path}.tmp.npz'
+        np.savez(
+            temporary, last_answer_id=self.last_answer_id, rasch=self.rasch, ability=self.ability,
+            difficulty=self.difficulty, discrimination=self.discrimination, answers=self.answers,
+        )
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        """The checkpointed calibrator, or None when there is no checkpoint"""
+        try:
+            data = np.load(path)
+        except FileNotFoundError:
+            return None
+        with data:
+            calibrator = cls(rasch=bool(data['rasch']))
+            calibrator.last_answer_id = int(data['last_answer_id'])
+            calibrator.ability = data['ability']
+            calibrator.difficulty = data['difficulty']
+            calibrator.discrimination = data['discrimination']
+            calibrator.answers = data['answers']
+        return calibrator
+
+
+def iter_answer_chunks(after_id, up_to_id, chunk_size=CHUNK_SIZE):
+    """
+    Yield (last ID, user IDs, question IDs, correctness) arrays for answers
+    in (after_id, up_to_id], paging by primary key. Keyset pages keep memory
+    bounded on backends that cannot stream a result set, such as MySQL.
+    """
+    from .models import UserAnswer
+
+    cursor = after_id
+    while cursor < up_to_id:
+        rows = list(
+            UserAnswer.objects.filter(id__gt=cursor, id__lte=up_to_id).order_by('id')
+            .values_list('id', 'user_id', 'question_id', 'is_correct')[:chunk_size]
+        )
+        if not rows:
+            return
+        chunk = np.array(rows, dtype=np.int64)
+        cursor = int(chunk[-1, 0])
+        yield cursor, chunk[:, 1], chunk[:, 2], chunk[:, 3].astype(float)
+
+
+def difficulty_label(difficulty):
+    if difficulty < EASY_BELOW:
+        return 'easy'
+    if difficulty > HARD_ABOVE:
+        return 'hard'
+    return 'medium'
+
+
+def write_question_parameters(calibrator, question_ids, relabel=False, batch_size=1000):
+    """
+    bulk_update the calibrated parameters of the given questions. With
+    `relabel`, questions with enough answers also get their easy/medium/hard
+    label from the calibrated difficulty.
+    """
+    from .models import Question
+
+    fields = ['irt_difficulty', 'irt_discrimination', 'irt_answers']
+    updated = 0
+    with transaction.atomic():
+        for start in range(0, len(question_ids), batch_size):
+            questions = [
+                Question(
+                    id=pk,
+                    irt_difficulty=round(float(calibrator.difficulty[pk]), 4),
+                    irt_discrimination=round(float(calibrator.discrimination[pk]), 4),
+                    irt_answers=int(calibrator.answers[pk]),
+                )
+                for pk in question_ids[start:start + batch_size]
+            ]
+            trusted, rest = [], []
+            for question in questions:
+                if relabel and question.irt_answers >= RELABEL_MIN_ANSWERS:
+                    question.difficulty = difficulty_label(question.irt_difficulty)
+                    trusted.append(question)
+                else:
+                    rest.append(question)
+            updated += Question.objects.bulk_update(trusted, fields + ['difficulty'])
+            updated += Question.objects.bulk_update(rest, fields)
+        if relabel and updated:
+            # bulk_update sends no signals; labels feed the question index buckets
+            transaction.on_commit(bump_bank_version)
+    return updated
+
+
+def calibrate_questions(full=False, epochs=1, rasch=False, relabel=False, chunk_size=CHUNK_SIZE,
+                        checkpoint_every=20, path=None, log=None):
+    """
+    Fit question difficulty and discrimination from the answer history.
+    Incremental by default: only answers after the checkpoint are read and
+    the checkpointed parameters are updated from there. `full` starts over
+    and may take several `epochs` over the history. Every `checkpoint_every`
+    chunks of the last pass the touched questions are written and the
+    checkpoint saved, so an interrupted run resumes where it stopped.
+    Returns the number of answers read and of questions calibrated.
+    """
+    from .models import UserAnswer
+
+    path = path or checkpoint_path()
+    calibrator = None if full else ItemCalibrator.load(path)
+    if calibrator is None or calibrator.rasch != rasch:
+        calibrator = ItemCalibrator(rasch=rasch)
+        epochs = max(1, epochs)
+    else:
+        epochs = 1
+
+    # Answers arriving during the run wait for the next one
+    up_to_id = UserAnswer.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    start_id = calibrator.last_answer_id
+    # Questions updated since the last checkpoint, and over the whole run
+    pending = np.zeros(0, dtype=bool)
+    calibrated = set()
+    read = 0
+
+    def checkpoint():
+        nonlocal pending
+        question_ids = np.flatnonzero(pending).tolist()
+        write_question_parameters(calibrator, question_ids, relabel=relabel)
+        calibrated.update(question_ids)
+        pending = np.zeros(0, dtype=bool)
+        calibrator.save(path)
+
+    for epoch in range(epochs):
+        final = epoch == epochs - 1
+        if epoch:
+            # Each pass recounts the answers from scratch
+            calibrator.answers[:] = 0
+        for chunks, (cursor, user_ids, question_ids, correct) in enumerate(
+            iter_answer_chunks(start_id, up_to_id, chunk_size), start=1
+        ):
+            questions = calibrator.update(user_ids, question_ids, correct)
+            pending = _grow(pending, len(calibrator.difficulty), False)
+            pending[questions] = True
+            read += len(correct)
+            if final:
+                calibrator.last_answer_id = cursor
+                if chunks % checkpoint_every == 0:
+                    checkpoint()
+                    if log:
+                        log(f"Checkpointed at answer {cursor} ({read} answers read)")
+
+    calibrator.last_answer_id = max(calibrator.last_answer_id, up_to_id)
+    checkpoint()
+    return read, len(calibrated)
@@ -0,0 +1,67 @@
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+
+CACHE_KEY = 'quiz_app:site_counters'
+CACHE_TTL = 30
+
+# Counter name -> model label it counts
+COUNTED_MODELS = {
+    'questions': 'quiz_app.Question',
+    'users': 'auth.User',
+    'quizzes': 'quiz_app.QuizResult',
+}
+COUNTER_FOR_MODEL = {label: name for name, label in COUNTED_MODELS.items()}
+
+
+def increment(name, amount=1):
+    """
+    Add `amount` to a counter with a single UPDATE once the surrounding
+    transaction commits. Every write of a counted model funnels into one
+    hot row, so updating it inside the request's transaction would hold
+    that row's lock until commit and serialize the requests; deferred, the
+    lock lasts one statement. A crash between commit and the UPDATE leaves
+    drift for reconcile to fix. Readers see the change once the cached
+    totals expire. Bulk paths that bypass model signals (bulk_create,
+    queryset.delete) must call this themselves.
+    """
+    transaction.on_commit(lambda: _apply(name, amount))
+
+
+def _apply(name, amount):
+    from .models import SiteCounter
+
+    if not SiteCounter.objects.filter(name=name).update(value=F('value') + amount):
+        SiteCounter.objects.get_or_create(name=name)
+        SiteCounter.objects.filter(name=name).update(value=F('value') + amount)
+
+
+def get_counters():
+    """Return {name: value} for every counter, served from a short-TTL cache"""
+    from .models import SiteCounter
+
+    values = cache.get(CACHE_KEY)
+    if values is None:
+        values = dict.fromkeys(COUNTED_MODELS, 0)
+        values.update(SiteCounter.objects.filter(name__in=COUNTED_MODELS).values_list('name', 'value'))
+        cache.set(CACHE_KEY, values, CACHE_TTL)
+    return values
+
+
+def reconcile():
+    """Recount every counted table and fix drift. Returns {name: (old, new)} for changed counters."""
+    from .models import SiteCounter
+
+    drift = {}
+    for name, label in COUNTED_MODELS.items():
+        actual = apps.get_model(label).objects.count()
+        with transaction.atomic():
+            counter, created = SiteCounter.objects.select_for_update().get_or_create(name=name)
+            if counter.value != actual:
+                drift[name] = (counter.value, actual)
+                counter.value = actual
+                counter.save(update_fields=['value', 'updated_at'])
+    cache.delete(CACHE_KEY)
+    return drift
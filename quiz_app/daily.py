@@ -0,0 +1,133 @@
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .sampling import question_index
+
+
+DIFFICULTY_ROTATION = ('easy', 'medium', 'hard')
+
+# A question is not reused as the daily question within this many days
+REPEAT_WINDOW_DAYS = 90
+
+# How far ahead schedule_daily_questions fills by default
+SCHEDULE_AHEAD_DAYS = 14
+
+# Candidates drawn from a rotation bucket before relaxing it
+CANDIDATES = 25
+
+# Cached "no question for this day", distinct from a cache miss
+NO_QUESTION = 0
+
+
+def _cache_key(day):
+    return f'quiz_app:daily_question:{day.isoformat()}'
+
+
+def _seconds_left(day):
+    """Cache lifetime: until an hour past the end of `day`, so the entry expires on its own"""
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min)) + timedelta(hours=1)
+    return max(60, int((end - timezone.now()).total_seconds()))
+
+
+def invalidate(day):
+    transaction.on_commit(lambda: cache.delete(_cache_key(day)))
+
+
+def get_daily_question_id(day=None):
+    """
+    Return the question ID scheduled for `day` (default today), or None.
+    Served from a per-day cache entry, so steady-state lookups cost no
+    queries. A day the scheduler has not reached is filled on demand.
+    """
+    from .models import DailyQuestion
+
+    day = day or timezone.now().date()
+    question_id = cache.get(_cache_key(day))
+    if question_id is None:
+        question_id = DailyQuestion.objects.filter(date=day).values_list('question_id', flat=True).first()
+        if question_id is None:
+            schedule_daily_questions(start=day, days=1)
+            question_id = DailyQuestion.objects.filter(date=day).values_list('question_id', flat=True).first()
+        question_id = question_id or NO_QUESTION
+        # An empty bank is only cached briefly so new questions show up soon
+        cache.set(_cache_key(day), question_id, _seconds_left(day) if question_id else 60)
+    return question_id or None
+
+
+def get_daily_question(day=None):
+    """The cached question payload for `day`, or None when there is none"""
+    from .question_cache import get_questions
+
+    question_id = get_daily_question_id(day)
+    questions = get_questions([question_id]) if question_id else []
+    return questions[0] if questions else None
+
+
+def rotation_for(day, category_ids):
+    """The (category_id, difficulty) slot a day draws from; stable for a given category list"""
+    ordinal = day.toordinal()
+    category_id = category_ids[ordinal % len(category_ids)] if category_ids else None
+    return category_id, DIFFICULTY_ROTATION[ordinal % len(DIFFICULTY_ROTATION)]
+
+
+def pick_question(category_id, difficulty, excluded):
+    """
+    Draw a question for a rotation slot from the in-memory ID index, relaxing
+    the slot (category, then difficulty) when it has nothing left to offer
+    outside `excluded`. Returns None for an empty question bank.
+    """
+    attempts = [
+        ({category_id} if category_id else None, difficulty),
+        ({category_id} if category_id else None, None),
+        (None, difficulty),
+        (None, None),
+    ]
+    for categories, wanted in attempts:
+        for pk in question_index.sample_ids(CANDIDATES, categories=categories, difficulty=wanted):
+            if pk not in excluded:
+                return pk
+    # Everything drawn was recent: repeat rather than leave the day empty
+    fallback = question_index.sample_ids(1)
+    return fallback[0] if fallback else None
+
+
+def schedule_daily_questions(start=None, days=SCHEDULE_AHEAD_DAYS, window=REPEAT_WINDOW_DAYS):
+    """
+    Fill DailyQuestion for `days` days from `start` (default today), leaving
+    already scheduled days alone. Days rotate through categories and
+    difficulties, and no question repeats within `window` days. Returns the
+    created rows.
+    """
+    from .models import Category, DailyQuestion
+
+    start = start or timezone.now().date()
+    end = start + timedelta(days=days)
+    scheduled = dict(
+        DailyQuestion.objects.filter(date__gte=start - timedelta(days=window), date__lt=end + timedelta(days=window))
+        .values_list('date', 'question_id')
+    )
+    category_ids = list(Category.objects.order_by('id').values_list('id', flat=True))
+
+    created = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        if day in scheduled:
+            continue
+        recent = {
+            question_id for other, question_id in scheduled.items()
+            if abs((other - day).days) < window
+        }
+        question_id = pick_question(*rotation_for(day, category_ids), recent)
+        if question_id is None:
+            break
+        scheduled[day] = question_id
+        created.append(DailyQuestion(date=day, question_id=question_id))
+
+    # ignore_conflicts: a concurrent run or on-demand fill may have taken a day
+    DailyQuestion.objects.bulk_create(created, ignore_conflicts=True)
+    for row in created:
+        invalidate(row.date)
+    return created
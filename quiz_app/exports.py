@@ -0,0 +1,112 @@
+import csv
+
+from django.db.models import Exists, OuterRef
+
+
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() hands the formatted CSV line back"""
+
+    def write(self, value):
+        return value
+
+
+def iter_values(queryset, fields, chunk_size=CHUNK_SIZE, descending=False):
+    """
+    Yield `values_list` rows in primary-key order, one keyset-paginated chunk
+    at a time. Unlike a single cursor this stays in constant memory on MySQL,
+    whose drivers buffer a whole result set client-side.
+    """
+    order = '-pk' if descending else 'pk'
+    last_pk = None
+    while True:
+        chunk = queryset.order_by(order)
+        if last_pk is not None:
+            chunk = chunk.filter(pk__lt=last_pk) if descending else chunk.filter(pk__gt=last_pk)
+        rows = list(chunk.values_list('pk', *fields)[:chunk_size])
+        if not rows:
+            return
+        for row in rows:
+            yield row[1:]
+        last_pk = rows[-1][0]
+
+
+def stream_csv(header, rows, rows_per_write=500):
+    """Yield CSV text for `header` and `rows`, a few hundred lines per chunk"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow(row))
+        if len(buffer) >= rows_per_write:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def result_rows(results, include_username=False):
+    from .models import QuizResult
+
+    quiz_types = dict(QuizResult._meta.get_field('quiz_type').choices)
+    fields = ['completed_at', 'score', 'total_questions', 'time_taken', 'quiz_type']
+    if include_username:
+        fields.insert(0, 'user__username')
+    for row in iter_values(results, fields, descending=True):
+        if include_username:
+            username, row = row[0], row[1:]
+        completed_at, score, total_questions, time_taken, quiz_type = row
+        percentage = round((score / total_questions) * 100, 2) if total_questions else 0
+        line = [
+            completed_at.strftime('%Y-%m-%d %H:%M'),
+            score,
+            total_questions,
+            f"{percentage}%",
+            f"{time_taken}s",
+            quiz_types.get(quiz_type, quiz_type),
+        ]
+        yield [username] + line if include_username else line
+
+
+def answer_rows(answers):
+    fields = [
+        'user__username', 'answered_at', 'quiz_result_id', 'question_id',
+        'question__category__name', 'selected_option', 'is_correct',
+    ]
+    for username, answered_at, quiz_result_id, question_id, category, selected_option, is_correct in iter_values(answers, fields):
+        yield [
+            username,
+            answered_at.strftime('%Y-%m-%d %H:%M:%S'),
+            quiz_result_id or '',
+            question_id,
+            category or '',
+            selected_option,
+            'yes' if is_correct else 'no',
+        ]
+
+
+def filter_results(results, start=None, end=None, category_id=None):
+    """Restrict results to a completed_at range and to attempts touching a category"""
+    from .models import UserAnswer
+
+    if start:
+        results = results.filter(completed_at__gte=start)
+    if end:
+        results = results.filter(completed_at__lt=end)
+    if category_id:
+        results = results.filter(Exists(UserAnswer.objects.filter(
+            quiz_result=OuterRef('pk'), question__category_id=category_id
+        )))
+    return results
+
+
+def filter_answers(answers, start=None, end=None, category_id=None):
+    if start:
+        answers = answers.filter(answered_at__gte=start)
+    if end:
+        answers = answers.filter(answered_at__lt=end)
+    if category_id:
+        answers = answers.filter(question__category_id=category_id)
+    return answers
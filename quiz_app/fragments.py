@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .sampling import get_bank_version
+
+
+OPTIONS_TEMPLATE = 'partials/quiz_question_options.html'
+FRAGMENT_TTL = 60 * 60 * 24
+
+# Bump when the fragment markup changes, so old renders are never served
+MARKUP_VERSION = 1
+
+
+def fragment_key(version, question_id):
+    return f'quiz_app:fragment:question:{MARKUP_VERSION}:{version}:{question_id}'
+
+
+def question_fragments(questions):
+    """
+    The rendered options block of each question, in order. Fragments are
+    keyed by question ID and bank version, so an edited question renders
+    afresh; one get_many serves the cached ones and one set_many stores the
+    rest.
+    """
+    version = get_bank_version()
+    keys = [fragment_key(version, question.id) for question in questions]
+    fragments = cache.get_many(keys)
+    missing = {
+        key: render_to_string(OPTIONS_TEMPLATE, {'question': question})
+        for key, question in zip(keys, questions)
+        if key not in fragments
+    }
+    if missing:
+        cache.set_many(missing, FRAGMENT_TTL)
+        fragments.update(missing)
+    return [mark_safe(fragments[key]) for key in keys]
+
+
+def quiz_items(questions):
+    """(question, options HTML) pairs for the quiz template"""
+    return list(zip(questions, question_fragments(questions)))
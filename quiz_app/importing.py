@@ -0,0 +1,207 @@
+import csv
+import hashlib
+import json
+import time
+
+from django.db import transaction
+
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+OPTION_LETTERS = {'a': 1, 'b': 2, 'c': 3, 'd': 4}
+OPTION_MAX_LENGTH = 200
+
+
+def question_content_hash(question_text, option1, option2, option3, option4):
+    """Hash of the question text and options, ignoring case and whitespace differences"""
+    parts = [' '.join(str(part or '').split()).casefold() for part in (question_text, option1, option2, option3, option4)]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+class InvalidRow(ValueError):
+    pass
+
+
+def read_rows(path, file_format):
+    """Yield (record_number, dict) pairs from a CSV or JSONL file without loading it"""
+    with open(path, newline='', encoding='utf-8') as handle:
+        if file_format == 'csv':
+            for number, row in enumerate(csv.DictReader(handle), start=1):
+                yield number, row
+        else:
+            for number, line in enumerate(handle, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield number, json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield number, InvalidRow(f"invalid JSON: {exc.msg}")
+
+
+def clean_row(row, category_ids):
+    """Validate a raw row and return Question field values, or raise InvalidRow"""
+    if isinstance(row, InvalidRow):
+        raise row
+    if not isinstance(row, dict):
+        # Valid JSON, but an array, string or number rather than an object
+        raise InvalidRow(f"expected an object, got {type(row).__name__}")
+
+    values = {}
+    text = str(row.get('question_text') or '').strip()
+    if not text:
+        raise InvalidRow("question_text is required")
+    values['question_text'] = text
+
+    for number in range(1, 5):
+        option = str(row.get(f'option{number}') or '').strip()
+        if not option:
+            raise InvalidRow(f"option{number} is required")
+        if len(option) > OPTION_MAX_LENGTH:
+            raise InvalidRow(f"option{number} is longer than {OPTION_MAX_LENGTH} characters")
+        values[f'option{number}'] = option
+
+    correct = str(row.get('correct_option') or '').strip().lower()
+    correct = OPTION_LETTERS.get(correct, correct)
+    try:
+        correct = int(correct)
+    except ValueError:
+        correct = None
+    if correct not in (1, 2, 3, 4):
+        raise InvalidRow("correct_option must be 1-4 or A-D")
+    values['correct_option'] = correct
+
+    difficulty = str(row.get('difficulty') or 'medium').strip().lower()
+    if difficulty not in DIFFICULTIES:
+        raise InvalidRow(f"difficulty must be one of {', '.join(DIFFICULTIES)}")
+    values['difficulty'] = difficulty
+
+    category = str(row.get('category') or '').strip()
+    if category:
+        category_id = category_ids.get(category.casefold())
+        if category_id is None:
+            raise InvalidRow(f"unknown category '{category}'")
+        values['category_id'] = category_id
+    else:
+        values['category_id'] = None
+
+    values['explanation'] = str(row.get('explanation') or '').strip()
+    values['content_hash'] = question_content_hash(
+        text, values['option1'], values['option2'], values['option3'], values['option4']
+    )
+    return values
+
+
+class QuestionImporter:
+    """
+    Streams question rows into the database in batched bulk_create calls.
+
+    Each batch is deduplicated against itself and against stored content
+    hashes, inserted in its own transaction, and followed by a checkpoint
+    write so an interrupted import can resume after the last committed batch.
+    """
+
+    def __init__(self, batch_size=5000, dry_run=False, create_categories=False,
+                 checkpoint_path=None, on_progress=None, on_invalid=None):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.create_categories = create_categories
+        self.checkpoint_path = checkpoint_path
+        self.on_progress = on_progress
+        self.on_invalid = on_invalid
+        self.stats = {'read': 0, 'inserted': 0, 'duplicates': 0, 'invalid': 0, 'skipped': 0}
+        self.started = None
+        # Cross-batch duplicates in dry runs, where nothing reaches the database
+        self._dry_run_seen = set()
+
+    def load_categories(self):
+        from .models import Category
+
+        return {name.casefold(): pk for pk, name in Category.objects.values_list('id', 'name')}
+
+    def read_checkpoint(self, path):
+        if not self.checkpoint_path:
+            return 0
+        try:
+            with open(self.checkpoint_path) as handle:
+                checkpoint = json.load(handle)
+        except FileNotFoundError:
+            return 0
+        return checkpoint.get('record', 0) if checkpoint.get('path') == str(path) else 0
+
+    def write_checkpoint(self, path, record):
+        if not self.checkpoint_path or self.dry_run:
+            return
+        with open(self.checkpoint_path, 'w') as handle:
+            json.dump({'path': str(path), 'record': record, 'stats': self.stats}, handle)
+
+    def run(self, path, file_format, resume=False):
+        from .models import Category
+
+        self.started = time.monotonic()
+        category_ids = self.load_categories()
+        resume_after = self.read_checkpoint(path) if resume else 0
+
+        batch = []
+        last_record = resume_after
+        for number, row in read_rows(path, file_format):
+            if number <= resume_after:
+                self.stats['skipped'] += 1
+                continue
+            self.stats['read'] += 1
+            last_record = number
+
+            if self.create_categories and isinstance(row, dict):
+                name = str(row.get('category') or '').strip()
+                if name and name.casefold() not in category_ids and not self.dry_run:
+                    category_ids[name.casefold()] = Category.objects.get_or_create(name=name)[0].id
+                elif name and name.casefold() not in category_ids:
+                    category_ids[name.casefold()] = -1
+
+            try:
+                batch.append(clean_row(row, category_ids))
+            except InvalidRow as exc:
+                self.stats['invalid'] += 1
+                if self.on_invalid:
+                    self.on_invalid(number, str(exc))
+
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                self.write_checkpoint(path, last_record)
+                batch = []
+
+        self.flush(batch)
+        self.write_checkpoint(path, last_record)
+        return self.stats
+
+    def flush(self, batch):
+        from . import counters
+        from .models import Question
+        from .sampling import bump_bank_version
+
+        if not batch:
+            return
+
+        unique = {}
+        for values in batch:
+            unique.setdefault(values['content_hash'], values)
+        existing = set(Question.objects.filter(content_hash__in=list(unique)).values_list('content_hash', flat=True))
+        if self.dry_run:
+            existing |= self._dry_run_seen & unique.keys()
+            self._dry_run_seen.update(unique)
+        new_rows = [values for content_hash, values in unique.items() if content_hash not in existing]
+        self.stats['duplicates'] += len(batch) - len(new_rows)
+
+        if not self.dry_run and new_rows:
+            with transaction.atomic():
+                Question.objects.bulk_create([Question(**values) for values in new_rows], batch_size=1000)
+                # bulk_create skips signals, so update what they would have
+                counters.increment('questions', len(new_rows))
+                transaction.on_commit(bump_bank_version)
+        self.stats['inserted'] += len(new_rows)
+
+        if self.on_progress:
+            self.on_progress(self.stats, self.rows_per_second())
+
+    def rows_per_second(self):
+        elapsed = time.monotonic() - self.started
+        return self.stats['read'] / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,218 @@
+import logging
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+from threading import Lock
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+# Pending jobs this old were never picked up, e.g. their process died before dispatching them
+STALE_AFTER = timedelta(minutes=1)
+
+# A running job whose claim is older than this is assumed orphaned by a dead worker
+LEASE = timedelta(minutes=5)
+
+# Deadlocks and lock wait timeouts are retried this many times, with exponential backoff
+TRANSIENT_RETRIES = 3
+RETRY_BACKOFF = 0.1
+
+_NONCE = uuid.uuid4().hex[:8]
+
+
+def worker_id():
+    """Owner recorded on claimed jobs; computed per call so forked workers differ"""
+    return f'{socket.gethostname()}:{os.getpid()}:{_NONCE}'
+
+
+def register(kind):
+    """Register a function as the handler for a job kind"""
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+class JobRunner:
+    """
+    Runs background jobs on a fixed set of single-threaded lanes.
+
+    Every job for a given user goes to the same lane, so a user's jobs run
+    one at a time and in the order they were enqueued.
+    """
+
+    def __init__(self):
+        self._lanes = None
+        self._futures = {}
+        self._lock = Lock()
+        self._recovered = False
+
+    @property
+    def eager(self):
+        return getattr(settings, 'QUIZ_JOBS_EAGER', False)
+
+    def _lane(self, user_id):
+        with self._lock:
+            if self._lanes is None:
+                count = getattr(settings, 'QUIZ_JOBS_WORKERS', 4)
+                self._lanes = [
+                    ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'quiz-jobs-{i}')
+                    for i in range(count)
+                ]
+            return self._lanes[user_id % len(self._lanes)]
+
+    def dispatch(self, job_id, key, user_id):
+        if self.eager:
+            run_job(job_id)
+            return
+        self.recover()
+        future = self._lane(user_id).submit(self._run_in_thread, job_id)
+        with self._lock:
+            self._futures[key] = future
+        future.add_done_callback(lambda f: self._forget(key, f))
+
+    def _run_in_thread(self, job_id):
+        close_old_connections()
+        try:
+            run_job(job_id)
+        finally:
+            close_old_connections()
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+
+    def recover(self):
+        """Re-dispatch jobs orphaned by a dead process, once per process"""
+        with self._lock:
+            if self._recovered:
+                return
+            self._recovered = True
+        for job_id, key, user_id in requeue_orphaned():
+            self.dispatch(job_id, key, user_id)
+
+    def flush(self, timeout=None):
+        """Block until every job dispatched by this process has finished"""
+        with self._lock:
+            futures = list(self._futures.values())
+        wait(futures, timeout=timeout)
+
+
+runner = JobRunner()
+
+
+def enqueue(kind, user, key, payload):
+    """
+    Record a job and dispatch it once the surrounding transaction commits.
+    Enqueueing an existing key is a no-op, so retried requests are safe.
+    """
+    from .models import BackgroundJob
+
+    job, created = BackgroundJob.objects.get_or_create(
+        key=key,
+        defaults={'kind': kind, 'user': user, 'payload': payload},
+    )
+    if created:
+        transaction.on_commit(lambda: runner.dispatch(job.id, key, user.id))
+    return job
+
+
+def requeue_orphaned(now=None):
+    """
+    Put running jobs whose lease expired back to pending and return
+    (id, key, user_id) for them and for pending jobs older than STALE_AFTER.
+    Jobs with a live lease are left alone, and rows a running handler has
+    locked are skipped rather than waited for.
+    """
+    from .models import BackgroundJob
+
+    now = now or timezone.now()
+    with transaction.atomic():
+        expired = list(
+            BackgroundJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(locked_at__lt=now - LEASE) | Q(locked_at=None), status='running')
+            .values_list('id', flat=True)
+        )
+        BackgroundJob.objects.filter(id__in=expired, status='running').update(status='pending', locked_at=None)
+    return list(
+        BackgroundJob.objects.filter(status='pending')
+        .filter(Q(id__in=expired) | Q(created_at__lt=now - STALE_AFTER))
+        .order_by('id').values_list('id', 'key', 'user_id')
+    )
+
+
+def claim_job(job_id, owner):
+    """Mark a pending job running under `owner`; returns the job, or None if someone else has it"""
+    from .models import BackgroundJob
+
+    claimed = BackgroundJob.objects.filter(id=job_id, status='pending').update(
+        status='running', attempts=F('attempts') + 1, locked_by=owner, locked_at=timezone.now()
+    )
+    if not claimed:
+        return None
+    return BackgroundJob.objects.select_related('user').get(id=job_id)
+
+
+def execute_job(job, owner):
+    """
+    Run a claimed job's handler and store the outcome. The handler's writes
+    and the 'done' status commit in one transaction, which first locks the
+    job row and checks `owner` still holds it: a job whose lease expired and
+    was run by another worker is not applied a second time. Deadlocks and
+    lock wait timeouts (OperationalError on every backend) are retried.
+    Returns whether the handler ran, successfully or not.
+    """
+    from .models import BackgroundJob
+
+    for attempt in range(TRANSIENT_RETRIES + 1):
+        try:
+            with transaction.atomic():
+                owned = BackgroundJob.objects.select_for_update().filter(id=job.id, status='running', locked_by=owner)
+                if not list(owned.values_list('id', flat=True)):
+                    return False
+                result = HANDLERS[job.kind](job)
+                BackgroundJob.objects.filter(id=job.id).update(
+                    status='done', result=result or {}, finished_at=timezone.now()
+                )
+            return True
+        except OperationalError as exc:
+            if attempt < TRANSIENT_RETRIES:
+                logger.warning("Background job %s hit %r, retrying", job.key, exc)
+                time.sleep(RETRY_BACKOFF * 2 ** attempt)
+                continue
+            error = exc
+        except Exception as exc:
+            error = exc
+        break
+
+    logger.error("Background job %s failed", job.key, exc_info=error)
+    BackgroundJob.objects.filter(id=job.id, status='running', locked_by=owner).update(
+        status='failed', last_error=repr(error), finished_at=timezone.now()
+    )
+    return True
+
+
+def run_job(job_id, owner=None):
+    """
+    Claim a pending job and run it; a job claimed elsewhere is left alone.
+    Returns whether this worker ran it.
+    """
+    owner = owner or worker_id()
+    job = claim_job(job_id, owner)
+    return job is not None and execute_job(job, owner)
+
+
+def flush(timeout=None):
+    runner.flush(timeout=timeout)
+
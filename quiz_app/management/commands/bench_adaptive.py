@@ -0,0 +1,73 @@
+import random
+import statistics
+import time
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Sum
+
+from quiz_app.adaptive import BankArrays, select_adaptive_ids
+from quiz_app.models import Category, UserCategoryStats
+from quiz_app.sampling import QuestionIndex
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark adaptive question selection as the question bank grows: the user's profile "
+        "queries, weighting and weighted draw, for the most active users in the database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000',
+                            help="Comma-separated question bank sizes")
+        parser.add_argument('--count', type=int, default=100, help="Questions drawn per quiz")
+        parser.add_argument('--users', type=int, default=50, help="Most active users cycled through")
+        parser.add_argument('--warmup', type=int, default=20, help="Untimed selections before each size")
+        parser.add_argument('--repeat', type=int, default=500, help="Selections timed per size")
+        parser.add_argument('--budget', type=float, default=20.0,
+                            help="Fail if the p95 selection time exceeds this many milliseconds")
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 100:
+            raise CommandError("--repeat must be at least 100 for a stable p95")
+        user_ids = list(
+            UserCategoryStats.objects.values_list('user_id', flat=True).annotate(total=Sum('attempted'))
+            .order_by('-total')[:options['users']]
+        )
+        users = list(User.objects.filter(id__in=user_ids))
+        if not users:
+            raise CommandError("No users have answered questions yet; seed the database first with seed_scale")
+        # The synthetic banks use the real category IDs so the profiles line up with them
+        categories = list(Category.objects.values_list('id', flat=True)) or [None]
+        difficulties = ['easy', 'medium', 'hard']
+        count = options['count']
+        rng = np.random.default_rng()
+
+        self.stdout.write(f"{len(users)} users, {options['repeat']} selections per size")
+        self.stdout.write(f"{'rows':>10} {'build':>10} {'p50':>10} {'p95':>10}")
+        worst = 0.0
+        for size in [int(s) for s in options['sizes'].split(',')]:
+            index = QuestionIndex()
+            index.build((pk, random.choice(categories), random.choice(difficulties)) for pk in range(1, size + 1))
+            bank = BankArrays(index)
+            start = time.perf_counter()
+            bank.build()
+            build_ms = (time.perf_counter() - start) * 1000
+
+            for i in range(options['warmup']):
+                select_adaptive_ids(users[i % len(users)], count, rng, bank=bank)
+            samples = []
+            for i in range(options['repeat']):
+                user = users[i % len(users)]
+                start = time.perf_counter()
+                select_adaptive_ids(user, count, rng, bank=bank)
+                samples.append((time.perf_counter() - start) * 1000)
+
+            p50 = statistics.median(samples)
+            p95 = statistics.quantiles(samples, n=20, method='inclusive')[-1]
+            worst = max(worst, p95)
+            self.stdout.write(f"{size:>10} {build_ms:>8.1f}ms {p50:>8.2f}ms {p95:>8.2f}ms")
+
+        if worst > options['budget']:
+            raise CommandError(f"p95 selection time {worst:.2f}ms exceeds the {options['budget']}ms budget")
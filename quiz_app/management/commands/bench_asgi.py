@@ -0,0 +1,138 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import AsyncClient, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from quiz_app import jobs
+from quiz_app.models import QuizResult
+from quiz_app.scale import PRESETS, benchmark_database, git_commit, reseed, summarize
+
+
+VIEWS = ('index', 'leaderboard', 'progress', 'result')
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the read-heavy pages (sync views) through Django's ASGI handler and its WSGI "
+        "handler at the same concurrency and report throughput and latency for each as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(PRESETS), default='small', help="Data preset to seed")
+        parser.add_argument('--concurrency', type=int, default=16, help="Requests in flight at once")
+        parser.add_argument('--requests', type=int, default=400, help="Requests per view and handler")
+        parser.add_argument('--views', default=','.join(VIEWS), help="Comma-separated URL names to load")
+        parser.add_argument('--seed', type=int, default=1, help="Random seed for the generated data")
+        parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+
+    def handle(self, *args, **options):
+        views = [name.strip() for name in options['views'].split(',') if name.strip()]
+        unknown = [name for name in views if name not in VIEWS]
+        if unknown:
+            raise CommandError(f"Unknown view(s): {', '.join(unknown)}; choose from {', '.join(VIEWS)}")
+        concurrency = max(1, options['concurrency'])
+        total = max(concurrency, options['requests'])
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'commit': git_commit(),
+            'database': connection.vendor,
+            'scale': options['scale'],
+            'concurrency': concurrency,
+            'requests': total,
+            'views': [],
+        }
+        with benchmark_database():
+            report['sizes'] = reseed(options['scale'], seed=options['seed'],
+                                     log=lambda message: self.stderr.write(message))
+            self.member = User.objects.create_user('bench-member')
+            result_url = self.prepare_result()
+
+            for name in views:
+                url = result_url if name == 'result' else reverse(name)
+                wsgi = self.run_wsgi(url, concurrency, total)
+                asgi = asyncio.run(self.run_asgi(url, concurrency, total))
+                report['views'].append({
+                    'name': name,
+                    'url': url,
+                    'wsgi': wsgi,
+                    'asgi': asgi,
+                    'asgi_speedup': round(asgi['throughput_rps'] / wsgi['throughput_rps'], 2),
+                })
+                self.stderr.write(
+                    f"{name}: WSGI {wsgi['throughput_rps']} req/s (p95 {wsgi['latency_ms']['p95']}ms), "
+                    f"ASGI {asgi['throughput_rps']} req/s (p95 {asgi['latency_ms']['p95']}ms)"
+                )
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(f"Wrote {options['output']}")
+        else:
+            self.stdout.write(output)
+
+    def prepare_result(self):
+        """Submit one quiz as the benchmark user so the result page has something to show"""
+        client = Client()
+        client.force_login(self.member)
+        attempt = client.get(reverse('quiz')).context['attempt']
+        data = {f'question_{pk}': '1' for pk in attempt.question_id_list}
+        data['attempt'] = attempt.token
+        client.post(reverse('quiz'), data)
+        jobs.flush()
+        result = QuizResult.objects.filter(user=self.member).latest('id')
+        return reverse('result', kwargs={'result_id': result.pk})
+
+    def run_wsgi(self, url, concurrency, total):
+        """Like a threaded WSGI server: `concurrency` threads, each handling requests back to back"""
+        def worker(count):
+            client = Client()
+            client.force_login(self.member)
+            latencies = []
+            try:
+                for _ in range(count):
+                    start = time.perf_counter()
+                    client.get(url)
+                    latencies.append((time.perf_counter() - start) * 1000)
+            finally:
+                connections.close_all()
+            return latencies
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(worker, self.shares(total, concurrency)))
+        return self.summary(results, time.perf_counter() - started)
+
+    async def run_asgi(self, url, concurrency, total):
+        """Like a single ASGI worker: `concurrency` tasks sharing one event loop"""
+        async def worker(count):
+            client = AsyncClient()
+            await client.aforce_login(self.member)
+            latencies = []
+            for _ in range(count):
+                start = time.perf_counter()
+                await client.get(url)
+                latencies.append((time.perf_counter() - start) * 1000)
+            return latencies
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(worker(count) for count in self.shares(total, concurrency)))
+        return self.summary(results, time.perf_counter() - started)
+
+    def shares(self, total, concurrency):
+        return [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+
+    def summary(self, results, elapsed):
+        latencies = [latency for worker in results for latency in worker]
+        return {
+            'throughput_rps': round(len(latencies) / elapsed, 1),
+            'latency_ms': summarize(latencies),
+        }
@@ -0,0 +1,87 @@
+import statistics
+import time
+from types import SimpleNamespace
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.shortcuts import render
+from django.template import engines
+from django.test import RequestFactory
+
+from quiz_app.fragments import fragment_key, quiz_items
+from quiz_app.pages import static_pages
+from quiz_app.question_cache import FIELDS, CachedQuestion
+from quiz_app.sampling import get_bank_version
+
+
+STATIC_PAGES = ['about.html', 'Terms_and_Conditions.html', 'Privacy_policy.html', 'Terms_of_service.html']
+
+# Well above any real question bank, so synthetic fragments never collide with cached ones
+FIRST_ID = 10 ** 12
+
+
+class Command(BaseCommand):
+    help = "Benchmark rendering a quiz page and the static pages, cold (nothing cached) and warm"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100, help="Questions on the quiz page")
+        parser.add_argument('--repeat', type=int, default=50, help="Renders timed per scenario")
+        parser.add_argument('--budget', type=float, default=10.0,
+                            help="Fail if the warm quiz p95 exceeds this many milliseconds")
+
+    def handle(self, *args, **options):
+        questions = [
+            CachedQuestion({
+                field: f'{field} of question {pk} <with markup>' for field in FIELDS
+            } | {'id': pk, 'correct_option': 1, 'category_id': None, 'difficulty': 'medium'})
+            for pk in range(FIRST_ID, FIRST_ID + options['count'])
+        ]
+        request = RequestFactory().get('/quiz/')
+        request.user = AnonymousUser()
+        attempt = SimpleNamespace(token='benchmark')
+        loader = engines['django'].engine.template_loaders[0]
+
+        def forget_quiz():
+            loader.reset()
+            version = get_bank_version()
+            cache.delete_many([fragment_key(version, question.id) for question in questions])
+
+        def render_quiz():
+            render(request, 'quiz.html', {
+                'quiz_items': quiz_items(questions), 'attempt': attempt, 'quiz_type': 'standard',
+            })
+
+        def forget_pages():
+            loader.reset()
+            static_pages.clear()
+
+        def render_pages():
+            for template_name in STATIC_PAGES:
+                static_pages.render(request, template_name)
+
+        self.stdout.write(f"{'scenario':<16} {'p50':>10} {'p95':>10}")
+        results = {}
+        for name, reset, run in [
+            ('quiz cold', forget_quiz, render_quiz),
+            ('quiz warm', None, render_quiz),
+            ('static cold', forget_pages, render_pages),
+            ('static warm', None, render_pages),
+        ]:
+            run()
+            samples = []
+            for _ in range(options['repeat']):
+                if reset:
+                    reset()
+                start = time.perf_counter()
+                run()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            results[name] = p95 = samples[int(len(samples) * 0.95) - 1]
+            self.stdout.write(f"{name:<16} {statistics.median(samples):>8.2f}ms {p95:>8.2f}ms")
+
+        forget_quiz()
+        if results['quiz warm'] > options['budget']:
+            raise CommandError(
+                f"p95 warm quiz render {results['quiz warm']:.2f}ms exceeds the {options['budget']}ms budget"
+            )
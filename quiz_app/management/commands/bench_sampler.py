@@ -0,0 +1,46 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from quiz_app.sampling import QuestionIndex
+
+
+class Command(BaseCommand):
+    help = "Benchmark random question sampling as the question bank grows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000,1000000',
+                            help="Comma-separated question bank sizes")
+        parser.add_argument('--count', type=int, default=100, help="Questions drawn per quiz")
+        parser.add_argument('--repeat', type=int, default=200, help="Draws timed per size")
+        parser.add_argument('--categories', type=int, default=10, help="Number of synthetic categories")
+
+    def handle(self, *args, **options):
+        difficulties = ['easy', 'medium', 'hard']
+        categories = list(range(1, options['categories'] + 1))
+        count = options['count']
+
+        self.stdout.write(f"{'rows':>10} {'standard p50':>14} {'standard p95':>14} {'custom p50':>12} {'custom p95':>12}")
+        for size in [int(s) for s in options['sizes'].split(',')]:
+            index = QuestionIndex()
+            index.build((pk, random.choice(categories), random.choice(difficulties)) for pk in range(1, size + 1))
+
+            standard = self._time(lambda: index.draw(count), options['repeat'])
+            custom = self._time(
+                lambda: index.draw(count, categories={1, 2, 3}, difficulty='medium'),
+                options['repeat'],
+            )
+            self.stdout.write(
+                f"{size:>10} {standard[0]:>12.1f}us {standard[1]:>12.1f}us {custom[0]:>10.1f}us {custom[1]:>10.1f}us"
+            )
+
+    def _time(self, draw, repeat):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            draw()
+            samples.append((time.perf_counter() - start) * 1e6)
+        samples.sort()
+        return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
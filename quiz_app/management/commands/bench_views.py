@@ -0,0 +1,252 @@
+import itertools
+import json
+import time
+from contextlib import nullcontext
+
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, modify_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from quiz_app import jobs
+from quiz_app.daily import schedule_daily_questions
+from quiz_app.models import Category, QuizResult
+from quiz_app.scale import PRESETS, benchmark_database, git_commit, reseed, summarize
+
+
+METRICS_MIDDLEWARE = 'quiz_app.metrics.RequestMetricsMiddleware'
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database at one or more scales and time every quiz_app view, "
+        "reporting p50/p95 latency and SQL query counts as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='small',
+                            help=f"Comma-separated presets to run ({', '.join(PRESETS)})")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed requests per view")
+        parser.add_argument('--warmup', type=int, default=2, help="Untimed requests per view before timing")
+        parser.add_argument('--views', help="Comma-separated scenario names to run (default: all)")
+        parser.add_argument('--seed', type=int, default=1, help="Random seed for the generated data")
+        parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+        parser.add_argument('--metrics-overhead', action='store_true',
+                            help="Also time every request with the metrics middleware removed and report its overhead")
+
+    def handle(self, *args, **options):
+        scales = [name.strip() for name in options['scales'].split(',') if name.strip()]
+        unknown = [name for name in scales if name not in PRESETS]
+        if unknown:
+            raise CommandError(f"Unknown scale(s): {', '.join(unknown)}")
+        only = set(options['views'].split(',')) if options['views'] else None
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'commit': git_commit(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'scales': [],
+        }
+
+        with benchmark_database():
+            for scale in scales:
+                report['scales'].append(self.run_scale(scale, options, only))
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(f"Wrote {options['output']}")
+        else:
+            self.stdout.write(output)
+
+    def run_scale(self, scale, options, only):
+        started = time.monotonic()
+        sizes = reseed(scale, seed=options['seed'], log=lambda message: self.stderr.write(f"[{scale}] {message}"))
+        seed_seconds = round(time.monotonic() - started, 2)
+
+        self.staff = User.objects.create_user('bench-staff', password='bench-pass', is_staff=True, is_superuser=True)
+        self.member = User.objects.create_user('bench-member', password='bench-pass')
+        # Give the member a few attempts of their own for result, review, progress and export
+        client = self.new_client(self.member)
+        for attempt in range(PRESETS[scale]['results_per_user']):
+            self.member_result = self.submit_quiz(client)
+        jobs.flush()
+        schedule_daily_questions()
+
+        views = []
+        for scenario in self.scenarios():
+            if only and scenario['name'] not in only:
+                continue
+            views.append(self.measure(scenario, options['warmup'], options['repeat'], options['metrics_overhead']))
+            self.stderr.write(f"[{scale}] {views[-1]['name']}: p50 {views[-1]['latency_ms']['p50']}ms, "
+                              f"p95 {views[-1]['latency_ms']['p95']}ms, {views[-1]['queries']['max']} queries")
+        report = {'scale': scale, 'sizes': sizes, 'seed_seconds': seed_seconds, 'views': views}
+        if options['metrics_overhead'] and views:
+            # Summed medians, so the fast static pages do not dominate as per-view ratios would
+            with_metrics = sum(view['latency_ms']['p50'] for view in views)
+            without_metrics = sum(view['without_metrics_ms']['p50'] for view in views)
+            report['metrics_overhead_pct'] = round((with_metrics / without_metrics - 1) * 100, 2)
+            self.stderr.write(f"[{scale}] metrics middleware overhead: {report['metrics_overhead_pct']}%")
+        return report
+
+    def new_client(self, user=None):
+        # A broken view is reported with its status code rather than aborting the run
+        client = Client(raise_request_exception=False)
+        if user is not None:
+            client.force_login(user)
+        return client
+
+    def start_quiz(self, client):
+        """Open a standard quiz and return the POST that answers every question with option 1"""
+        attempt = client.get(reverse('quiz')).context['attempt']
+        data = {f'question_{pk}': '1' for pk in attempt.question_id_list}
+        data['attempt'] = attempt.token
+        return reverse('quiz'), data
+
+    def submit_quiz(self, client):
+        client.post(*self.start_quiz(client))
+        return QuizResult.objects.filter(user=self.member).latest('id')
+
+    def scenarios(self):
+        """
+        One entry per view and method. `prepare` runs untimed before each
+        request and returns (url, data) for it.
+        """
+        counter = itertools.count()
+        category_ids = list(Category.objects.values_list('id', flat=True)[:3])
+        uid = urlsafe_base64_encode(force_bytes(self.member.pk))
+        token = default_token_generator.make_token(self.member)
+
+        def static(name, url_name, user=None, method='get', data=None, **kwargs):
+            url = reverse(url_name, kwargs=kwargs or None)
+            return {'name': name, 'method': method, 'user': user, 'prepare': lambda client: (url, data)}
+
+        def register(client):
+            n = next(counter)
+            return reverse('register'), {
+                'username': f'bench-register-{n}', 'email': f'bench-register-{n}@example.com',
+                'password1': 'Bench-pass-1234', 'password2': 'Bench-pass-1234',
+            }
+
+        def add_question(client):
+            n = next(counter)
+            return reverse('add_question'), {
+                'question_text': f'Benchmark question {n}', 'option1': 'a', 'option2': 'b', 'option3': 'c',
+                'option4': f'd{n}', 'correct_option': 1, 'difficulty': 'medium', 'explanation': '',
+            }
+
+        member, staff = self.member, self.staff
+        return [
+            static('index', 'index', member),
+            static('about', 'about'),
+            static('contact', 'contact'),
+            static('contact:post', 'contact', method='post',
+                   data={'name': 'Bench', 'email': 'bench@example.com', 'subject': 'Hi', 'message': 'Hello'}),
+            static('terms_and_conditions', 'terms_and_conditions'),
+            static('privacy_policy', 'privacy_policy'),
+            static('terms_of_service', 'terms_of_service'),
+            static('register', 'register'),
+            {'name': 'register:post', 'method': 'post', 'user': None, 'prepare': register},
+            static('login', 'login'),
+            static('login:post', 'login', method='post', data={'username': 'bench-member', 'password': 'bench-pass'}),
+            static('logout', 'logout', member),
+            static('password_reset', 'password_reset'),
+            static('password_reset:post', 'password_reset', method='post', data={'email': 'bench-member@example.com'}),
+            static('password_reset_done', 'password_reset_done'),
+            static('password_reset_confirm', 'password_reset_confirm', uidb64=uid, token=token),
+            static('password_reset_complete', 'password_reset_complete'),
+            static('quiz', 'quiz', member),
+            {'name': 'quiz:daily', 'method': 'get', 'user': member,
+             'prepare': lambda client: (reverse('quiz'), {'type': 'daily'})},
+            {'name': 'quiz:adaptive', 'method': 'get', 'user': member,
+             'prepare': lambda client: (reverse('quiz'), {'type': 'adaptive'})},
+            {'name': 'quiz:custom', 'method': 'get', 'user': member,
+             'prepare': lambda client: (reverse('quiz'), {'type': 'custom', 'categories': category_ids,
+                                                          'difficulty': 'all', 'question_count': 20})},
+            {'name': 'quiz:post', 'method': 'post', 'user': member, 'prepare': self.start_quiz},
+            static('result', 'result', member, result_id=self.member_result.pk),
+            static('result_achievements', 'result_achievements', member, result_id=self.member_result.pk),
+            static('review_quiz', 'review_quiz', member, result_id=self.member_result.pk),
+            static('admin_dashboard', 'admin_dashboard', staff),
+            static('add_question', 'add_question', staff),
+            {'name': 'add_question:post', 'method': 'post', 'user': staff, 'prepare': add_question},
+            static('progress', 'progress', member),
+            static('leaderboard', 'leaderboard'),
+            {'name': 'leaderboard:week', 'method': 'get', 'user': None,
+             'prepare': lambda client: (reverse('leaderboard'), {'period': 'week'})},
+            {'name': 'leaderboard:month', 'method': 'get', 'user': None,
+             'prepare': lambda client: (reverse('leaderboard'), {'period': 'month'})},
+            static('custom_quiz', 'custom_quiz', member),
+            static('custom_quiz:post', 'custom_quiz', member, method='post',
+                   data={'categories': category_ids, 'difficulty': 'all', 'question_count': 20}),
+            static('daily_question', 'daily_question', member),
+            static('daily_question:post', 'daily_question', member, method='post', data={'answer': '1'}),
+            static('export_results', 'export_results', member),
+            {'name': 'export_results:all', 'method': 'get', 'user': staff,
+             'prepare': lambda client: (reverse('export_results'), {'scope': 'all'})},
+            static('metrics', 'metrics', staff),
+        ]
+
+    def measure(self, scenario, warmup, repeat, compare_metrics=False):
+        """
+        Time `repeat` requests after `warmup` untimed ones. With
+        `compare_metrics`, every iteration also sends the request with the
+        metrics middleware removed, alternating which goes first.
+        """
+        latencies = []
+        bare_latencies = []
+        query_counts = []
+        status = None
+        url = None
+        for iteration in range(warmup + repeat):
+            variants = [False, True] if compare_metrics else [False]
+            if iteration % 2:
+                variants.reverse()
+            for bare in variants:
+                without_metrics = modify_settings(MIDDLEWARE={'remove': [METRICS_MIDDLEWARE]}) if bare else nullcontext()
+                with without_metrics:
+                    url, status, elapsed, query_count = self.timed_request(scenario)
+                if iteration < warmup:
+                    continue
+                if bare:
+                    bare_latencies.append(elapsed * 1000)
+                else:
+                    latencies.append(elapsed * 1000)
+                    query_counts.append(query_count)
+
+        counts = summarize(query_counts)
+        report = {
+            'name': scenario['name'],
+            'method': scenario['method'].upper(),
+            'url': url,
+            'status': status,
+            'latency_ms': summarize(latencies),
+            'queries': {'p50': counts['p50'], 'max': counts['max']},
+        }
+        if compare_metrics:
+            report['without_metrics_ms'] = summarize(bare_latencies)
+        return report
+
+    def timed_request(self, scenario):
+        """Send one request for the scenario; returns (url, status, seconds, query count)"""
+        client = self.new_client(scenario['user'])
+        url, data = scenario['prepare'](client)
+        request = getattr(client, scenario['method'])
+
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = request(url, data or {})
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - start
+        # Background work started by the request is not part of its latency
+        jobs.flush()
+        return url, response.status_code, elapsed, len(queries)
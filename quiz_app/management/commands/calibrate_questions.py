@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from quiz_app.calibration import CHUNK_SIZE, calibrate_questions
+
+
+class Command(BaseCommand):
+    help = (
+        "Fit per-question IRT difficulty and discrimination from the answer history; "
+        "incremental from the last checkpoint unless --full"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Ignore the checkpoint and refit from all answers")
+        parser.add_argument('--epochs', type=int, default=1, help="Passes over the history for a full fit")
+        parser.add_argument('--rasch', action='store_true', help="Fix discrimination at 1 (Rasch model)")
+        parser.add_argument('--relabel', action='store_true',
+                            help="Set easy/medium/hard from the calibrated difficulty for well-answered questions")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Answers read per page")
+        parser.add_argument('--checkpoint-every', type=int, default=20, help="Pages between checkpoints")
+        parser.add_argument('--checkpoint', help="Checkpoint file (default: QUIZ_CALIBRATION_CHECKPOINT)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        read, calibrated = calibrate_questions(
+            full=options['full'], epochs=options['epochs'], rasch=options['rasch'], relabel=options['relabel'],
+            chunk_size=options['chunk_size'], checkpoint_every=options['checkpoint_every'],
+            path=options['checkpoint'], log=lambda message: self.stderr.write(message),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Calibrated from {read} answers; calibrated {calibrated} questions in {time.perf_counter() - started:.1f}s"
+        ))
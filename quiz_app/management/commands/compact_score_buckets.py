@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from quiz_app.ranking import compact_score_buckets, rebuild_score_buckets
+
+
+class Command(BaseCommand):
+    help = "Delete day, week and month score buckets that have aged out of their leaderboard window"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--rebuild', action='store_true',
+                            help="Recompute all live buckets from quiz results and daily answers instead")
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            written = rebuild_score_buckets(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} score buckets"))
+            return
+        removed = compact_score_buckets(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} expired score buckets"))
@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz_app.importing import QuestionImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-import questions from a CSV or JSONL file. Columns/keys: question_text, "
+        "option1-option4, correct_option (1-4 or A-D), category (name), difficulty, explanation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file to import")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true', help="Validate and count duplicates without writing")
+        parser.add_argument('--create-categories', action='store_true', help="Create categories that don't exist yet")
+        parser.add_argument('--checkpoint', help="Checkpoint file (default: <path>.checkpoint)")
+        parser.add_argument('--resume', action='store_true', help="Continue after the last committed batch")
+        parser.add_argument('--max-errors', type=int, default=20, help="Invalid rows to print individually")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist")
+        file_format = options['format'] or ('jsonl' if path.suffix.lower() in ('.jsonl', '.ndjson') else 'csv')
+
+        errors_shown = 0
+
+        def on_invalid(number, message):
+            nonlocal errors_shown
+            if errors_shown < options['max_errors']:
+                self.stderr.write(f"Record {number}: {message}")
+                errors_shown += 1
+
+        def on_progress(stats, rate):
+            self.stdout.write(
+                f"read {stats['read']:,}  inserted {stats['inserted']:,}  duplicates {stats['duplicates']:,}  "
+                f"invalid {stats['invalid']:,}  ({rate:,.0f} rows/sec)"
+            )
+
+        importer = QuestionImporter(
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+            create_categories=options['create_categories'],
+            checkpoint_path=options['checkpoint'] or f"{path}.checkpoint",
+            on_progress=on_progress,
+            on_invalid=on_invalid,
+        )
+        stats = importer.run(path, file_format, resume=options['resume'])
+
+        prefix = "Dry run: would insert" if options['dry_run'] else "Inserted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {stats['inserted']:,} questions from {stats['read']:,} rows "
+            f"({stats['duplicates']:,} duplicates, {stats['invalid']:,} invalid, {stats['skipped']:,} skipped on resume) "
+            f"at {importer.rows_per_second():,.0f} rows/sec"
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from quiz_app.jobs import requeue_orphaned, run_job
+from quiz_app.models import BackgroundJob
+
+
+class Command(BaseCommand):
+    help = "Run pending background jobs in the foreground, oldest first"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry-failed', action='store_true', help="Requeue failed jobs before running")
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            requeued = BackgroundJob.objects.filter(status='failed').update(status='pending')
+            self.stdout.write(f"Requeued {requeued} failed jobs")
+
+        # Only jobs whose worker's lease expired; live workers keep theirs
+        requeue_orphaned()
+
+        pending = BackgroundJob.objects.filter(status='pending').order_by('id').values_list('id', flat=True)
+        processed = 0
+        for job_id in pending.iterator():
+            # Jobs another worker claimed first are not counted
+            processed += run_job(job_id)
+        failed = BackgroundJob.objects.filter(status='failed').count()
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs ({failed} failed in total)"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from quiz_app.attempts import purge_stale_attempts
+
+
+class Command(BaseCommand):
+    help = "Delete quiz attempts that were started but never submitted within QUIZ_ATTEMPT_TTL"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        removed = purge_stale_attempts(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} stale quiz attempts"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from quiz_app.stats import rebuild_category_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user, per-category statistics from the answer history"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help="Limit to a user ID (repeatable)")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created = rebuild_category_stats(user_ids=options['user_ids'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} category stats rows"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from quiz_app.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recount questions, users and quiz results and fix site counter drift"
+
+    def handle(self, *args, **options):
+        drift = reconcile()
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Site counters are accurate"))
+        for name, (old, new) in drift.items():
+            self.stdout.write(self.style.WARNING(f"{name}: {old} -> {new}"))
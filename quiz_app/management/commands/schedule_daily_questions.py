@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from quiz_app.daily import REPEAT_WINDOW_DAYS, SCHEDULE_AHEAD_DAYS, schedule_daily_questions
+
+
+class Command(BaseCommand):
+    help = "Fill the daily question schedule ahead of time, rotating categories and difficulties"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=SCHEDULE_AHEAD_DAYS, help="Days to schedule from the start date")
+        parser.add_argument('--start', help="First day to schedule, YYYY-MM-DD (default: today)")
+        parser.add_argument('--window', type=int, default=REPEAT_WINDOW_DAYS,
+                            help="Days within which a question is not repeated")
+
+    def handle(self, *args, **options):
+        start = None
+        if options['start']:
+            start = parse_date(options['start'])
+            if start is None:
+                raise CommandError("--start must be YYYY-MM-DD")
+        if options['days'] < 1 or options['window'] < 1:
+            raise CommandError("--days and --window must be positive")
+
+        created = schedule_daily_questions(start=start, days=options['days'], window=options['window'])
+        for row in created:
+            self.stdout.write(f"{row.date}: question {row.question_id}")
+        self.stdout.write(self.style.SUCCESS(f"Scheduled {len(created)} day(s)"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz_app.ml_utils import score_users
+
+
+class Command(BaseCommand):
+    help = "Recompute every user's stored effort recommendation with the saved model"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help="Limit to a user ID (repeatable)")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Users scored per chunk")
+
+    def handle(self, *args, **options):
+        scored = score_users(user_ids=options['user_ids'], batch_size=options['batch_size'])
+        if scored is None:
+            raise CommandError("No saved model; run train_effort_model first")
+        self.stdout.write(self.style.SUCCESS(f"Scored {scored} users"))
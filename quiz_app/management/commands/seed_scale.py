@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz_app.scale import PRESETS, ScaleSeeder
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate categories, questions, users, quiz results and answers for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=sorted(PRESETS), default='small',
+                            help="Starting sizes; the options below override individual values")
+        parser.add_argument('--categories', type=int)
+        parser.add_argument('--questions', type=int)
+        parser.add_argument('--users', type=int)
+        parser.add_argument('--results-per-user', type=int)
+        parser.add_argument('--answers-per-result', type=int)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, help="Random seed for reproducible data")
+
+    def handle(self, *args, **options):
+        sizes = dict(PRESETS[options['preset']])
+        for key in sizes:
+            if options.get(key) is not None:
+                sizes[key] = options[key]
+        if any(value < 0 for value in sizes.values()):
+            raise CommandError("Sizes must not be negative")
+
+        seeder = ScaleSeeder(batch_size=options['batch_size'], seed=options['seed'], log=self.stdout.write)
+        created = seeder.seed(**sizes)
+        self.stdout.write(self.style.SUCCESS(
+            "Seeded " + ", ".join(f"{value:,} {name}" for name, value in created.items())
+        ))
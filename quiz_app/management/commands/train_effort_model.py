@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz_app.ml_utils import effort_model_path, save_effort_model, score_users, train_effort_model
+
+
+class Command(BaseCommand):
+    help = "Fit the effort-recommendation model from quiz history, save it, and rescore every user"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows fetched per chunk")
+        parser.add_argument('--output', help="Model file (default: QUIZ_EFFORT_MODEL_PATH)")
+        parser.add_argument('--no-score', action='store_true', help="Save the model without rescoring users")
+
+    def handle(self, *args, **options):
+        bundle = train_effort_model(batch_size=options['batch_size'])
+        if bundle is None:
+            raise CommandError("Not enough quiz history to train on")
+        path = save_effort_model(bundle, options['output'] or effort_model_path())
+        self.stdout.write(self.style.SUCCESS(
+            f"Trained on {bundle['samples']} quizzes (R^2 {bundle['r2']:.3f}); saved to {path}"
+        ))
+
+        if not options['no_score']:
+            scored = score_users(bundle, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Scored {scored} users"))
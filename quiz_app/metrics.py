@@ -0,0 +1,195 @@
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from threading import Lock
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connections
+
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Views beyond this many distinct names are folded into "other"
+MAX_VIEWS = 100
+
+
+class ViewStats:
+    __slots__ = ('buckets', 'count', 'latency_sum', 'queries', 'db_time')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.latency_sum = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+
+
+class MetricsRegistry:
+    """In-process per-view request metrics, bounded by MAX_VIEWS entries"""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = Lock()
+
+    def observe(self, view, latency, queries, db_time):
+        with self._lock:
+            stats = self._stats.get(view)
+            if stats is None:
+                if len(self._stats) >= MAX_VIEWS:
+                    view = 'other'
+                stats = self._stats.setdefault(view, ViewStats())
+            stats.buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+            stats.count += 1
+            stats.latency_sum += latency
+            stats.queries += queries
+            stats.db_time += db_time
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            snapshot = {
+                view: (list(s.buckets), s.count, s.latency_sum, s.queries, s.db_time)
+                for view, s in sorted(self._stats.items())
+            }
+
+        lines = [
+            '# HELP quizmaster_request_duration_seconds Request latency by view.',
+            '# TYPE quizmaster_request_duration_seconds histogram',
+        ]
+        for view, (buckets, count, latency_sum, queries, db_time) in snapshot.items():
+            cumulative = 0
+            for bound, observed in zip(LATENCY_BUCKETS, buckets):
+                cumulative += observed
+                lines.append(f'quizmaster_request_duration_seconds_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+            lines.append(f'quizmaster_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} {count}')
+            lines.append(f'quizmaster_request_duration_seconds_sum{{view="{view}"}} {latency_sum:.6f}')
+            lines.append(f'quizmaster_request_duration_seconds_count{{view="{view}"}} {count}')
+
+        lines += [
+            '# HELP quizmaster_db_queries_total SQL queries executed by view.',
+            '# TYPE quizmaster_db_queries_total counter',
+        ]
+        lines += [f'quizmaster_db_queries_total{{view="{view}"}} {values[3]}' for view, values in snapshot.items()]
+
+        lines += [
+            '# HELP quizmaster_db_duration_seconds_total Time spent in SQL queries by view.',
+            '# TYPE quizmaster_db_duration_seconds_total counter',
+        ]
+        lines += [f'quizmaster_db_duration_seconds_total{{view="{view}"}} {values[4]:.6f}' for view, values in snapshot.items()]
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class QueryRecorder:
+    """connection.execute_wrapper hook counting queries and their duration"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or 'unnamed'
+
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, SQL query count and DB time for every request, per URL
+    name. Works in both sync and async chains so async views are not pushed
+    back onto a thread. Streamed responses (CSV exports) run most of their
+    queries while the server consumes the body, after the view returns, so
+    they are recorded once the last chunk has been produced.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with self.recording(recorder):
+            response = self.get_response(request)
+        return self.observe(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        # Connections are thread-local and the async ORM runs queries on the
+        # request's sync thread, so the hooks are installed there
+        stack = await sync_to_async(self.recording)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.observe(request, response, recorder, start)
+
+    def observe(self, request, response, recorder, start):
+        """Record the request now, or once a streamed body has been produced"""
+        def record():
+            registry.observe(view_name(request), time.perf_counter() - start, recorder.count, recorder.duration)
+
+        if not response.streaming:
+            record()
+        elif response.is_async:
+            response.streaming_content = self.arecorded_stream(response.streaming_content, recorder, record)
+        else:
+            response.streaming_content = self.recorded_stream(response.streaming_content, recorder, record)
+        return response
+
+    def recorded_stream(self, content, recorder, record):
+        # Hooks are installed only while a chunk is produced, on the thread consuming the body
+        iterator = iter(content)
+        try:
+            while True:
+                with self.recording(recorder):
+                    chunk = next(iterator, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            record()
+
+    async def arecorded_stream(self, content, recorder, record):
+        iterator = aiter(content)
+        try:
+            while True:
+                stack = await sync_to_async(self.recording)(recorder)
+                try:
+                    chunk = await anext(iterator, None)
+                finally:
+                    await sync_to_async(stack.close)()
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            record()
+
+    def recording(self, recorder):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
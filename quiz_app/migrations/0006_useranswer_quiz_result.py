@@ -0,0 +1,85 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:30
+
+from datetime import timedelta, timezone
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef, Subquery
+from django.db.models.functions import TruncDate
+
+
+# Answers were saved just before their QuizResult, in the same request
+MATCH_WINDOW = timedelta(minutes=1)
+
+# Quiz results linked per UPDATE
+CHUNK_SIZE = 500
+
+
+def link_answers_to_results(apps, schema_editor):
+    """
+    Attach existing answers to the quiz result recorded right after them,
+    the lowest result ID winning, with set-based UPDATEs per chunk of
+    results. Answers to the day's question were also saved outside any
+    quiz, by the daily question page, so only daily quizzes may claim those.
+    """
+    DailyQuestion = apps.get_model('quiz_app', 'DailyQuestion')
+    QuizResult = apps.get_model('quiz_app', 'QuizResult')
+    UserAnswer = apps.get_model('quiz_app', 'UserAnswer')
+
+    # Daily questions were keyed by the UTC date they were shown on
+    answers = UserAnswer.objects.filter(quiz_result__isnull=True).annotate(
+        answer_day=TruncDate('answered_at', tzinfo=timezone.utc),
+    ).annotate(daily=Exists(DailyQuestion.objects.filter(question_id=OuterRef('question_id'), date=OuterRef('answer_day'))))
+    last_id = 0
+    while True:
+        chunk = list(
+            QuizResult.objects.filter(id__gt=last_id).order_by('id')
+            .values_list('id', 'user_id', 'completed_at')[:CHUNK_SIZE]
+        )
+        if not chunk:
+            return
+        first_id, last_id = chunk[0][0], chunk[-1][0]
+        completed = [completed_at for _, _, completed_at in chunk]
+        # A range on the temporary (user, answered_at) index
+        candidates = answers.filter(
+            user_id__in={user_id for _, user_id, _ in chunk},
+            answered_at__gte=min(completed) - MATCH_WINDOW,
+            answered_at__lte=max(completed),
+        )
+        claimants = QuizResult.objects.filter(
+            id__gte=first_id, id__lte=last_id, user_id=OuterRef('user_id'),
+            completed_at__gte=OuterRef('answered_at'), completed_at__lte=OuterRef('answered_at') + MATCH_WINDOW,
+        ).order_by('id')
+        for daily, results in [(False, claimants), (True, claimants.filter(quiz_type='daily'))]:
+            candidates.filter(Exists(results), daily=daily).update(quiz_result_id=Subquery(results.values('id')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0005_usercategorystats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='useranswer',
+            name='quiz_result',
+            field=models.ForeignKey(blank=True, help_text='Quiz attempt this answer belongs to; empty for daily questions', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='quiz_app.quizresult'),
+        ),
+        migrations.AddIndex(
+            model_name='useranswer',
+            index=models.Index(fields=['quiz_result', 'question'], name='quiz_app_us_quiz_re_af2731_idx'),
+        ),
+        # Only the backfill needs answers by user and time; it is dropped afterwards
+        migrations.AddIndex(
+            model_name='useranswer',
+            index=models.Index(fields=['user', 'answered_at'], name='quiz_app_us_backfill_idx'),
+        ),
+        migrations.RunPython(link_answers_to_results, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='useranswer',
+            name='quiz_app_us_backfill_idx',
+        ),
+    ]
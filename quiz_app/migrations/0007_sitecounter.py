@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:32
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    """Start each counter from the current row count"""
+    SiteCounter = apps.get_model('quiz_app', 'SiteCounter')
+    for name, label in [('questions', 'quiz_app.Question'), ('users', 'auth.User'), ('quizzes', 'quiz_app.QuizResult')]:
+        SiteCounter.objects.update_or_create(name=name, defaults={'value': apps.get_model(label).objects.count()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0006_useranswer_quiz_result'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:34
+
+from django.db import migrations, models
+
+from quiz_app.importing import question_content_hash
+
+
+def hash_existing_questions(apps, schema_editor):
+    """Fill content_hash for existing questions in chunks"""
+    Question = apps.get_model('quiz_app', 'Question')
+    fields = ('id', 'question_text', 'option1', 'option2', 'option3', 'option4')
+    batch = []
+    for pk, *content in Question.objects.order_by('id').values_list(*fields).iterator(chunk_size=2000):
+        batch.append(Question(id=pk, content_hash=question_content_hash(*content)))
+        if len(batch) >= 2000:
+            Question.objects.bulk_update(batch, ['content_hash'])
+            batch = []
+    Question.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0007_sitecounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='SHA-256 of the normalized question text and options, used to detect duplicates', max_length=64),
+        ),
+        migrations.RunPython(hash_existing_questions, migrations.RunPython.noop),
+    ]
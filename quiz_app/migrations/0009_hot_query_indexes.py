@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0008_question_content_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaderboard',
+            index=models.Index(fields=['-score', 'updated_at'], name='quiz_app_le_score_e666ac_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboard',
+            index=models.Index(fields=['rank'], name='quiz_app_le_rank_9133aa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizresult',
+            index=models.Index(fields=['user', '-completed_at'], name='quiz_app_qu_user_id_4a0b33_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='useranswer',
+            index=models.Index(fields=['user', 'question', 'answered_at'], name='quiz_app_us_user_id_75d5e4_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:42
+
+import django.db.models.deletion
+import django.utils.timezone
+import quiz_app.attempts
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0009_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(default=quiz_app.attempts.new_attempt_token, editable=False, max_length=32, unique=True)),
+                ('quiz_type', models.CharField(default='standard', max_length=20)),
+                ('question_ids', models.BinaryField(help_text='Question IDs packed as signed 64-bit integers')),
+                ('status', models.CharField(choices=[('active', 'Active'), ('submitted', 'Submitted')], default='active', max_length=10)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('quiz_result', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='quiz_app.quizresult')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'started_at'], name='quiz_app_qu_status_0bc993_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:44
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_ratio_sum(apps, schema_editor):
+    """Recover the running sum from the stored average"""
+    UserProgress = apps.get_model('quiz_app', 'UserProgress')
+    UserProgress.objects.update(score_ratio_sum=F('average_score') * F('total_attempts'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0010_quizattempt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprogress',
+            name='score_ratio_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(backfill_ratio_sum, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:45
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def remove_duplicate_progress(apps, schema_editor):
+    """Keep each user's most-used progress row so the constraint can be added"""
+    UserProgress = apps.get_model('quiz_app', 'UserProgress')
+    duplicated = UserProgress.objects.values('user_id').annotate(rows=Count('id')).filter(rows__gt=1)
+    for row in duplicated:
+        rows = UserProgress.objects.filter(user_id=row['user_id']).order_by('-total_attempts', 'id')
+        keep = rows.first()
+        rows.exclude(pk=keep.pk).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0011_userprogress_score_ratio_sum'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_progress, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='userprogress',
+            constraint=models.UniqueConstraint(fields=('user',), name='unique_user_progress'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0012_unique_user_progress'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quizresult',
+            name='quiz_type',
+            field=models.CharField(choices=[('standard', 'Standard'), ('custom', 'Custom'), ('daily', 'Daily'), ('adaptive', 'Adaptive')], default='standard', max_length=20),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0013_quizresult_adaptive_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EffortRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('accuracy', models.FloatField(help_text='Overall accuracy when scored, 0 to 1')),
+                ('questions_needed', models.IntegerField(help_text='Predicted further questions to reach mastery')),
+                ('model_trained_at', models.DateTimeField()),
+                ('scored_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='effort_recommendation', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
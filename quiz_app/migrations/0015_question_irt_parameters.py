@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0014_effortrecommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='irt_answers',
+            field=models.IntegerField(default=0, help_text='Answers the calibration has seen for this question'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='irt_difficulty',
+            field=models.FloatField(blank=True, help_text='Calibrated IRT difficulty; higher is harder', null=True),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='irt_discrimination',
+            field=models.FloatField(blank=True, help_text='Calibrated IRT discrimination; how sharply it separates ability levels', null=True),
+        ),
+    ]
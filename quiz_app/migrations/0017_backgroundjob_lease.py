@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0016_scorebucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, help_text='When the job was claimed; its lease runs from here', null=True),
+        ),
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='locked_by',
+            field=models.CharField(blank=True, help_text='Worker that claimed the job, as host:pid:nonce', max_length=100),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0017_backgroundjob_lease'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='leaderboard',
+            name='quiz_app_le_rank_9133aa_idx',
+        ),
+        migrations.RemoveField(
+            model_name='leaderboard',
+            name='rank',
+        ),
+    ]
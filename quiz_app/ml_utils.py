@@ -1,131 +1,184 @@
+import os
+from array import array
+from itertools import islice
+
+import joblib
 import numpy as np
-import pandas as pd
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
 from sklearn.linear_model import LinearRegression
-from django.db.models import Count, Q
-from .models import UserProgress
 
+from .exports import iter_values
+
+
+# Accuracy at which a user is considered to have mastered the material
+MASTERY_ACCURACY = 0.9
+
+# Recommendations are capped here; a flat or falling learning curve never reaches mastery
+MAX_QUESTIONS_NEEDED = 5000
+
+# Users with fewer graded quizzes get no recommendation yet
+MIN_QUIZZES = 2
+
+
+def effort_model_path():
+    return getattr(settings, 'QUIZ_EFFORT_MODEL_PATH', os.path.join(settings.BASE_DIR, 'effort_model.joblib'))
+
+
+def effort_features(answered, accuracy):
+    """Model inputs for arrays of questions answered so far and accuracy so far"""
+    return np.column_stack([np.log1p(answered), accuracy])
 
-def calculate_effort_recommendation(user_progress):
+
+def iter_training_rows(batch_size=5000):
     """
-    Simple ML-based function to recommend effort needed to achieve 100%
+    Stream (questions answered before, accuracy before, accuracy on this
+    quiz) for every quiz after a user's first, in user and time order. Only
+    a few columns are read, one keyset-paginated chunk at a time, so memory
+    stays constant on MySQL too (see exports.iter_values).
     """
-    if user_progress.questions_answered == 0:
-        return "You need to start practicing! Answer at least 100 questions to get personalized recommendations."
-    
-    accuracy = user_progress.correct_answers / user_progress.questions_answered
-    questions_needed = 0
-    
-    if accuracy < 0.5:
-        questions_needed = 500
-        return f"Your accuracy is low ({accuracy*100:.1f}%). You need to practice about {questions_needed} more questions to reach 100% mastery."
-    elif accuracy < 0.7:
-        questions_needed = 300
-        return f"Your accuracy is moderate ({accuracy*100:.1f}%). You need to practice about {questions_needed} more questions to reach 100% mastery."
-    elif accuracy < 0.9:
-        questions_needed = 150
-        return f"Your accuracy is good ({accuracy*100:.1f}%). You need to practice about {questions_needed} more questions to reach 100% mastery."
-    else:
-        questions_needed = 50
-        return f"Your accuracy is excellent ({accuracy*100:.1f}%). You're almost there! Practice about {questions_needed} more questions to reach 100% mastery."
+    from .models import QuizResult
+
+    results = QuizResult.objects.filter(total_questions__gt=0).order_by('user_id', 'completed_at', 'id')
+    current_user, answered, correct = None, 0, 0
+    last = None
+    while True:
+        chunk = results
+        if last is not None:
+            user_id, completed_at, pk = last
+            chunk = chunk.filter(user_id__gte=user_id).filter(
+                Q(user_id__gt=user_id) | Q(user_id=user_id, completed_at__gt=completed_at)
+                | Q(user_id=user_id, completed_at=completed_at, id__gt=pk)
+            )
+        rows = list(chunk.values_list('user_id', 'completed_at', 'id', 'score', 'total_questions')[:batch_size])
+        if not rows:
+            return
+        for user_id, _, _, score, total_questions in rows:
+            if user_id != current_user:
+                current_user, answered, correct = user_id, 0, 0
+            elif answered:
+                yield answered, correct / answered, score / total_questions
+            answered += total_questions
+            correct += score
+        last = rows[-1][:3]
+
+
+def build_training_set(batch_size=5000):
+    """Collect the streamed rows into feature and target arrays without per-row objects"""
+    answered, accuracy, target = array('d'), array('d'), array('d')
+    for row in iter_training_rows(batch_size):
+        answered.append(row[0])
+        accuracy.append(row[1])
+        target.append(row[2])
+    return effort_features(np.frombuffer(answered), np.frombuffer(accuracy)), np.frombuffer(target)
+
+
+def train_effort_model(batch_size=5000):
+    """
+    Fit the learning curve: accuracy on the next quiz as a function of how
+    many questions a user has answered and how accurate they have been.
+    Returns the saved bundle, or None when there is no history to fit.
+    """
+    features, target = build_training_set(batch_size)
+    if len(target) < 2:
+        return None
+    model = LinearRegression().fit(features, target)
+    return {
+        'model': model,
+        'trained_at': timezone.now(),
+        'samples': len(target),
+        'r2': float(model.score(features, target)),
+    }
+
 
+def save_effort_model(bundle, path=None):
+    path = path or effort_model_path()
+    joblib.dump(bundle, path)
+    _loaded.clear()
+    return path
 
 
+_loaded = {}
 
 
-# quiz_app/ml_utils.py
-def enhanced_effort_recommendation(user):
-    from .models import QuizResult, UserProgress
-    
-    # Get user progress
+def load_effort_model(path=None):
+    """The saved bundle, loaded once per process and reloaded when the file changes; None if untrained"""
+    path = path or effort_model_path()
     try:
-        user_progress = UserProgress.objects.get(user=user)
-    except UserProgress.DoesNotExist:
-        return "Complete a few quizzes to get personalized recommendations."
-    
-    # Get user's performance data
-    user_results = QuizResult.objects.filter(user=user)
-    
-    if user_results.count() < 2:
-        return "Complete a few more quizzes to get personalized recommendations."
-    
-    # Calculate average accuracy
-    if user_progress.questions_answered > 0:
-        accuracy = (user_progress.correct_answers / user_progress.questions_answered) * 100
-    else:
-        accuracy = 0
-    
-    # Simple recommendation based on accuracy
-    if accuracy < 50:
-        return "Your accuracy is low. Focus on understanding the basics and review incorrect answers. You need to practice more questions to improve."
-    elif accuracy < 70:
-        return "Your accuracy is moderate. Keep practicing and focus on your weak areas. Review explanations for questions you get wrong."
-    elif accuracy < 85:
-        return "Your accuracy is good. You're making progress! Focus on consistent practice and timing."
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _loaded.get('key') != (path, mtime):
+        _loaded.update(key=(path, mtime), bundle=joblib.load(path))
+    return _loaded['bundle']
+
+
+def predict_questions_needed(model, answered, accuracy):
+    """
+    Vectorized over users: solve the fitted curve for the number of answered
+    questions at which predicted accuracy reaches MASTERY_ACCURACY, and
+    return how many more that is.
+    """
+    answered = np.asarray(answered, dtype=float)
+    accuracy = np.asarray(accuracy, dtype=float)
+    intercept = model.intercept_
+    experience_weight, accuracy_weight = model.coef_
+    if experience_weight <= 0:
+        needed = np.full(len(answered), float(MAX_QUESTIONS_NEEDED))
     else:
-        return "Your accuracy is excellent! You're close to mastery. Keep up the good work and focus on maintaining consistency."
-
-
-def get_weak_categories(user):
-    from .models import UserAnswer, Category
-    
-    # Get categories where user performance is below average
-    user_answers = UserAnswer.objects.filter(user=user)
-    
-    if not user_answers.exists():
-        return []
-        
-    category_stats = user_answers.values('question__category__name', 'question__category__id').annotate(
-        total=Count('id'),
-        correct=Count('id', filter=Q(is_correct=True))
-    ).annotate(accuracy=100.0 * Count('id', filter=Q(is_correct=True)) / Count('id'))
-    
-    weak_categories = []
-    for stat in category_stats:
-        if stat['accuracy'] < 70:
-            try:
-                category = Category.objects.get(id=stat['question__category__id'])
-                weak_categories.append({
-                    'category': category,  # This should be the Category object, not a dict
-                    'accuracy': stat['accuracy'],
-                    'total': stat['total']
-                })
-            except Category.DoesNotExist:
-                continue  # Skip if category doesn't exist
-    
-    return sorted(weak_categories, key=lambda x: x['accuracy'])[:5]
-
-
-def check_achievements(user):
-    from .models import Achievement, UserAchievement, QuizResult, UserAnswer
-    
-    achievements = Achievement.objects.all()
-    user_achievements = UserAchievement.objects.filter(user=user).values_list('achievement_id', flat=True)
-    user_progress = UserProgress.objects.get(user=user)
-    
-    new_achievements = []
-    
-    for achievement in achievements:
-        if achievement.id not in user_achievements:
-            condition_met = False
-            
-            # Evaluate conditions
-            if achievement.condition == 'first_quiz':
-                condition_met = QuizResult.objects.filter(user=user).count() >= 1
-            elif achievement.condition == 'perfect_score':
-                condition_met = QuizResult.objects.filter(user=user, score=models.F('total_questions')).exists()
-            elif achievement.condition == '100_questions':
-                condition_met = user_progress.questions_answered >= 100
-            elif achievement.condition == '500_questions':
-                condition_met = user_progress.questions_answered >= 500
-            elif achievement.condition == '5_quizzes':
-                condition_met = user_progress.total_attempts >= 5
-            elif achievement.condition == '20_quizzes':
-                condition_met = user_progress.total_attempts >= 20
-            elif achievement.condition == '90_percent_accuracy':
-                condition_met = (user_progress.correct_answers / user_progress.questions_answered) >= 0.9 if user_progress.questions_answered > 0 else False
-            
-            if condition_met:
-                UserAchievement.objects.create(user=user, achievement=achievement)
-                new_achievements.append(achievement)
-    
-    return new_achievements
\ No newline at end of file
+        log_target = (MASTERY_ACCURACY - intercept - accuracy_weight * accuracy) / experience_weight
+        # Clip before expm1 so hopeless extrapolations do not overflow
+        log_target = np.minimum(log_target, np.log1p(answered + MAX_QUESTIONS_NEEDED))
+        needed = np.expm1(log_target) - answered
+    needed = np.clip(np.ceil(needed), 0, MAX_QUESTIONS_NEEDED)
+    needed[accuracy >= MASTERY_ACCURACY] = 0
+    return needed.astype(int)
+
+
+def conflict_target(model, fields):
+    """
+    `unique_fields` for an upserting bulk_create on the model's database.
+    MySQL's ON DUPLICATE KEY UPDATE takes no conflict target and rejects
+    one, so it gets None there.
+    """
+    connection = connections[router.db_for_write(model)]
+    return fields if connection.features.supports_update_conflicts_with_target else None
+
+
+def score_users(bundle=None, user_ids=None, batch_size=5000):
+    """
+    Precompute EffortRecommendation rows from UserProgress, a chunk of users
+    per prediction and per upsert. Returns the number of rows written, or
+    None when no model has been trained.
+    """
+    from .models import EffortRecommendation, UserProgress
+
+    bundle = bundle or load_effort_model()
+    if bundle is None:
+        return None
+    progress = UserProgress.objects.filter(total_attempts__gte=MIN_QUIZZES, questions_answered__gt=0)
+    if user_ids is not None:
+        progress = progress.filter(user_id__in=user_ids)
+    rows = iter_values(progress, ['user_id', 'questions_answered', 'correct_answers'], chunk_size=batch_size)
+
+    written = 0
+    while chunk := list(islice(rows, batch_size)):
+        user_ids_chunk, answered, correct = (np.array(column) for column in zip(*chunk))
+        accuracy = correct / answered
+        needed = predict_questions_needed(bundle['model'], answered, accuracy)
+        with transaction.atomic():
+            written += len(EffortRecommendation.objects.bulk_create(
+                [
+                    EffortRecommendation(
+                        user_id=int(user_id), accuracy=float(user_accuracy), questions_needed=int(user_needed),
+                        model_trained_at=bundle['trained_at'],
+                    )
+                    for user_id, user_accuracy, user_needed in zip(user_ids_chunk, accuracy, needed)
+                ],
+                update_conflicts=True,
+                unique_fields=conflict_target(EffortRecommendation, ['user']),
+                update_fields=['accuracy', 'questions_needed', 'model_trained_at', 'scored_at'],
+            ))
+    return written
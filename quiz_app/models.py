@@ -1,9 +1,16 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
 import random
 
+from .sampling import bump_bank_version
+from . import counters, daily
+from .importing import question_content_hash
+from .attempts import new_attempt_token, unpack_ids
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -27,7 +34,23 @@ class Question(models.Model):
         ('hard', 'Hard')
     ], default='medium')
     explanation = models.TextField(blank=True, help_text="Explanation of the correct answer")
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, editable=False,
+                                    help_text="SHA-256 of the normalized question text and options, used to detect duplicates")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Fitted from the answer history by calibrate_questions
+    irt_difficulty = models.FloatField(null=True, blank=True, help_text="Calibrated IRT difficulty; higher is harder")
+    irt_discrimination = models.FloatField(null=True, blank=True,
+                                           help_text="Calibrated IRT discrimination; how sharply it separates ability levels")
+    irt_answers = models.IntegerField(default=0, help_text="Answers the calibration has seen for this question")
+    
+    def save(self, *args, **kwargs):
+        self.content_hash = question_content_hash(
+            self.question_text, self.option1, self.option2, self.option3, self.option4
+        )
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'content_hash'}
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return self.question_text[:50] + "..."
@@ -41,9 +64,13 @@ class QuizResult(models.Model):
     quiz_type = models.CharField(max_length=20, default='standard', choices=[
         ('standard', 'Standard'),
         ('custom', 'Custom'),
-        ('daily', 'Daily')
+        ('daily', 'Daily'),
+        ('adaptive', 'Adaptive'),
     ])
     
+    class Meta:
+        indexes = [models.Index(fields=['user', '-completed_at'])]
+    
     def percentage(self):
         return round((self.score / self.total_questions) * 100, 2)
     
@@ -51,37 +78,134 @@ class QuizResult(models.Model):
         return f"{self.user.username} - {self.score}/{self.total_questions}"
 
 class UserProgress(models.Model):
+    """
+    Per-user counters. Rows are provisioned lazily by stats.record_quiz_stats
+    on the user's first graded answer; nothing is written when a User is
+    created or saved, and readers treat a missing row as all zeros.
+    """
     user = models.ForeignKey(User, on_delete=models.CASCADE,related_name='userprogress')
     total_attempts = models.IntegerField(default=0)
     average_score = models.FloatField(default=0)
     questions_answered = models.IntegerField(default=0)
     correct_answers = models.IntegerField(default=0)
+    # Sum of per-attempt score ratios; average_score is score_ratio_sum / total_attempts
+    score_ratio_sum = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['user'], name='unique_user_progress')]
     
     def update_stats(self, score, total_questions):
-        self.total_attempts += 1
-        self.questions_answered += total_questions
-        self.correct_answers += score
-        self.average_score = (self.average_score * (self.total_attempts - 1) + (score/total_questions)) / self.total_attempts
-        self.save()
+        """Record one attempt atomically; see stats.record_quiz_stats"""
+        from .stats import record_quiz_stats
+
+        fresh = record_quiz_stats(self.user, score, total_questions)
+        for field in ('total_attempts', 'questions_answered', 'correct_answers', 'score_ratio_sum', 'average_score'):
+            setattr(self, field, getattr(fresh, field))
     
     def __str__(self):
         return f"{self.user.username} Progress"
 
+class EffortRecommendation(models.Model):
+    """
+    A user's precomputed effort recommendation, written in batches by
+    ml_utils.score_users from the trained learning-curve model
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='effort_recommendation')
+    accuracy = models.FloatField(help_text="Overall accuracy when scored, 0 to 1")
+    questions_needed = models.IntegerField(help_text="Predicted further questions to reach mastery")
+    model_trained_at = models.DateTimeField()
+    scored_at = models.DateTimeField(auto_now=True)
+
+    def message(self):
+        accuracy = self.accuracy * 100
+        if self.questions_needed == 0:
+            return f"Your accuracy is excellent ({accuracy:.1f}%). You've reached mastery, so keep practicing to maintain it."
+        if self.accuracy < 0.5:
+            level = "low"
+        elif self.accuracy < 0.7:
+            level = "moderate"
+        elif self.accuracy < 0.9:
+            level = "good"
+        else:
+            level = "excellent"
+        from .ml_utils import MAX_QUESTIONS_NEEDED
+
+        estimate = "at least" if self.questions_needed >= MAX_QUESTIONS_NEEDED else "about"
+        return (
+            f"Your accuracy is {level} ({accuracy:.1f}%). Based on how accuracy improves with practice, "
+            f"you need {estimate} {self.questions_needed} more questions to reach mastery."
+        )
+
+    def __str__(self):
+        return f"{self.user.username} - {self.questions_needed} questions"
+
 class UserAnswer(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    quiz_result = models.ForeignKey(QuizResult, on_delete=models.CASCADE, null=True, blank=True, related_name='answers',
+                                    help_text="Quiz attempt this answer belongs to; empty for daily questions")
     selected_option = models.IntegerField()
     is_correct = models.BooleanField()
     answered_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['quiz_result', 'question']),
+            models.Index(fields=['user', 'question', 'answered_at']),
+        ]
+
+class UserCategoryStats(models.Model):
+    """Per-user, per-category answer totals, maintained as answers are recorded"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    attempted = models.IntegerField(default=0)
+    correct = models.IntegerField(default=0)
+    last_answered = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ['user', 'category']
+
+    def accuracy(self):
+        return round((self.correct / self.attempted) * 100, 1) if self.attempted else 0
+
+    def __str__(self):
+        return f"{self.user.username} - {self.category.name}: {self.correct}/{self.attempted}"
+
 class Leaderboard(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='leaderboard')
     score = models.IntegerField(default=0)
-    rank = models.IntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-score', 'updated_at']
+        indexes = [
+            models.Index(fields=['-score', 'updated_at']),
+        ]
+
+class ScoreBucket(models.Model):
+    """
+    A user's points within one day, week or month, bumped on every graded
+    submission by ranking.add_period_scores. The windowed leaderboards read
+    the top of a period through the (period, start, -score) index.
+    """
+    PERIOD_CHOICES = [
+        ('day', 'Day'),
+        ('week', 'Week'),
+        ('month', 'Month'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='score_buckets')
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    start = models.DateField(help_text="First day of the period")
+    score = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['user', 'period', 'start'], name='unique_score_bucket')]
+        indexes = [models.Index(fields=['period', 'start', '-score', 'updated_at'], name='score_bucket_top_idx')]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.period} of {self.start}: {self.score}"
 
 class Achievement(models.Model):
     name = models.CharField(max_length=100)
@@ -107,42 +231,95 @@ class DailyQuestion(models.Model):
     def __str__(self):
         return f"Daily Question for {self.date}"
     
-@receiver(post_save, sender=User)
-def create_user_progress(sender, instance, created, **kwargs):
-    """Create UserProgress when a new User is created"""
-    if created:
-        UserProgress.objects.create(user=instance)
+class SiteCounter(models.Model):
+    """Running site-wide totals so pages don't COUNT(*) large tables"""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
-@receiver(post_save, sender=User)
-def create_leaderboard_entry(sender, instance, created, **kwargs):
-    """Create Leaderboard entry when a new User is created"""
-    if created:
-        Leaderboard.objects.create(user=instance)
+    def __str__(self):
+        return f"{self.name}: {self.value}"
 
-# quiz_app/models.py
-@receiver(post_save, sender=User)
-def save_user_progress(sender, instance, **kwargs):
-    """Save UserProgress when User is saved"""
-    try:
-        # Use the default reverse relation for ForeignKey
-        user_progress = instance.userprogress_set.first()
-        if user_progress:
-            user_progress.save()
-        else:
-            UserProgress.objects.create(user=instance)
-    except Exception:
-        # Fallback if anything goes wrong
-        UserProgress.objects.get_or_create(user=instance)
+class BackgroundJob(models.Model):
+    """Durable record of derived-state work run off the request path"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    key = models.CharField(max_length=100, unique=True, help_text="Idempotency key, e.g. quiz_submitted:42")
+    kind = models.CharField(max_length=50)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    payload = models.JSONField(default=dict)
+    result = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=100, blank=True, help_text="Worker that claimed the job, as host:pid:nonce")
+    locked_at = models.DateTimeField(null=True, blank=True, help_text="When the job was claimed; its lease runs from here")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'id'])]
+
+    def __str__(self):
+        return f"{self.key} ({self.status})"
+
+class QuizAttempt(models.Model):
+    """
+    A quiz in progress, addressed by an unguessable token. The drawn question
+    IDs are stored packed and the start time is set on the server, so neither
+    lives in the session nor is trusted from the submitted form.
+    """
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('submitted', 'Submitted'),
+    ]
+
+    token = models.CharField(max_length=32, unique=True, default=new_attempt_token, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    quiz_type = models.CharField(max_length=20, default='standard')
+    question_ids = models.BinaryField(help_text="Question IDs packed as signed 64-bit integers")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active')
+    started_at = models.DateTimeField(default=timezone.now)
+    quiz_result = models.OneToOneField(QuizResult, on_delete=models.SET_NULL, null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'started_at'])]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.quiz_type} ({self.status})"
+
+    @property
+    def question_id_list(self):
+        return unpack_ids(self.question_ids)
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_index(sender, instance, **kwargs):
+    """Bump the question bank version once the change is committed"""
+    transaction.on_commit(bump_bank_version)
+
+@receiver(post_save, sender=DailyQuestion)
+@receiver(post_delete, sender=DailyQuestion)
+def invalidate_daily_question(sender, instance, **kwargs):
+    """Drop the cached daily question for that date once the change is committed"""
+    daily.invalidate(instance.date)
 
+@receiver(post_save, sender=Question)
 @receiver(post_save, sender=User)
-def save_leaderboard_entry(sender, instance, **kwargs):
-    """Save Leaderboard when User is saved"""
-    try:
-        # For OneToOneField, we can use hasattr to check
-        if hasattr(instance, 'leaderboard'):
-            instance.leaderboard.save()
-        else:
-            Leaderboard.objects.create(user=instance)
-    except Exception:
-        # Fallback if anything goes wrong
-        Leaderboard.objects.get_or_create(user=instance)
\ No newline at end of file
+@receiver(post_save, sender=QuizResult)
+def count_created(sender, instance, created, **kwargs):
+    """Keep site counters current as rows are created"""
+    if created:
+        counters.increment(counters.COUNTER_FOR_MODEL[sender._meta.label], 1)
+
+@receiver(post_delete, sender=Question)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=QuizResult)
+def count_deleted(sender, instance, **kwargs):
+    """Keep site counters current as rows are deleted"""
+    counters.increment(counters.COUNTER_FOR_MODEL[sender._meta.label], -1)
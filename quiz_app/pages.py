@@ -0,0 +1,54 @@
+from threading import Lock
+
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.template import Context
+from django.template.loader import get_template
+from django.template.loader_tags import ExtendsNode
+from django.utils.safestring import mark_safe
+
+
+# Renders the base layout around pre-rendered page content
+SHELL_TEMPLATE = 'static_page.html'
+
+
+class StaticPageCache:
+    """
+    Pre-rendered static pages, built once per process. Anonymous visitors
+    get the whole page from memory. The base layout's navigation depends on
+    the user, so signed-in visitors get the cached content block inside a
+    freshly rendered shell. Template edits are picked up when the process
+    restarts, which the development server does on its own.
+    """
+
+    def __init__(self):
+        self._content = {}
+        self._pages = {}
+        self._lock = Lock()
+
+    def content(self, template_name):
+        """The page's content block, rendered without a request"""
+        if template_name not in self._content:
+            with self._lock:
+                if template_name not in self._content:
+                    template = get_template(template_name).template
+                    extends = template.nodelist.get_nodes_by_type(ExtendsNode)[0]
+                    block = extends.blocks['content']
+                    self._content[template_name] = mark_safe(block.nodelist.render(Context(autoescape=True)))
+        return self._content[template_name]
+
+    def render(self, request, template_name):
+        if request.user.is_authenticated:
+            return render(request, SHELL_TEMPLATE, {'content': self.content(template_name)})
+        if template_name not in self._pages:
+            response = render(request, SHELL_TEMPLATE, {'content': self.content(template_name)})
+            self._pages[template_name] = response.content
+        return HttpResponse(self._pages[template_name])
+
+    def clear(self):
+        with self._lock:
+            self._content.clear()
+            self._pages.clear()
+
+
+static_pages = StaticPageCache()
@@ -0,0 +1,96 @@
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .sampling import bank_version
+
+
+FIELDS = (
+    'id', 'question_text', 'option1', 'option2', 'option3', 'option4',
+    'correct_option', 'category_id', 'difficulty', 'explanation',
+)
+CACHE_TTL = 60 * 60 * 24
+
+
+class CachedQuestion:
+    """Read-only question payload with the attribute names of Question"""
+    __slots__ = FIELDS
+
+    def __init__(self, values):
+        for field in FIELDS:
+            setattr(self, field, values[field])
+
+    def __repr__(self):
+        return f"<CachedQuestion {self.id}>"
+
+
+class QuestionCache:
+    """
+    Read-through question cache: a bounded per-process LRU in front of
+    Django's cache framework, in front of the database. Entries belong to the
+    question bank version, which Question save/delete bumps, so edits made
+    through add_question or the admin are not served once the version has
+    been re-read (see sampling.BankVersion); pass fresh=True to re-read it.
+    """
+
+    def __init__(self, max_entries=None, backend=None, bank=None):
+        self.max_entries = max_entries
+        self.backend = backend or cache
+        self.bank = bank or bank_version
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def _limit(self):
+        return self.max_entries or getattr(settings, 'QUESTION_CACHE_MAX_ENTRIES', 5000)
+
+    def _cache_key(self, version, pk):
+        return f'quiz_app:question:{version}:{pk}'
+
+    def get_many(self, ids, fresh=False):
+        """Return payloads for `ids` in the same order, skipping unknown IDs"""
+        from .models import Question
+
+        version = self.bank.get(fresh=fresh)
+        found = {}
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            for pk in ids:
+                entry = self._entries.get(pk)
+                if entry is not None:
+                    self._entries.move_to_end(pk)
+                    found[pk] = entry
+
+        missing = [pk for pk in ids if pk not in found]
+        if missing:
+            keys = {self._cache_key(version, pk): pk for pk in missing}
+            for key, values in self.backend.get_many(list(keys)).items():
+                found[keys[key]] = CachedQuestion(values)
+
+            missing = [pk for pk in missing if pk not in found]
+            if missing:
+                rows = list(Question.objects.filter(id__in=missing).values(*FIELDS))
+                self.backend.set_many({self._cache_key(version, row['id']): row for row in rows}, CACHE_TTL)
+                for row in rows:
+                    found[row['id']] = CachedQuestion(row)
+
+            with self._lock:
+                if version == self.version:
+                    for pk in ids:
+                        if pk in found:
+                            self._entries[pk] = found[pk]
+                    while len(self._entries) > self._limit():
+                        self._entries.popitem(last=False)
+
+        return [found[pk] for pk in ids if pk in found]
+
+
+question_cache = QuestionCache()
+
+
+def get_questions(ids, fresh=False):
+    return question_cache.get_many(ids, fresh=fresh)
@@ -0,0 +1,254 @@
+from datetime import datetime, time, timedelta
+from functools import reduce
+from operator import or_
+
+from django.core import signing
+from django.db import transaction
+from django.db.models import Count, DateField, F, Max, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+def add_score(user, points):
+    """
+    Add `points` to a user's leaderboard score with one F() UPDATE,
+    provisioning the row on their first score. Only the user's own row is
+    written; positions are counted when a page is read (position_in).
+    """
+    from .models import Leaderboard
+
+    changes = {'score': F('score') + points, 'updated_at': timezone.now()}
+    with transaction.atomic():
+        if not Leaderboard.objects.filter(user=user).update(**changes):
+            Leaderboard.objects.bulk_create([Leaderboard(user=user)], ignore_conflicts=True)
+            Leaderboard.objects.filter(user=user).update(**changes)
+
+
+# Windowed leaderboards: per-user score buckets for each day, week and month
+PERIODS = ('day', 'week', 'month')
+
+# Buckets whose period started before today minus this are dropped by compaction
+BUCKET_RETENTION = {
+    'day': timedelta(days=35),
+    'week': timedelta(weeks=8),
+    'month': timedelta(days=366),
+}
+
+def period_start(period, day):
+    """First day of the day, week (Monday-based) or month containing `day`"""
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def add_period_scores(user, points, day=None):
+    """
+    Add `points` to the user's day, week and month buckets with one F()
+    UPDATE. The three buckets are always created together, so the UPDATE
+    touches all of them or none; on the first points of a period they are
+    provisioned with ignore_conflicts and the UPDATE repeated.
+    """
+    from .models import ScoreBucket
+
+    if points <= 0:
+        return
+    day = day or timezone.localdate()
+    now = timezone.now()
+    starts = {period: period_start(period, day) for period in PERIODS}
+    buckets = ScoreBucket.objects.filter(user=user).filter(
+        reduce(or_, (Q(period=period, start=start) for period, start in starts.items()))
+    )
+    changes = {'score': F('score') + points, 'updated_at': now}
+    with transaction.atomic():
+        if not buckets.update(**changes):
+            ScoreBucket.objects.bulk_create(
+                [ScoreBucket(user=user, period=period, start=start, updated_at=now) for period, start in starts.items()],
+                ignore_conflicts=True,
+            )
+            buckets.update(**changes)
+
+
+def compact_score_buckets(today=None, batch_size=1000):
+    """Delete buckets older than their retention window; returns how many were removed"""
+    from .models import ScoreBucket
+
+    today = today or timezone.localdate()
+    expired = ScoreBucket.objects.filter(reduce(or_, (
+        Q(period=period, start__lt=period_start(period, today - retention))
+        for period, retention in BUCKET_RETENTION.items()
+    )))
+    removed = 0
+    while True:
+        ids = list(expired.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return removed
+        removed += ScoreBucket.objects.filter(id__in=ids).delete()[0]
+
+
+def rebuild_score_buckets(today=None, batch_size=1000):
+    """
+    Recompute the buckets still inside their retention window from quiz
+    results and daily-question answers, a range of user IDs at a time: each
+    range's buckets are deleted and rewritten in their own transaction, so
+    the rest of the board stays readable and no transaction grows with the
+    table. Returns the number of buckets written.
+    """
+    from django.contrib.auth.models import User
+    from .models import QuizResult, ScoreBucket, UserAnswer
+
+    today = today or timezone.localdate()
+    oldest = min(period_start(period, today - retention) for period, retention in BUCKET_RETENTION.items())
+    # A datetime bound rather than __date, so the timestamp indexes can be used
+    since = timezone.make_aware(datetime.combine(oldest, time.min))
+    truncate = {
+        'day': TruncDate,
+        'week': lambda field: TruncWeek(field, output_field=DateField()),
+        'month': lambda field: TruncMonth(field, output_field=DateField()),
+    }
+    sources = [
+        (QuizResult.objects.filter(completed_at__gte=since), 'completed_at', Sum('score')),
+        (UserAnswer.objects.filter(quiz_result=None, is_correct=True, answered_at__gte=since),
+         'answered_at', Count('id')),
+    ]
+
+    written = 0
+    user_ids = User.objects.order_by('id').values_list('id', flat=True)
+    last_id = 0
+    while True:
+        chunk = list(user_ids.filter(id__gt=last_id)[:batch_size])
+        if not chunk:
+            return written
+        first_id, last_id = last_id + 1, chunk[-1]
+        with transaction.atomic():
+            ScoreBucket.objects.filter(user_id__gte=first_id, user_id__lte=last_id).delete()
+            totals = {}
+            for queryset, field, points in sources:
+                rows = queryset.filter(user_id__gte=first_id, user_id__lte=last_id)
+                for period in PERIODS:
+                    grouped = rows.annotate(start=truncate[period](field)).values_list('user_id', 'start').annotate(
+                        points=points, last=Max(field),
+                    ).order_by()
+                    for user_id, start, total, last in grouped:
+                        key = (user_id, period, start)
+                        score, updated_at = totals.get(key, (0, last))
+                        totals[key] = (score + (total or 0), max(updated_at, last))
+            written += len(ScoreBucket.objects.bulk_create([
+                ScoreBucket(user_id=user_id, period=period, start=start, score=score, updated_at=updated_at)
+                for (user_id, period, start), (score, updated_at) in totals.items()
+                if score > 0 and start >= period_start(period, today - BUCKET_RETENTION[period])
+            ], batch_size=batch_size))
+
+
+# Leaderboard pages: keyset pagination over any board queryset of rows with
+# score, updated_at and id: highest score first, earlier achievers win ties
+PAGE_SIZE = 20
+BOARD_ORDER = ['-score', 'updated_at', 'id']
+REVERSE_BOARD_ORDER = ['score', '-updated_at', '-id']
+CURSOR_SALT = 'quiz_app.leaderboard'
+
+
+def board(period='all', day=None):
+    """The all-time Leaderboard rows, or the score buckets of the period containing `day`"""
+    from .models import Leaderboard, ScoreBucket
+
+    if period in PERIODS:
+        return ScoreBucket.objects.filter(period=period, start=period_start(period, day or timezone.localdate()))
+    return Leaderboard.objects.all()
+
+
+def _ahead(queryset, score, updated_at, pk):
+    """Rows that sort before (score, updated_at, pk); score__gte keeps it an index range"""
+    return queryset.filter(score__gte=score).filter(
+        Q(score__gt=score) | Q(score=score, updated_at__lt=updated_at) | Q(score=score, updated_at=updated_at, id__lt=pk)
+    )
+
+
+def _behind(queryset, score, updated_at, pk):
+    """Rows that sort after (score, updated_at, pk)"""
+    return queryset.filter(score__lte=score).filter(
+        Q(score__lt=score) | Q(score=score, updated_at__gt=updated_at) | Q(score=score, updated_at=updated_at, id__gt=pk)
+    )
+
+
+def position_in(queryset, entry):
+    """
+    An entry's 1-based position on a board: a single COUNT of the rows with
+    a better (score, updated_at, id), answered from the score index range
+    above the entry rather than by ranking the whole table.
+    """
+    return _ahead(queryset, entry.score, entry.updated_at, entry.pk).count() + 1
+
+
+def encode_cursor(entry):
+    return signing.dumps(
+        [entry.score, entry.updated_at.isoformat(), entry.pk, entry.position], salt=CURSOR_SALT, compress=True
+    )
+
+
+def decode_cursor(value):
+    """(score, updated_at, id, position) from a cursor, or None if it is missing or was tampered with"""
+    if not value:
+        return None
+    try:
+        score, updated_at, pk, position = signing.loads(value, salt=CURSOR_SALT)
+        return int(score), parse_datetime(updated_at), int(pk), int(position)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+
+class BoardPage:
+    """A page of board rows with `position` set, plus cursors for its neighbours"""
+
+    def __init__(self, entries, first_position, has_previous, has_next):
+        self.entries = entries
+        for position, entry in enumerate(entries, start=first_position):
+            entry.position = position
+        self.previous_cursor = encode_cursor(entries[0]) if has_previous and entries else None
+        self.next_cursor = encode_cursor(entries[-1]) if has_next and entries else None
+
+
+def board_page(queryset, after=None, before=None, size=PAGE_SIZE):
+    """
+    The page after or before a cursor, or the first page. Each is one query
+    with users joined, reading one row past the page to tell whether there
+    is more.
+    """
+    rows = queryset.select_related('user')
+    before, after = decode_cursor(before), decode_cursor(after)
+    if before:
+        score, updated_at, pk, position = before
+        entries = list(_ahead(rows, score, updated_at, pk).order_by(*REVERSE_BOARD_ORDER)[:size + 1])
+        has_previous = len(entries) > size
+        entries = entries[:size][::-1]
+        return BoardPage(entries, position - len(entries), has_previous, True)
+    if after:
+        score, updated_at, pk, position = after
+        entries = list(_behind(rows, score, updated_at, pk).order_by(*BOARD_ORDER)[:size + 1])
+        return BoardPage(entries[:size], position + 1, True, len(entries) > size)
+    entries = list(rows.order_by(*BOARD_ORDER)[:size + 1])
+    return BoardPage(entries[:size], 1, False, len(entries) > size)
+
+
+def page_around(queryset, user, size=PAGE_SIZE):
+    """
+    The page with `user` in the middle, or None when they are not on the
+    board. Costs the user's row, one COUNT for their position, and one
+    query for the rows on each side.
+    """
+    entry = queryset.filter(user=user).first()
+    if entry is None:
+        return None
+    position = position_in(queryset, entry)
+    rows = queryset.select_related('user')
+    key = (entry.score, entry.updated_at, entry.pk)
+
+    ahead = list(_ahead(rows, *key).order_by(*REVERSE_BOARD_ORDER)[:size // 2 + 1])
+    has_previous = len(ahead) > size // 2
+    ahead = ahead[:size // 2][::-1]
+    behind = list(_behind(rows, *key).order_by(*BOARD_ORDER)[:size - len(ahead)])
+    entry.user = user
+    entries = ahead + [entry] + behind[:size - len(ahead) - 1]
+    return BoardPage(entries, position - len(ahead), has_previous, len(behind) > size - len(ahead) - 1)
@@ -0,0 +1,218 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+
+# Set on responses to requests that wrote; while present, reads go to the primary
+PIN_COOKIE = 'quiz_db_pin'
+
+# Always read from the primary: a session created at login must not be missed through replica lag
+PRIMARY_ONLY_APPS = {'sessions'}
+
+
+class RoutingState:
+    """Per-request routing: the alias reads go to, and whether the request has written"""
+    __slots__ = ('read_alias', 'wrote')
+
+    def __init__(self):
+        self.read_alias = None
+        self.wrote = False
+
+
+# Holds a mutable state object rather than flags, so changes made on
+# sync_to_async threads are seen by the request that started them
+_state = ContextVar('quiz_app_db_routing', default=None)
+
+_unavailable_until = {}
+
+
+def replica_alias():
+    """The configured read replica alias, or None when reads all go to the primary"""
+    alias = getattr(settings, 'QUIZ_READ_REPLICA', None)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def mark_unavailable(alias):
+    _unavailable_until[alias] = time.monotonic() + getattr(settings, 'QUIZ_REPLICA_RETRY_SECONDS', 30)
+
+
+def replica_available(alias):
+    """Connect to the replica unless it failed recently; a failure keeps it out of rotation for a while"""
+    if time.monotonic() < _unavailable_until.get(alias, 0):
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        mark_unavailable(alias)
+        return False
+    return True
+
+
+def replica_failed(alias):
+    """After a database error in a routed view: True, and out of rotation, if the replica is the one that broke"""
+    connection = connections[alias]
+    try:
+        usable = connection.connection is not None and connection.is_usable()
+    except DatabaseError:
+        usable = False
+    if not usable:
+        connection.close()
+        mark_unavailable(alias)
+    return not usable
+
+
+def read_alias_for(request):
+    alias = replica_alias()
+    if alias is None or PIN_COOKIE in request.COOKIES or not replica_available(alias):
+        return None
+    return alias
+
+
+@contextmanager
+def routed_reads(alias):
+    """Send reads in this block to `alias`, unless the request writes first"""
+    state = _state.get()
+    token = None
+    if state is None:
+        state = RoutingState()
+        token = _state.set(state)
+    previous, state.read_alias = state.read_alias, alias
+    try:
+        yield state
+    finally:
+        state.read_alias = previous
+        if token is not None:
+            _state.reset(token)
+
+
+def _routed_stream(content, alias):
+    # Streamed bodies are consumed after the view returns; route each chunk's reads
+    iterator = iter(content)
+    while True:
+        with routed_reads(alias):
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+        yield chunk
+
+
+def read_from_replica(view):
+    """
+    Route a read-only view's queries to the replica. Clients pinned to the
+    primary by ReplicaPinMiddleware, and every request while the replica is
+    unreachable, read from the primary instead. If the replica breaks during
+    the view, the view runs again against the primary.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            alias = await sync_to_async(read_alias_for)(request)
+            if alias is None:
+                return await view(request, *args, **kwargs)
+            try:
+                with routed_reads(alias):
+                    return await view(request, *args, **kwargs)
+            except DatabaseError:
+                if not await sync_to_async(replica_failed)(alias):
+                    raise
+            return await view(request, *args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        alias = read_alias_for(request)
+        if alias is None:
+            return view(request, *args, **kwargs)
+        try:
+            with routed_reads(alias):
+                response = view(request, *args, **kwargs)
+        except DatabaseError:
+            if not replica_failed(alias):
+                raise
+            return view(request, *args, **kwargs)
+        if response.streaming:
+            response.streaming_content = _routed_stream(response.streaming_content, alias)
+        return response
+
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Writes always go to the primary. Reads go to the replica only inside
+    read_from_replica views, and only until the request writes or opens a
+    transaction on the primary, so a request always reads its own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.read_alias is None:
+            return None
+        if state.wrote or model._meta.app_label in PRIMARY_ONLY_APPS or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.read_alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        # Explicit, so an object loaded from the replica is still saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReplicaPinMiddleware:
+    """
+    Track whether each request writes. A response to a request that wrote
+    pins the client to the primary for QUIZ_REPLICA_PIN_SECONDS, so the page
+    it redirects to, such as the result after submitting a quiz, reads the
+    new rows even if the replica lags behind.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(response, state)
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(response, state)
+
+    def pin(self, response, state):
+        if state.wrote and replica_alias() is not None:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=getattr(settings, 'QUIZ_REPLICA_PIN_SECONDS', 10),
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,160 @@
+import random
+import time
+from array import array
+from threading import Lock
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F
+
+
+class BankVersion:
+    """
+    The question bank version, kept in a SiteCounter row so every process
+    agrees on it whichever cache backend is configured. A process re-reads
+    the row at most every QUIZ_BANK_VERSION_TTL seconds, so edits made by
+    another process are seen within that window, and edits made by this
+    process at once. Callers that must not act on a stale question, such as
+    grading, pass fresh=True.
+    """
+
+    NAME = 'question_bank_version'
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._value = None
+        self._read_at = 0.0
+
+    def _ttl(self):
+        return self.ttl if self.ttl is not None else getattr(settings, 'QUIZ_BANK_VERSION_TTL', 2)
+
+    def _rows(self):
+        from .models import SiteCounter
+
+        # Always the primary: a lagging replica would hand back an old version
+        return SiteCounter.objects.using(DEFAULT_DB_ALIAS).filter(name=self.NAME)
+
+    def _load(self):
+        from .models import SiteCounter
+
+        value = self._rows().values_list('value', flat=True).first()
+        if value is None:
+            # Start from a random value: restarting at a fixed one after the
+            # row is lost could match a stale per-process index
+            SiteCounter.objects.using(DEFAULT_DB_ALIAS).bulk_create(
+                [SiteCounter(name=self.NAME, value=_initial_version())], ignore_conflicts=True
+            )
+            value = self._rows().values_list('value', flat=True).first()
+        return value
+
+    def get(self, fresh=False):
+        now = time.monotonic()
+        if fresh or self._value is None or now - self._read_at >= self._ttl():
+            self._value, self._read_at = self._load(), now
+        return self._value
+
+    def bump(self):
+        if not self._rows().update(value=F('value') + 1):
+            self._load()
+        self.reset()
+
+    def reset(self):
+        """Forget the value this process last read"""
+        self._value = None
+
+
+bank_version = BankVersion()
+
+
+def _initial_version():
+    return random.randint(1, 2 ** 31)
+
+
+def get_bank_version(fresh=False):
+    """Return the current question bank version"""
+    return bank_version.get(fresh=fresh)
+
+
+def bump_bank_version():
+    """Invalidate every per-process question index and cached payload"""
+    bank_version.bump()
+
+
+class QuestionIndex:
+    """
+    Compact per-process index of question primary keys, bucketed by
+    (category_id, difficulty). Each bucket is an array('q') so a million
+    questions cost about 8 MB instead of a million hydrated model instances.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.buckets = {}
+        self._lock = Lock()
+
+    def build(self, rows):
+        """Fill the index from an iterable of (id, category_id, difficulty) rows"""
+        buckets = {}
+        for pk, category_id, difficulty in rows:
+            bucket = buckets.get((category_id, difficulty))
+            if bucket is None:
+                bucket = buckets[(category_id, difficulty)] = array('q')
+            bucket.append(pk)
+        self.buckets = buckets
+
+    def refresh(self):
+        """Reload the index if the question bank version has changed"""
+        from .models import Question
+
+        version = get_bank_version()
+        if version == self.version:
+            return
+        with self._lock:
+            if version == self.version:
+                return
+            rows = Question.objects.values_list('id', 'category_id', 'difficulty').iterator(chunk_size=5000)
+            self.build(rows)
+            self.version = version
+
+    def draw(self, count, categories=None, difficulty=None):
+        """Draw up to `count` distinct random IDs from the matching buckets"""
+        buckets = [
+            ids for (category_id, bucket_difficulty), ids in self.buckets.items()
+            if (not categories or category_id in categories)
+            and (not difficulty or difficulty == 'all' or bucket_difficulty == difficulty)
+        ]
+        total = sum(len(ids) for ids in buckets)
+        positions = sorted(random.sample(range(total), min(count, total)))
+
+        # Walk the buckets once, translating global positions into IDs
+        picked = []
+        offset = 0
+        bucket_iter = iter(buckets)
+        ids = next(bucket_iter, None)
+        for position in positions:
+            while position >= offset + len(ids):
+                offset += len(ids)
+                ids = next(bucket_iter)
+            picked.append(ids[position - offset])
+
+        random.shuffle(picked)
+        return picked
+
+    def sample_ids(self, count, categories=None, difficulty=None):
+        self.refresh()
+        return self.draw(count, categories=categories, difficulty=difficulty)
+
+
+question_index = QuestionIndex()
+
+
+def sample_questions(count, categories=None, difficulty=None):
+    """
+    Return up to `count` random questions, optionally restricted to a set of
+    category IDs and a difficulty. Payloads come from the question cache,
+    which falls back to a single `id__in` query for cache misses.
+    """
+    from .question_cache import get_questions
+
+    ids = question_index.sample_ids(count, categories=set(categories or ()), difficulty=difficulty)
+    return get_questions(ids)
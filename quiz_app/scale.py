@@ -0,0 +1,272 @@
+import math
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from . import counters
+from .importing import question_content_hash
+from .sampling import bank_version, bump_bank_version
+
+
+# Named data sizes shared by seed_scale and the benchmark commands
+PRESETS = {
+    'tiny': {'categories': 5, 'questions': 200, 'users': 20, 'results_per_user': 3, 'answers_per_result': 10},
+    'small': {'categories': 10, 'questions': 1000, 'users': 100, 'results_per_user': 5, 'answers_per_result': 20},
+    'medium': {'categories': 20, 'questions': 10000, 'users': 1000, 'results_per_user': 10, 'answers_per_result': 20},
+    'large': {'categories': 30, 'questions': 100000, 'users': 10000, 'results_per_user': 10, 'answers_per_result': 50},
+    'xlarge': {'categories': 50, 'questions': 1000000, 'users': 100000, 'results_per_user': 10, 'answers_per_result': 50},
+}
+
+DIFFICULTIES = ['easy', 'medium', 'hard']
+SEED_PASSWORD = 'quizmaster-seed'
+
+
+class ScaleSeeder:
+    """
+    Bulk-generates categories, questions, users, quiz results and answers.
+
+    Everything goes through bulk_create in large batches; the derived tables
+    that signals or the submission pipeline would normally maintain
+    (UserProgress, Leaderboard, category stats, score buckets, site
+    counters) are filled in directly so the generated data is internally
+    consistent.
+    """
+
+    def __init__(self, batch_size=5000, seed=None, log=None):
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.log = log or (lambda message: None)
+
+    def seed(self, categories, questions, users, results_per_user, answers_per_result, username_prefix='seed'):
+        from .ranking import rebuild_score_buckets
+        from .stats import rebuild_category_stats
+
+        started = time.monotonic()
+        category_ids = self.create_categories(categories)
+        question_ids = self.create_questions(questions, category_ids)
+        user_ids = self.create_users(users, username_prefix)
+        result_count, answer_count = self.create_history(user_ids, question_ids, results_per_user, answers_per_result)
+
+        rebuild_category_stats(batch_size=self.batch_size)
+        rebuild_score_buckets(batch_size=self.batch_size)
+        counters.reconcile()
+        self.log(f"Rebuilt rollups in {time.monotonic() - started:.1f}s total")
+        return {
+            'categories': len(category_ids),
+            'questions': len(question_ids),
+            'users': len(user_ids),
+            'results': result_count,
+            'answers': answer_count,
+        }
+
+    def create_categories(self, count):
+        from .models import Category
+
+        existing = Category.objects.count()
+        Category.objects.bulk_create(
+            [Category(name=f"Category {existing + i + 1}") for i in range(count)], batch_size=self.batch_size
+        )
+        return list(Category.objects.values_list('id', flat=True))
+
+    def create_questions(self, count, category_ids):
+        from .models import Question
+
+        started = time.monotonic()
+        offset = Question.objects.count()
+        for start in range(0, count, self.batch_size):
+            batch = []
+            for i in range(start, min(start + self.batch_size, count)):
+                text = f"Generated question {offset + i + 1}: which option is correct?"
+                options = [f"Answer {offset + i + 1}-{n}" for n in range(1, 5)]
+                batch.append(Question(
+                    question_text=text,
+                    option1=options[0], option2=options[1], option3=options[2], option4=options[3],
+                    correct_option=self.random.randint(1, 4),
+                    category_id=self.random.choice(category_ids) if category_ids else None,
+                    difficulty=self.random.choice(DIFFICULTIES),
+                    explanation="Generated for load testing.",
+                    content_hash=question_content_hash(text, *options),
+                ))
+            Question.objects.bulk_create(batch)
+        transaction.on_commit(bump_bank_version)
+        self.log(f"Created {count:,} questions in {time.monotonic() - started:.1f}s")
+        return list(Question.objects.values_list('id', flat=True))
+
+    def create_users(self, count, username_prefix):
+        from .models import Leaderboard, UserProgress
+
+        started = time.monotonic()
+        password = make_password(SEED_PASSWORD)
+        offset = User.objects.filter(username__startswith=username_prefix).count()
+        user_ids = []
+        for start in range(0, count, self.batch_size):
+            usernames = [f"{username_prefix}{offset + i + 1}" for i in range(start, min(start + self.batch_size, count))]
+            User.objects.bulk_create([
+                User(username=username, email=f"{username}@example.com", password=password) for username in usernames
+            ])
+            chunk = list(User.objects.filter(username__in=usernames).values_list('id', flat=True))
+            UserProgress.objects.bulk_create([UserProgress(user_id=pk) for pk in chunk])
+            Leaderboard.objects.bulk_create([Leaderboard(user_id=pk) for pk in chunk], ignore_conflicts=True)
+            user_ids.extend(chunk)
+        self.log(f"Created {count:,} users in {time.monotonic() - started:.1f}s")
+        return user_ids
+
+    def create_history(self, user_ids, question_ids, results_per_user, answers_per_result):
+        from .models import Leaderboard, QuizResult, UserAnswer, UserProgress
+
+        started = time.monotonic()
+        now = timezone.now()
+        result_count = answer_count = 0
+        answers_per_result = min(answers_per_result, len(question_ids))
+
+        for start in range(0, len(user_ids), max(1, self.batch_size // max(1, results_per_user))):
+            chunk = user_ids[start:start + max(1, self.batch_size // max(1, results_per_user))]
+            results = []
+            planned = []
+            for user_id in chunk:
+                for attempt in range(results_per_user):
+                    picked = self.random.sample(question_ids, answers_per_result)
+                    correct = [self.random.random() < 0.65 for _ in picked]
+                    results.append(QuizResult(
+                        user_id=user_id,
+                        score=sum(correct),
+                        total_questions=answers_per_result,
+                        time_taken=self.random.randint(30, 1800),
+                        quiz_type='standard',
+                    ))
+                    planned.append((user_id, picked, correct))
+
+            with transaction.atomic():
+                results = QuizResult.objects.bulk_create(results)
+                if results and results[0].pk is None:
+                    # Backends without RETURNING: read the new IDs back in insertion order
+                    ids = list(QuizResult.objects.filter(user_id__in=chunk).order_by('id').values_list('id', flat=True))
+                    for result, pk in zip(results, ids[-len(results):]):
+                        result.pk = pk
+
+                # Spread attempts over the last 90 days
+                completed = [now - timedelta(minutes=self.random.randint(0, 90 * 24 * 60)) for _ in results]
+                for result, completed_at in zip(results, completed):
+                    result.completed_at = completed_at
+                QuizResult.objects.bulk_update(results, ['completed_at'], batch_size=self.batch_size)
+
+                answers = []
+                progress = {}
+                for result, (user_id, picked, correct) in zip(results, planned):
+                    for question_id, is_correct in zip(picked, correct):
+                        answers.append(UserAnswer(
+                            user_id=user_id, question_id=question_id, quiz_result_id=result.pk,
+                            selected_option=self.random.randint(1, 4), is_correct=is_correct,
+                        ))
+                    attempts, answered, right, ratio_sum = progress.get(user_id, (0, 0, 0, 0.0))
+                    progress[user_id] = (
+                        attempts + 1, answered + len(picked), right + sum(correct),
+                        ratio_sum + (sum(correct) / len(picked) if picked else 0),
+                    )
+                UserAnswer.objects.bulk_create(answers, batch_size=self.batch_size)
+                # auto_now_add stamped every answer with "now"; align them with their result
+                UserAnswer.objects.filter(quiz_result_id__in=[r.pk for r in results]).update(
+                    answered_at=Subquery(QuizResult.objects.filter(pk=OuterRef('quiz_result_id')).values('completed_at')[:1])
+                )
+
+                progress_rows = list(UserProgress.objects.filter(user_id__in=progress))
+                for row in progress_rows:
+                    attempts, answered, right, ratio_sum = progress[row.user_id]
+                    row.total_attempts = attempts
+                    row.questions_answered = answered
+                    row.correct_answers = right
+                    row.score_ratio_sum = ratio_sum
+                    row.average_score = ratio_sum / attempts if attempts else 0
+                UserProgress.objects.bulk_update(
+                    progress_rows,
+                    ['total_attempts', 'questions_answered', 'correct_answers', 'score_ratio_sum', 'average_score'],
+                    batch_size=self.batch_size,
+                )
+                leaders = list(Leaderboard.objects.filter(user_id__in=progress))
+                for leader in leaders:
+                    leader.score = progress[leader.user_id][2]
+                Leaderboard.objects.bulk_update(leaders, ['score'], batch_size=self.batch_size)
+
+            result_count += len(results)
+            answer_count += len(answers)
+
+        self.log(f"Created {result_count:,} results and {answer_count:,} answers in {time.monotonic() - started:.1f}s")
+        return result_count, answer_count
+
+
+def summarize(samples):
+    """p50/p95/mean/max of a list of timings, as used in benchmark reports"""
+    if not samples:
+        return {'p50': None, 'p95': None, 'mean': None, 'max': None}
+    ordered = sorted(samples)
+    return {
+        'p50': round(statistics.median(ordered), 3),
+        'p95': round(ordered[max(0, math.ceil(len(ordered) * 0.95) - 1)], 3),
+        'mean': round(statistics.fmean(ordered), 3),
+        'max': round(ordered[-1], 3),
+    }
+
+
+def git_commit():
+    """Short hash of the checked-out commit, to tag benchmark reports"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextmanager
+def benchmark_database():
+    """
+    Run the body against a throwaway test database. SQLite gets a temporary
+    file rather than the usual in-memory database so background job threads
+    and concurrent requests see the same data.
+    """
+    from . import jobs
+
+    temp_path = None
+    if connection.vendor == 'sqlite':
+        handle, temp_path = tempfile.mkstemp(prefix='quizmaster-bench-', suffix='.sqlite3')
+        os.close(handle)
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = temp_path
+        connection.settings_dict.setdefault('OPTIONS', {}).setdefault('timeout', 20)
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        jobs.flush()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def reseed(preset, seed=None, log=None):
+    """Empty the database and caches, then seed it at `preset` size"""
+    from .metrics import registry
+
+    call_command('flush', interactive=False, verbosity=0)
+    cache.clear()
+    # The flush dropped the bank version row along with the questions
+    bank_version.reset()
+    registry.reset()
+    return ScaleSeeder(seed=seed, log=log).seed(**PRESETS[preset])
@@ -0,0 +1,107 @@
+from django.db import transaction
+from django.db.models import Count, F, Max, Q
+from django.utils import timezone
+
+
+def record_answers(user, answers, question_categories=None):
+    """
+    Fold freshly created UserAnswer rows into the user's per-category stats.
+    Answers are grouped in Python, so the cost is a few queries per category
+    touched by the quiz rather than a re-aggregation of the answer history.
+    `question_categories` maps question ID to category ID when the caller
+    already has it; otherwise it is read from `answer.question`.
+    """
+    from .models import UserCategoryStats
+
+    totals = {}
+    for answer in answers:
+        if question_categories is not None:
+            category_id = question_categories.get(answer.question_id)
+        else:
+            category_id = answer.question.category_id
+        if category_id is None:
+            continue
+        attempted, correct = totals.get(category_id, (0, 0))
+        totals[category_id] = (attempted + 1, correct + (1 if answer.is_correct else 0))
+    if not totals:
+        return
+
+    answered_at = max((answer.answered_at for answer in answers if answer.answered_at), default=None) or timezone.now()
+    with transaction.atomic():
+        UserCategoryStats.objects.bulk_create(
+            [UserCategoryStats(user=user, category_id=category_id) for category_id in totals],
+            ignore_conflicts=True,
+        )
+        for category_id, (attempted, correct) in totals.items():
+            UserCategoryStats.objects.filter(user=user, category_id=category_id).update(
+                attempted=F('attempted') + attempted,
+                correct=F('correct') + correct,
+                last_answered=answered_at,
+            )
+
+
+def record_quiz_stats(user, score, total_questions):
+    """
+    Add one graded attempt to the user's progress counters, leaderboard
+    score and day/week/month score buckets. Every counter is bumped with
+    F() expressions in a single UPDATE inside one transaction, so concurrent
+    submissions from the same user cannot overwrite each other. Returns the
+    refreshed UserProgress.
+    """
+    from .models import UserProgress
+    from .ranking import add_period_scores, add_score
+
+    ratio = score / total_questions if total_questions else 0.0
+    changes = {
+        # Listed first: MySQL evaluates SET assignments left to right, so this
+        # must read the counters before they are incremented below
+        'average_score': (F('score_ratio_sum') + ratio) / (F('total_attempts') + 1),
+        'total_attempts': F('total_attempts') + 1,
+        'questions_answered': F('questions_answered') + total_questions,
+        'correct_answers': F('correct_answers') + score,
+        'score_ratio_sum': F('score_ratio_sum') + ratio,
+    }
+    with transaction.atomic():
+        if not UserProgress.objects.filter(user=user).update(**changes):
+            # First graded answer: provision the row; ignore_conflicts makes a
+            # concurrent first submission harmless
+            UserProgress.objects.bulk_create([UserProgress(user=user)], ignore_conflicts=True)
+            UserProgress.objects.filter(user=user).update(**changes)
+        add_score(user, score)
+        add_period_scores(user, score)
+        return UserProgress.objects.get(user=user)
+
+
+def rebuild_category_stats(user_ids=None, batch_size=1000):
+    """Recompute the stats table from the full answer history"""
+    from .models import UserAnswer, UserCategoryStats
+
+    answers = UserAnswer.objects.exclude(question__category=None)
+    existing = UserCategoryStats.objects.all()
+    if user_ids:
+        answers = answers.filter(user_id__in=user_ids)
+        existing = existing.filter(user_id__in=user_ids)
+
+    rows = answers.values('user_id', 'question__category_id').annotate(
+        attempted=Count('id'),
+        correct=Count('id', filter=Q(is_correct=True)),
+        last_answered=Max('answered_at'),
+    ).order_by()
+
+    created = 0
+    with transaction.atomic():
+        existing.delete()
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(UserCategoryStats(
+                user_id=row['user_id'],
+                category_id=row['question__category_id'],
+                attempted=row['attempted'],
+                correct=row['correct'],
+                last_answered=row['last_answered'],
+            ))
+            if len(batch) >= batch_size:
+                created += len(UserCategoryStats.objects.bulk_create(batch))
+                batch = []
+        created += len(UserCategoryStats.objects.bulk_create(batch))
+    return created
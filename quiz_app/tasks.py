@@ -0,0 +1,23 @@
+from .jobs import register
+from .achievements import ANSWER_RECORDED, QUIZ_COMPLETED, evaluate
+from .stats import record_quiz_stats
+from .ml_utils import score_users
+
+
+@register('quiz_submitted')
+def process_quiz_submission(job):
+    """Update progress, leaderboard and achievements after a graded quiz"""
+    user = job.user
+
+    # Update progress counters and leaderboard score atomically
+    user_progress = record_quiz_stats(user, job.payload['score'], job.payload['total_questions'])
+
+    # Refresh the stored effort recommendation the result page reads
+    score_users(user_ids=[user.id])
+
+    # Check for new achievements against the counters we already hold
+    new_achievements = evaluate(
+        user, [QUIZ_COMPLETED, ANSWER_RECORDED], user_progress=user_progress,
+        quiz_score=job.payload['score'], quiz_total=job.payload['total_questions'],
+    )
+    return {'new_achievements': [achievement.name for achievement in new_achievements]}
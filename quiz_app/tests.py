@@ -1,3 +1,1530 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+from importlib import import_module
+from datetime import timedelta
+from unittest import addModuleCleanup, mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+
+from django.conf import settings
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.db import OperationalError, close_old_connections, connection, connections, transaction
+from django.http import HttpResponse
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.core import serializers
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Achievement, UserAchievement, Category, SiteCounter, DailyQuestion, EffortRecommendation, ScoreBucket, Question, QuizAttempt, QuizResult, UserAnswer, UserProgress, Leaderboard, UserCategoryStats
+from .stats import rebuild_category_stats, record_answers, record_quiz_stats
+from .daily import get_daily_question, rotation_for, schedule_daily_questions
+from .adaptive import BankArrays, select_adaptive_ids
+from .ml_utils import conflict_target, save_effort_model, score_users, train_effort_model
+from .calibration import calibrate_questions
+from .ranking import board, compact_score_buckets, period_start, position_in, rebuild_score_buckets
+from .metrics import LATENCY_BUCKETS, MAX_VIEWS, MetricsRegistry, registry as metrics_registry
+from .fragments import question_fragments
+from .pages import static_pages
+from . import jobs, metrics, routing
+from .question_cache import QuestionCache
+from .sampling import BankVersion, QuestionIndex, bank_version, sample_questions
+from .counters import get_counters, reconcile
+from .achievements import ANSWER_RECORDED, QUIZ_COMPLETED, evaluate
+from .attempts import start_attempt
+from .importing import QuestionImporter, read_rows
+from .scale import ScaleSeeder, summarize
+from .management.commands import bench_views
+from .views import day_bounds
+
+
+def with_live_rank(queryset):
+    """Number board rows with a window function: the reference the keyset pages are checked against"""
+    return queryset.annotate(position=Window(RowNumber(), order_by=[F('score').desc(), F('updated_at'), F('id')]))
+
+
+def setUpModule():
+    # Views read from the primary unless a test routes them to the replica:
+    # the data tests create is only ever written to the primary
+    primary_reads = override_settings(QUIZ_READ_REPLICA=None)
+    primary_reads.enable()
+    addModuleCleanup(primary_reads.disable)
+
+
+def reset_caches():
+    """Empty the cache and re-read the bank version, whose row does not survive test rollbacks"""
+    cache.clear()
+    bank_version.reset()
+    bank_version.get()
+
+
+class SamplingTests(TestCase):
+    """Quizzes are drawn from the in-memory ID index, then fetched by primary key"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categories = Category.objects.bulk_create([Category(name=f"Category {i}") for i in range(3)])
+        Question.objects.bulk_create([
+            Question(question_text=f"Question {i}", option1='a', option2='b', option3='c', option4='d',
+                     correct_option=1, category=cls.categories[i % 3], difficulty=['easy', 'medium', 'hard'][i % 3 // 2])
+            for i in range(60)
+        ])
+
+    def setUp(self):
+        reset_caches()
+
+    def test_draws_are_distinct_and_respect_filters(self):
+        index = QuestionIndex()
+        index.build(Question.objects.values_list('id', 'category_id', 'difficulty'))
+        self.assertEqual(len(set(index.draw(40))), 40)
+        # Asking for more than the bank holds returns everything once
+        self.assertEqual(sorted(index.draw(500)), sorted(Question.objects.values_list('id', flat=True)))
+
+        category = self.categories[0]
+        expected = set(Question.objects.filter(category=category, difficulty='easy').values_list('id', flat=True))
+        self.assertEqual(set(index.draw(100, categories={category.id}, difficulty='easy')), expected)
+        self.assertEqual(len(index.draw(100, categories={category.id}, difficulty='all')), 20)
+        self.assertEqual(index.draw(5, categories={-1}), [])
+
+    def test_sampling_reads_only_the_drawn_rows_once_indexed(self):
+        sample_questions(10)
+        with CaptureQueriesContext(connection) as queries:
+            questions = sample_questions(10, categories=[self.categories[1].id])
+        self.assertEqual({question.category_id for question in questions}, {self.categories[1].id})
+        # At most the payloads missing from the cache, looked up by primary key
+        self.assertLessEqual(len(queries), 1)
+        self.assertTrue(all(re.search(r'WHERE \W*quiz_app_question\W*\.\W*id\W* IN \(', query['sql']) for query in queries),
+                        queries.captured_queries)
+
+    def test_index_follows_bank_edits(self):
+        sample_questions(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            added = Question.objects.create(question_text="Fresh", option1='a', option2='b', option3='c',
+                                            option4='d', correct_option=1, difficulty='hard')
+        self.assertEqual([question.id for question in sample_questions(5, difficulty='hard')], [added.id])
+
+
+class QuestionCacheTests(TestCase):
+    """Question payloads are shared by version, and edits reach every process"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.question = Question.objects.create(question_text="Cached", option1='a', option2='b', option3='c',
+                                               option4='d', correct_option=1)
+        cls.user = User.objects.create_user('cached-reader')
+
+    def setUp(self):
+        reset_caches()
+
+    def process(self, name, ttl=0):
+        """A question cache with its own cache backend and version memo, as another worker process has"""
+        return QuestionCache(backend=LocMemCache(name, {}), bank=BankVersion(ttl=ttl))
+
+    def test_edits_invalidate_other_processes(self):
+        first, second = self.process('process-a'), self.process('process-b', ttl=60)
+        for process in (first, second):
+            self.assertEqual(process.get_many([self.question.id])[0].correct_option, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Question.objects.filter(id=self.question.id).update(correct_option=3)
+            bank_version.bump()
+        self.assertEqual(first.get_many([self.question.id])[0].correct_option, 3)
+        # Within its memo window a process may serve the old payload, but not when asked for a fresh read
+        self.assertEqual(second.get_many([self.question.id])[0].correct_option, 1)
+        self.assertEqual(second.get_many([self.question.id], fresh=True)[0].correct_option, 3)
+
+    def test_warm_quiz_page_runs_no_question_queries(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('quiz'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('quiz'))
+        self.assertContains(response, 'Cached')
+        self.assertEqual([q['sql'] for q in queries if re.search(r'\bquiz_app_question\b', q['sql'])], [])
+
+
+class QueryPlanTests(TestCase):
+    """
+    EXPLAIN each hot query against seeded data and fail if the plan reads a
+    whole table instead of an index, or sorts rows the index should deliver
+    in order.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = Category.objects.bulk_create([Category(name=f"Category {i}") for i in range(5)])
+        Question.objects.bulk_create([
+            Question(
+                question_text=f"Question {i}", option1='a', option2='b', option3='c', option4='d',
+                correct_option=1, category=categories[i % 5], difficulty=['easy', 'medium', 'hard'][i % 3],
+            )
+            for i in range(200)
+        ])
+        cls.users = [User.objects.create_user(f'user{i}') for i in range(20)]
+        questions = list(Question.objects.all())
+        for user in cls.users:
+            for attempt in range(5):
+                result = QuizResult.objects.create(user=user, score=5, total_questions=10, time_taken=60)
+                UserAnswer.objects.bulk_create([
+                    UserAnswer(user=user, question=question, quiz_result=result, selected_option=1, is_correct=True)
+                    for question in questions[attempt * 10:(attempt + 1) * 10]
+                ])
+            UserCategoryStats.objects.bulk_create([
+                UserCategoryStats(user=user, category=category, attempted=10, correct=5) for category in categories
+            ])
+        Leaderboard.objects.filter(user__in=cls.users).update(score=5)
+        cls.user = cls.users[0]
+        cls.question = questions[0]
+        with connection.cursor() as cursor:
+            if connection.vendor in ('sqlite', 'postgresql', 'mysql'):
+                cursor.execute('ANALYZE' if connection.vendor != 'mysql' else 'ANALYZE TABLE quiz_app_useranswer')
+
+    def assertUsesIndex(self, queryset, table, ordered=False):
+        plan = queryset.explain()
+        vendor = connection.vendor
+        if vendor == 'sqlite':
+            full_scan = re.search(rf'\bSCAN {table}\b(?! USING (COVERING )?INDEX)', plan)
+            sorts = 'USE TEMP B-TREE FOR ORDER BY' in plan
+        elif vendor == 'mysql':
+            rows = [line.split('\t') for line in plan.splitlines()]
+            full_scan = any(len(row) > 4 and row[2] == table and row[4] == 'ALL' for row in rows)
+            sorts = 'Using filesort' in plan
+        elif vendor == 'postgresql':
+            full_scan = f'Seq Scan on {table}' in plan
+            sorts = bool(re.search(r'^\s*(->\s*)?Sort\b', plan, re.MULTILINE))
+        else:
+            self.skipTest(f"No plan checks for {vendor}")
+        self.assertFalse(full_scan, f"Full scan of {table}:\n{plan}")
+        if ordered:
+            self.assertFalse(sorts, f"Query on {table} sorts instead of reading an index in order:\n{plan}")
+
+    def test_daily_answer_lookup_uses_range_on_index(self):
+        start, end = day_bounds(timezone.now().date())
+        queryset = UserAnswer.objects.filter(
+            user=self.user, question=self.question, answered_at__gte=start, answered_at__lt=end
+        )
+        self.assertNotIn('django_datetime_cast_date', str(queryset.query))
+        self.assertUsesIndex(queryset, 'quiz_app_useranswer')
+
+    def test_review_answers_by_quiz_result(self):
+        result = QuizResult.objects.filter(user=self.user).first()
+        queryset = UserAnswer.objects.filter(quiz_result=result).select_related('question')
+        self.assertUsesIndex(queryset, 'quiz_app_useranswer')
+
+    def test_answers_by_user_and_question(self):
+        queryset = UserAnswer.objects.filter(user=self.user, question__category_id=1)
+        self.assertUsesIndex(queryset, 'quiz_app_useranswer')
+
+    def test_recent_results_for_user(self):
+        queryset = QuizResult.objects.filter(user=self.user).order_by('-completed_at')[:10]
+        self.assertUsesIndex(queryset, 'quiz_app_quizresult', ordered=True)
+
+    def test_leaderboard_top(self):
+        queryset = Leaderboard.objects.order_by('-score', 'updated_at')[:20]
+        self.assertUsesIndex(queryset, 'quiz_app_leaderboard', ordered=True)
+
+    def test_leaderboard_positions_ahead(self):
+        now = timezone.now() - timedelta(minutes=1)
+        queryset = Leaderboard.objects.filter(Q(score__gt=5) | Q(score=5, updated_at__lte=now))
+        self.assertUsesIndex(queryset, 'quiz_app_leaderboard')
+
+    def test_category_stats_for_user(self):
+        queryset = UserCategoryStats.objects.filter(user=self.user).select_related('category')
+        self.assertUsesIndex(queryset, 'quiz_app_usercategorystats')
+
+
+class CategoryStatsTests(TestCase):
+    """UserCategoryStats is folded forward per quiz and matches a full rebuild"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.history, cls.science = Category.objects.bulk_create([Category(name='History'), Category(name='Science')])
+        cls.questions = Question.objects.bulk_create([
+            Question(question_text=f"Question {i}", option1='a', option2='b', option3='c', option4='d',
+                     correct_option=1, category=[cls.history, cls.science, None][i % 3])
+            for i in range(6)
+        ])
+        cls.user = User.objects.create_user('categorized')
+
+    def answer(self, user, options):
+        return UserAnswer.objects.bulk_create([
+            UserAnswer(user=user, question=question, selected_option=option, is_correct=option == 1,
+                       answered_at=timezone.now())
+            for question, option in zip(self.questions, options)
+        ])
+
+    def stats(self, user):
+        return {
+            row.category_id: (row.attempted, row.correct)
+            for row in UserCategoryStats.objects.filter(user=user)
+        }
+
+    def test_answers_accumulate_per_category(self):
+        record_answers(self.user, self.answer(self.user, [1, 2, 1, 1, 1, 2]))
+        record_answers(self.user, self.answer(self.user, [2, 1, 1, 1, 1, 1]))
+        self.assertEqual(self.stats(self.user), {self.history.id: (4, 3), self.science.id: (4, 3)})
+
+    def test_rebuild_matches_incremental_updates(self):
+        other = User.objects.create_user('other-categorized')
+        record_answers(self.user, self.answer(self.user, [1, 2, 1, 2, 1, 2]))
+        record_answers(other, self.answer(other, [1, 1, 1, 1, 1, 1]))
+        incremental = {user.id: self.stats(user) for user in (self.user, other)}
+
+        UserCategoryStats.objects.update(attempted=0, correct=0)
+        self.assertEqual(rebuild_category_stats(user_ids=[self.user.id]), 2)
+        self.assertEqual(self.stats(self.user), incremental[self.user.id])
+        self.assertEqual(self.stats(other), {self.history.id: (0, 0), self.science.id: (0, 0)})
+
+        rebuild_category_stats(batch_size=1)
+        self.assertEqual({user.id: self.stats(user) for user in (self.user, other)}, incremental)
+
+    def test_quiz_submission_updates_stats(self):
+        reset_caches()
+        self.client.force_login(self.user)
+        attempt = self.client.get(reverse('quiz')).context['attempt']
+        data = {f'question_{pk}': '1' for pk in attempt.question_id_list}
+        self.client.post(reverse('quiz'), dict(data, attempt=attempt.token))
+        self.assertEqual(self.stats(self.user), {self.history.id: (2, 2), self.science.id: (2, 2)})
+
+
+class QuizAttemptTests(TestCase):
+    """Quiz state lives in QuizAttempt rows, not in the session"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Question.objects.bulk_create([
+            Question(question_text=f"Question {i}", option1='a', option2='b', option3='c', option4='d',
+                     correct_option=1 + i % 2, difficulty='easy')
+            for i in range(10)
+        ])
+        cls.user = User.objects.create_user('taker')
+
+    def setUp(self):
+        reset_caches()
+        self.client.force_login(self.user)
+
+    def start(self):
+        response = self.client.get(reverse('quiz'))
+        return response.context['attempt']
+
+    def submit(self, attempt, **extra):
+        data = {f'question_{pk}': '1' for pk in attempt.question_id_list}
+        data.update(attempt=attempt.token, **extra)
+        return self.client.post(reverse('quiz'), data)
+
+    def test_quiz_keeps_questions_out_of_the_session(self):
+        session_keys = set(self.client.session.keys())
+        attempt = self.start()
+        self.assertEqual(set(self.client.session.keys()), session_keys)
+        self.assertEqual(sorted(attempt.question_id_list), sorted(Question.objects.values_list('id', flat=True)))
+
+        self.submit(attempt)
+        result = QuizResult.objects.get(user=self.user)
+        self.assertEqual((result.score, result.total_questions), (5, 10))
+        self.assertEqual(QuizAttempt.objects.get(pk=attempt.pk).quiz_result, result)
+        self.assertEqual(set(self.client.session.keys()), session_keys)
+
+    def test_time_taken_comes_from_the_server(self):
+        attempt = self.start()
+        QuizAttempt.objects.filter(pk=attempt.pk).update(started_at=timezone.now() - timedelta(seconds=90))
+        cache.clear()
+
+        self.submit(attempt, start_time='0')
+        self.assertAlmostEqual(QuizResult.objects.get(user=self.user).time_taken, 90, delta=5)
+
+    def test_attempt_is_graded_once(self):
+        attempt = self.start()
+        self.submit(attempt)
+        self.submit(attempt)
+        self.assertEqual(QuizResult.objects.filter(user=self.user).count(), 1)
+
+    def test_attempt_belongs_to_its_user(self):
+        attempt = self.start()
+        self.client.force_login(User.objects.create_user('someone-else'))
+        self.submit(attempt)
+        self.assertFalse(QuizResult.objects.exists())
+
+
+class AnswerBackfillTests(TestCase):
+    """Migration 0006 links existing answers to the quiz result saved right after them"""
+
+    def test_answers_are_linked_set_based(self):
+        from django.apps import apps
+
+        backfill = import_module('quiz_app.migrations.0006_useranswer_quiz_result')
+        user, other = User.objects.create_user('backfilled'), User.objects.create_user('bystander')
+        questions = Question.objects.bulk_create([
+            Question(question_text=f"Question {i}", option1='a', option2='b', option3='c', option4='d', correct_option=1)
+            for i in range(3)
+        ])
+        now = timezone.now()
+        DailyQuestion.objects.create(date=now.date(), question=questions[2])  # now is in UTC
+
+        def answer(who, question, at):
+            answer = UserAnswer.objects.create(user=who, question=question, selected_option=1, is_correct=True)
+            UserAnswer.objects.filter(id=answer.id).update(answered_at=at)
+            return answer.id
+
+        def result(quiz_type, at):
+            result = QuizResult.objects.create(user=user, score=1, total_questions=1, time_taken=5, quiz_type=quiz_type)
+            QuizResult.objects.filter(id=result.id).update(completed_at=at)
+            return result.id
+
+        in_quiz = answer(user, questions[0], now)
+        daily = answer(user, questions[2], now)
+        too_old = answer(user, questions[1], now - timedelta(minutes=5))
+        elsewhere = answer(other, questions[0], now)
+        standard = result('standard', now + timedelta(seconds=10))
+        daily_quiz = result('daily', now + timedelta(seconds=20))
+        result('standard', now + timedelta(seconds=10))
+
+        with self.assertNumQueries(4):  # the chunk of results, its two UPDATEs, the empty next chunk
+            backfill.link_answers_to_results(apps, None)
+        linked = dict(UserAnswer.objects.values_list('id', 'quiz_result_id'))
+        self.assertEqual(
+            [linked[in_quiz], linked[daily], linked[too_old], linked[elsewhere]],
+            [standard, daily_quiz, None, None],
+        )
+
+
+class ReviewTests(TestCase):
+    """Review lists every question the attempt drew, answered or not, in a fixed number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.questions = Question.objects.bulk_create([
+            Question(question_text=f"Review question {i}", option1='a', option2='b', option3='c', option4='d',
+                     correct_option=1)
+            for i in range(8)
+        ])
+        cls.user = User.objects.create_user('reviewer')
+
+    def setUp(self):
+        reset_caches()
+        self.client.force_login(self.user)
+
+    def finish(self, count, answered):
+        """Submit an attempt over the first `count` questions, answering the first `answered`"""
+        ids = [question.id for question in reversed(self.questions[:count])]
+        attempt = start_attempt(self.user, 'standard', ids)
+        data = {f'question_{pk}': '2' for pk in ids[:answered]}
+        self.client.post(reverse('quiz'), dict(data, attempt=attempt.token))
+        return QuizResult.objects.filter(user=self.user).latest('id')
+
+    def test_unanswered_questions_are_listed_in_quiz_order(self):
+        result = self.finish(4, answered=1)
+        response = self.client.get(reverse('review_quiz', kwargs={'result_id': result.pk}))
+        listed = [question.question_text for question in response.context['questions']]
+        self.assertEqual(listed, [f"Review question {i}" for i in (3, 2, 1, 0)])
+        self.assertEqual(response.context['questions'][0].user_answer, {'selected_option': 2, 'is_correct': False})
+        self.assertContains(response, 'Not answered', count=3)
+
+    def test_review_query_count_does_not_grow_with_questions(self):
+        small = self.finish(2, answered=1)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('review_quiz', kwargs={'result_id': small.pk}))
+        expected = len(queries)
+
+        large = self.finish(8, answered=5)
+        with self.assertNumQueries(expected):
+            response = self.client.get(reverse('review_quiz', kwargs={'result_id': large.pk}))
+        self.assertEqual(len(response.context['questions']), 8)
+
+
+@skipUnlessDBFeature('test_db_allows_multiple_connections')
+class ConcurrentStatsTests(TransactionTestCase):
+    """Parallel submissions for one user must not lose counter updates"""
+
+    workers = 8
+    submissions = 5
+
+    def test_parallel_submissions_are_all_counted(self):
+        user = User.objects.create_user('racer')
+        barrier = threading.Barrier(self.workers)
+        errors = []
+
+        def submit():
+            try:
+                barrier.wait()
+                for _ in range(self.submissions):
+                    record_quiz_stats(user, 3, 4)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                close_old_connections()
+
+        threads = [threading.Thread(target=submit) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        attempts = self.workers * self.submissions
+        progress = UserProgress.objects.get(user=user)
+        self.assertEqual(progress.total_attempts, attempts)
+        self.assertEqual(progress.questions_answered, 4 * attempts)
+        self.assertEqual(progress.correct_answers, 3 * attempts)
+        self.assertAlmostEqual(progress.score_ratio_sum, 0.75 * attempts)
+        self.assertAlmostEqual(progress.average_score, 0.75)
+        self.assertEqual(Leaderboard.objects.get(user=user).score, 3 * attempts)
+
+    def test_parallel_submissions_from_different_users_rank_cleanly(self):
+        users = [User.objects.create_user(f'rival-{i}') for i in range(self.workers)]
+        barrier = threading.Barrier(self.workers)
+        errors = []
+
+        def submit(index, user):
+            try:
+                barrier.wait()
+                for _ in range(self.submissions):
+                    record_quiz_stats(user, index + 1, 10)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                close_old_connections()
+
+        threads = [threading.Thread(target=submit, args=(i, user)) for i, user in enumerate(users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        ranked = list(with_live_rank(Leaderboard.objects.all()).order_by('position').values_list('user__username', 'score', 'position'))
+        self.assertEqual(ranked, [
+            (f'rival-{i}', (i + 1) * self.submissions, self.workers - i) for i in reversed(range(self.workers))
+        ])
+
+
+class ProfileProvisioningTests(TestCase):
+    """Logging in or registering must not touch progress or leaderboard rows"""
+
+    def assertNoProfileWrites(self, queries):
+        touched = [q['sql'] for q in queries if 'quiz_app_userprogress' in q['sql'] or 'quiz_app_leaderboard' in q['sql']]
+        self.assertEqual(touched, [])
+
+    def test_login_query_count(self):
+        User.objects.create_user('returning', password='Secret-pass-1234')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('login'), {'username': 'returning', 'password': 'Secret-pass-1234'})
+        self.assertRedirects(response, reverse('index'), fetch_redirect_response=False)
+        self.assertNoProfileWrites(queries)
+        # user lookup, session create (exists check + insert), last_login, session save
+        self.assertEqual(len([q for q in queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]), 5)
+
+    def test_registration_query_count(self):
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('register'), {
+                'username': 'newcomer', 'email': 'newcomer@example.com',
+                'password1': 'Secret-pass-1234', 'password2': 'Secret-pass-1234',
+            })
+        self.assertRedirects(response, reverse('index'), fetch_redirect_response=False)
+        self.assertNoProfileWrites(queries)
+        # two username checks, user insert, login without the user lookup, then the user counter on commit
+        self.assertEqual(len([q for q in queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]), 8)
+
+    def test_first_graded_answer_provisions_profile(self):
+        user = User.objects.create_user('fresh')
+        self.assertFalse(UserProgress.objects.filter(user=user).exists())
+        record_quiz_stats(user, 2, 4)
+        record_quiz_stats(user, 4, 4)
+        progress = UserProgress.objects.get(user=user)
+        self.assertEqual((progress.total_attempts, progress.correct_answers), (2, 6))
+        self.assertAlmostEqual(progress.average_score, 0.75)
+        self.assertEqual(Leaderboard.objects.get(user=user).score, 6)
+
+
+class SiteCounterTests(TestCase):
+    """Counters are bumped after commit, outside the request's transaction"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Question.objects.create(question_text="Counted", option1='a', option2='b', option3='c', option4='d',
+                                correct_option=1)
+        cls.user = User.objects.create_user('counted')
+
+    def setUp(self):
+        reset_caches()
+        reconcile()
+        self.client.force_login(self.user)
+
+    def submit_quiz(self):
+        attempt = self.client.get(reverse('quiz')).context['attempt']
+        return self.client.post(reverse('quiz'), {f'question_{pk}': '1' for pk in attempt.question_id_list} | {
+            'attempt': attempt.token,
+        })
+
+    def test_submission_does_not_touch_the_counter_row_before_commit(self):
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks() as callbacks:
+            self.submit_quiz()
+        self.assertFalse([q['sql'] for q in queries if q['sql'].startswith('UPDATE') and 'quiz_app_sitecounter' in q['sql']])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(SiteCounter.objects.get(name='quizzes').value, 1)
+
+    def test_rolled_back_writes_are_not_counted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    QuizResult.objects.create(user=self.user, score=1, total_questions=1, time_taken=5)
+                    raise ValueError
+            except ValueError:
+                pass
+            QuizResult.objects.create(user=self.user, score=1, total_questions=1, time_taken=5)
+        self.assertEqual(SiteCounter.objects.get(name='quizzes').value, 1)
+
+    def test_totals_are_cached_and_reconcile_fixes_drift(self):
+        self.assertEqual(get_counters(), {'questions': 1, 'users': 1, 'quizzes': 0})
+        SiteCounter.objects.filter(name='questions').update(value=40)
+        self.assertEqual(get_counters()['questions'], 1)
+        self.assertEqual(reconcile(), {'questions': (40, 1)})
+        self.assertEqual(get_counters()['questions'], 1)
+
+
+class ExportTests(TestCase):
+    """CSV exports stream a member's own results, and staff-wide exports honour their filters"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.history, cls.science = Category.objects.bulk_create([Category(name='History'), Category(name='Science')])
+        questions = Question.objects.bulk_create([
+            Question(question_text=f"Export {i}", option1='a', option2='b', option3='c', option4='d',
+                     correct_option=1, category=category)
+            for i, category in enumerate([cls.history, cls.science])
+        ])
+        cls.member = User.objects.create_user('exporter')
+        cls.other = User.objects.create_user('bystander')
+        cls.staff = User.objects.create_user('auditor', is_staff=True)
+        now = timezone.now()
+        for user, days_ago, question in [(cls.member, 1, questions[0]), (cls.member, 10, questions[1]),
+                                         (cls.other, 1, questions[1])]:
+            result = QuizResult.objects.create(user=user, score=1, total_questions=1, time_taken=30)
+            answer = UserAnswer.objects.create(user=user, question=question, quiz_result=result,
+                                               selected_option=1, is_correct=True)
+            completed_at = now - timedelta(days=days_ago)
+            QuizResult.objects.filter(id=result.id).update(completed_at=completed_at)
+            UserAnswer.objects.filter(id=answer.id).update(answered_at=completed_at)
+
+    def export(self, user, **params):
+        self.client.force_login(user)
+        response = self.client.get(reverse('export_results'), params)
+        if response.status_code != 200:
+            return response, None
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        return response, rows
+
+    def test_members_export_only_their_own_results(self):
+        response, rows = self.export(self.member, scope='mine')
+        self.assertEqual(rows[0][0], 'Date')
+        self.assertEqual(len(rows), 3)
+
+    def test_members_cannot_export_everyone(self):
+        response, rows = self.export(self.member, scope='all')
+        self.assertEqual(response.status_code, 403)
+
+    def test_staff_export_filters_by_date_and_category(self):
+        response, rows = self.export(self.staff, scope='all')
+        self.assertEqual(sorted(row[0] for row in rows[1:]), ['bystander', 'exporter', 'exporter'])
+
+        week_ago = (timezone.now() - timedelta(days=7)).date().isoformat()
+        response, rows = self.export(self.staff, scope='all', start=week_ago)
+        self.assertEqual(sorted(row[0] for row in rows[1:]), ['bystander', 'exporter'])
+
+        response, rows = self.export(self.staff, scope='all', category=self.science.id, end=week_ago)
+        self.assertEqual([row[0] for row in rows[1:]], ['exporter'])
+
+    def test_staff_export_answers(self):
+        response, rows = self.export(self.staff, scope='all', kind='answers', category=self.science.id)
+        self.assertEqual(rows[0][0], 'Username')
+        self.assertEqual(sorted((row[0], row[4]) for row in rows[1:]), [('bystander', 'Science'), ('exporter', 'Science')])
+
+    def test_malformed_filters_are_rejected(self):
+        for params in [{'start': '2024-13-01'}, {'end': 'yesterday'}, {'category': 'history'}]:
+            response, rows = self.export(self.staff, scope='all', **params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+class QuestionImportTests(TestCase):
+    """The importer dedupes by content, survives bad records, resumes and can dry-run"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'questions.jsonl')
+        self.checkpoint = os.path.join(directory.name, 'questions.checkpoint')
+
+    def write(self, records):
+        with open(self.path, 'w') as handle:
+            for record in records:
+                handle.write((record if isinstance(record, str) else json.dumps(record)) + '\n')
+
+    def row(self, text, **extra):
+        return {'question_text': text, 'option1': 'a', 'option2': 'b', 'option3': 'c', 'option4': 'd',
+                'correct_option': 'B', **extra}
+
+    def run_import(self, **options):
+        invalid = []
+        importer = QuestionImporter(batch_size=2, checkpoint_path=self.checkpoint,
+                                    on_invalid=lambda number, message: invalid.append((number, message)),
+                                    **{key: value for key, value in options.items() if key != 'resume'})
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = importer.run(self.path, 'jsonl', resume=options.get('resume', False))
+        return stats, invalid
+
+    def test_records_that_are_not_objects_are_invalid(self):
+        self.write(['[1, 2]', '"question"', '42', self.row("Kept")])
+        stats, invalid = self.run_import()
+        self.assertEqual((stats['inserted'], stats['invalid']), (1, 3))
+        self.assertEqual([number for number, message in invalid], [1, 2, 3])
+        self.assertIn('expected an object', invalid[0][1])
+        self.assertEqual(Question.objects.get().correct_option, 2)
+
+    def test_duplicates_are_skipped_within_and_across_batches(self):
+        Question.objects.create(question_text="Stored", option1='a', option2='b', option3='c', option4='d',
+                                correct_option=1)
+        self.write([self.row("New"), self.row("  new "), self.row("STORED"), self.row("Other"), self.row("new")])
+        stats, invalid = self.run_import()
+        self.assertEqual((stats['read'], stats['inserted'], stats['duplicates']), (5, 2, 3))
+        self.assertEqual(sorted(Question.objects.values_list('question_text', flat=True)), ['New', 'Other', 'Stored'])
+
+    def test_resume_continues_after_the_last_committed_batch(self):
+        self.write([self.row(f"Question {i}") for i in range(5)])
+
+        def interrupted(path, file_format):
+            for number, row in read_rows(path, file_format):
+                if number == 4:
+                    raise KeyboardInterrupt
+                yield number, row
+
+        with mock.patch('quiz_app.importing.read_rows', interrupted), self.assertRaises(KeyboardInterrupt):
+            self.run_import()
+        self.assertEqual(Question.objects.count(), 2)
+
+        stats, invalid = self.run_import(resume=True)
+        self.assertEqual((stats['skipped'], stats['read'], stats['inserted']), (2, 3, 3))
+        self.assertEqual(Question.objects.count(), 5)
+
+    def test_dry_run_writes_nothing(self):
+        self.write([self.row("One"), self.row("Two"), self.row("one"), self.row("Three", category="Missing")])
+        stats, invalid = self.run_import(dry_run=True)
+        self.assertEqual((stats['inserted'], stats['duplicates'], stats['invalid']), (2, 1, 1))
+        self.assertFalse(Question.objects.exists())
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+
+class RequestMetricsTests(TestCase):
+    """Per-view metrics count every query a request runs, including a streamed body's"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('measured')
+        QuizResult.objects.bulk_create([
+            QuizResult(user=cls.user, score=i, total_questions=10, time_taken=30) for i in range(3)
+        ])
+
+    def setUp(self):
+        metrics_registry.reset()
+        self.client.force_login(self.user)
+
+    def recorded_queries(self, view):
+        found = re.search(rf'quizmaster_db_queries_total\{{view="{view}"\}} (\d+)', metrics_registry.render())
+        return int(found.group(1)) if found else None
+
+    def test_streamed_export_counts_queries_made_while_streaming(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('export_results'))
+            self.assertIsNone(self.recorded_queries('export_results'))
+            body = b''.join(response.streaming_content)
+        self.assertEqual(body.count(b'\n'), 4)
+        self.assertEqual(self.recorded_queries('export_results'), len(queries))
+
+    def test_histogram_is_cumulative_and_views_are_bounded(self):
+        registry = MetricsRegistry()
+        registry.observe('quiz', LATENCY_BUCKETS[0] / 2, 3, 0.001)
+        registry.observe('quiz', LATENCY_BUCKETS[2], 2, 0.002)
+        registry.observe('quiz', LATENCY_BUCKETS[-1] * 2, 1, 0.003)
+        rendered = registry.render()
+        self.assertIn(f'quizmaster_request_duration_seconds_bucket{{view="quiz",le="{LATENCY_BUCKETS[0]}"}} 1', rendered)
+        self.assertIn(f'quizmaster_request_duration_seconds_bucket{{view="quiz",le="{LATENCY_BUCKETS[2]}"}} 2', rendered)
+        self.assertIn(f'quizmaster_request_duration_seconds_bucket{{view="quiz",le="{LATENCY_BUCKETS[-1]}"}} 2', rendered)
+        self.assertIn('quizmaster_request_duration_seconds_bucket{view="quiz",le="+Inf"} 3', rendered)
+        self.assertIn('quizmaster_db_queries_total{view="quiz"} 6', rendered)
+
+        for number in range(MAX_VIEWS + 5):
+            registry.observe(f'view-{number}', 0.001, 1, 0.0)
+        self.assertIn('quizmaster_db_queries_total{view="other"} 6', registry.render())
+
+
+# Seeding and the login scenarios hash passwords; the default hasher is deliberately slow
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ScaleSeedTests(TestCase):
+    """Seeded data is reproducible and its rollups agree with the raw rows; every benchmark scenario runs"""
+
+    SIZES = {'categories': 3, 'questions': 40, 'users': 6, 'results_per_user': 2, 'answers_per_result': 5}
+
+    def setUp(self):
+        reset_caches()
+
+    def test_seeded_rollups_match_the_history(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            sizes = ScaleSeeder(batch_size=7, seed=3).seed(**self.SIZES)
+        self.assertEqual(sizes, {'categories': 3, 'questions': 40, 'users': 6, 'results': 12, 'answers': 60})
+        self.assertEqual(UserAnswer.objects.count(), 60)
+
+        for progress in UserProgress.objects.all():
+            answers = UserAnswer.objects.filter(user=progress.user)
+            correct = answers.filter(is_correct=True).count()
+            self.assertEqual((progress.total_attempts, progress.questions_answered, progress.correct_answers),
+                             (2, answers.count(), correct))
+            self.assertEqual(Leaderboard.objects.get(user=progress.user).score, correct)
+        stats = UserCategoryStats.objects.all()
+        self.assertEqual(sum(row.attempted for row in stats), 60)
+        self.assertEqual(sum(row.correct for row in stats), UserAnswer.objects.filter(is_correct=True).count())
+        self.assertEqual(get_counters(), {'questions': 40, 'users': 6, 'quizzes': 12})
+
+    def test_seed_is_reproducible(self):
+        class Discard(Exception):
+            pass
+
+        def generate():
+            try:
+                with transaction.atomic():
+                    ScaleSeeder(seed=11).seed(**self.SIZES)
+                    rows = sorted(QuizResult.objects.values_list('user__username', 'score', 'time_taken'))
+                    raise Discard
+            except Discard:
+                return rows
+
+        self.assertEqual(generate(), generate())
+
+    def test_summarize(self):
+        self.assertEqual(summarize(list(range(1, 21))), {'p50': 10.5, 'p95': 19, 'mean': 10.5, 'max': 20})
+        self.assertEqual(summarize([]), {'p50': None, 'p95': None, 'mean': None, 'max': None})
+
+    def test_every_benchmark_scenario_succeeds(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ScaleSeeder(seed=5).seed(**self.SIZES)
+        command = bench_views.Command()
+        command.staff = User.objects.create_user('bench-staff', password='bench-pass', is_staff=True, is_superuser=True)
+        command.member = User.objects.create_user('bench-member', password='bench-pass')
+        command.member_result = command.submit_quiz(command.new_client(command.member))
+        schedule_daily_questions()
+
+        scenarios = command.scenarios()
+        names = {scenario['name'] for scenario in scenarios}
+        self.assertLessEqual({'quiz:adaptive', 'quiz:custom', 'result_achievements'}, names)
+        for scenario in scenarios:
+            report = command.measure(scenario, warmup=0, repeat=1)
+            self.assertLess(report['status'], 400, report['name'])
+            self.assertEqual(len(report['latency_ms']), 4)
+
+        # The overhead comparison records only the requests that went through the metrics middleware
+        about = next(scenario for scenario in command.scenarios() if scenario['name'] == 'about')
+        metrics_registry.reset()
+        report = command.measure(about, warmup=0, repeat=2, compare_metrics=True)
+        self.assertEqual(len(report['without_metrics_ms']), 4)
+        self.assertIn('quizmaster_request_duration_seconds_count{view="about"} 2', metrics_registry.render())
+
+
+class ResultAchievementTests(TestCase):
+    """The result page never waits for the submission job; achievements it unlocks later are fetched"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('patient')
+        Achievement.objects.create(name='First Quiz', description='Finish a quiz', condition='first_quiz')
+
+    def setUp(self):
+        reset_caches()
+        self.client.force_login(self.user)
+        self.result = QuizResult.objects.create(user=self.user, score=3, total_questions=4, time_taken=30)
+        self.job = jobs.enqueue('quiz_submitted', self.user, f'quiz_submitted:{self.result.id}',
+                                {'score': 3, 'total_questions': 4})
+        self.url = reverse('result_achievements', kwargs={'result_id': self.result.id})
+
+    def test_pending_job_is_polled_for(self):
+        response = self.client.get(reverse('result', kwargs={'result_id': self.result.id}))
+        self.assertEqual(response.context['achievements_url'], self.url)
+        self.assertEqual(response.context['new_achievements'], [])
+        self.assertEqual(self.client.get(self.url).json(), {'status': 'pending', 'new_achievements': []})
+
+        jobs.run_job(self.job.id)
+        self.assertEqual(self.client.get(self.url).json(), {'status': 'done', 'new_achievements': ['First Quiz']})
+
+    def test_finished_job_is_shown_directly(self):
+        jobs.run_job(self.job.id)
+        response = self.client.get(reverse('result', kwargs={'result_id': self.result.id}))
+        self.assertIsNone(response.context['achievements_url'])
+        self.assertContains(response, '<li>First Quiz</li>', html=True)
+
+    def test_other_users_results_are_hidden(self):
+        self.client.force_login(User.objects.create_user('nosy'))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class AsgiHandlerTests(TestCase):
+    """The read-heavy pages, sync views, also serve correctly under the ASGI handler"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('async-reader')
+        cls.result = QuizResult.objects.create(user=cls.user, score=3, total_questions=4, time_taken=30)
+        Leaderboard.objects.create(user=cls.user, score=3)
+
+    def setUp(self):
+        reset_caches()
+
+    async def test_pages_render_over_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        for url in [reverse('index'), reverse('leaderboard'), reverse('progress'),
+                    reverse('result', kwargs={'result_id': self.result.pk})]:
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+        response = await self.async_client.get(reverse('leaderboard'))
+        self.assertContains(response, 'async-reader')
+
+    async def test_metrics_count_async_queries(self):
+        metrics_registry.reset()
+        await self.async_client.get(reverse('leaderboard'))
+        self.assertRegex(metrics_registry.render(), r'quizmaster_db_queries_total\{view="leaderboard"\} [1-9]')
+
+
+class JobQueueTests(TestCase):
+    """Jobs run at most once per claim, survive dead workers and retry transient errors"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('queued')
+
+    def setUp(self):
+        self.calls = []
+        patcher = mock.patch.dict(jobs.HANDLERS, {'test_job': self.handle})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.failures = []
+
+    def handle(self, job):
+        self.calls.append(job.id)
+        Category.objects.create(name=f'written by {job.key}')
+        if self.failures:
+            raise self.failures.pop(0)
+        return {'calls': len(self.calls)}
+
+    def job(self, key='job-1', **fields):
+        from .models import BackgroundJob
+
+        return BackgroundJob.objects.create(kind='test_job', key=key, user=self.user, payload={}, **fields)
+
+    def test_job_is_claimed_once(self):
+        job = self.job()
+        jobs.run_job(job.id, owner='worker-a')
+        jobs.run_job(job.id, owner='worker-b')
+        job.refresh_from_db()
+        self.assertEqual(self.calls, [job.id])
+        self.assertEqual((job.status, job.locked_by, job.attempts, job.result), ('done', 'worker-a', 1, {'calls': 1}))
+
+    def test_only_expired_leases_are_recovered(self):
+        now = timezone.now()
+        expired = self.job('expired', status='running', locked_by='dead', locked_at=now - jobs.LEASE - timedelta(seconds=1))
+        live = self.job('live', status='running', locked_by='busy', locked_at=now - timedelta(seconds=5))
+        forgotten = self.job('forgotten')
+        fresh = self.job('fresh')
+        type(forgotten).objects.filter(id__in=[expired.id, live.id, forgotten.id]).update(
+            created_at=now - jobs.STALE_AFTER - timedelta(seconds=1)
+        )
+
+        recovered = jobs.requeue_orphaned(now=now)
+        self.assertEqual([key for _, key, _ in recovered], ['expired', 'forgotten'])
+        live.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual((live.status, live.locked_by), ('running', 'busy'))
+        self.assertEqual(fresh.status, 'pending')
+
+    def test_process_jobs_counts_only_the_jobs_it_ran(self):
+        contended, free = self.job('contended'), self.job('free')
+        claim_job = jobs.claim_job
+
+        def claim_after_another_worker(job_id, owner):
+            if job_id == contended.id:
+                claim_job(job_id, 'other-worker')
+            return claim_job(job_id, owner)
+
+        out = io.StringIO()
+        with mock.patch.object(jobs, 'claim_job', claim_after_another_worker):
+            call_command('process_jobs', stdout=out)
+        self.assertEqual(self.calls, [free.id])
+        self.assertIn("Processed 1 jobs", out.getvalue())
+
+    def test_worker_that_lost_its_lease_does_not_apply_the_job(self):
+        job = self.job()
+        stalled = jobs.claim_job(job.id, 'slow-worker')
+        type(job).objects.filter(id=job.id).update(locked_at=timezone.now() - jobs.LEASE * 2)
+        jobs.requeue_orphaned()
+        jobs.run_job(job.id, owner='new-worker')
+
+        jobs.execute_job(stalled, 'slow-worker')
+        job.refresh_from_db()
+        self.assertEqual(self.calls, [job.id])
+        self.assertEqual((job.status, job.locked_by, job.attempts), ('done', 'new-worker', 2))
+        self.assertEqual(Category.objects.filter(name='written by job-1').count(), 1)
+
+    def test_failed_job_records_its_error(self):
+        job = self.job()
+        self.failures = [ValueError('bad payload')]
+        jobs.run_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('bad payload', job.last_error)
+        self.assertFalse(Category.objects.exists())
+
+    @mock.patch.object(jobs, 'RETRY_BACKOFF', 0)
+    def test_transient_errors_are_retried_without_double_writes(self):
+        job = self.job()
+        self.failures = [OperationalError('deadlock'), OperationalError('lock wait timeout')]
+        jobs.run_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(Category.objects.count(), 1)
+
+    @mock.patch.object(jobs, 'RETRY_BACKOFF', 0)
+    def test_retries_are_bounded(self):
+        job = self.job()
+        self.failures = [OperationalError('deadlock')] * (jobs.TRANSIENT_RETRIES + 1)
+        jobs.run_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(len(self.calls), jobs.TRANSIENT_RETRIES + 1)
+        self.assertFalse(Category.objects.exists())
+
+
+class AchievementRuleTests(TestCase):
+    """Rules run only for their events, in a bounded number of queries, and unlock once"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.achievements = {
+            condition: Achievement.objects.create(name=condition, description=condition, condition=condition)
+            for condition in ['first_quiz', 'perfect_score', '5_quizzes', '100_questions', '90_percent_accuracy']
+        }
+        cls.user = User.objects.create_user('achiever')
+        record_quiz_stats(cls.user, 100, 100)
+
+    def unlocked(self):
+        return set(UserAchievement.objects.filter(user=self.user).values_list('achievement__condition', flat=True))
+
+    def test_only_rules_for_the_event_run(self):
+        new = evaluate(self.user, [QUIZ_COMPLETED], quiz_score=3, quiz_total=4)
+        self.assertEqual({achievement.condition for achievement in new}, {'first_quiz'})
+
+        new = evaluate(self.user, [ANSWER_RECORDED])
+        self.assertEqual({achievement.condition for achievement in new}, {'100_questions', '90_percent_accuracy'})
+        self.assertEqual(self.unlocked(), {'first_quiz', '100_questions', '90_percent_accuracy'})
+
+    def test_achievements_unlock_once(self):
+        self.assertEqual(len(evaluate(self.user, [QUIZ_COMPLETED], quiz_score=4, quiz_total=4)), 2)
+        self.assertEqual(evaluate(self.user, [QUIZ_COMPLETED], quiz_score=4, quiz_total=4), [])
+        self.assertEqual(UserAchievement.objects.filter(user=self.user).count(), 2)
+
+    def test_query_count_is_bounded(self):
+        # candidates, progress counters, insert
+        with self.assertNumQueries(3):
+            evaluate(self.user, [QUIZ_COMPLETED, ANSWER_RECORDED], quiz_score=4, quiz_total=4)
+        # 5_quizzes is still locked but does not hold yet, so nothing is inserted
+        with self.assertNumQueries(2):
+            evaluate(self.user, [QUIZ_COMPLETED, ANSWER_RECORDED], quiz_score=4, quiz_total=4)
+        with self.assertNumQueries(0):
+            evaluate(self.user, ['unknown_event'])
+
+    def test_passed_progress_skips_the_counter_query(self):
+        progress = UserProgress.objects.get(user=self.user)
+        with self.assertNumQueries(2):
+            new = evaluate(self.user, [ANSWER_RECORDED], user_progress=progress)
+        self.assertEqual(len(new), 2)
+
+
+class DailyScheduleTests(TestCase):
+    """The daily question comes from a precomputed schedule and a per-day cache"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categories = Category.objects.bulk_create([Category(name=f"Category {i}") for i in range(2)])
+        Question.objects.bulk_create([
+            Question(question_text=f"Question {i}", option1='a', option2='b', option3='c', option4='d',
+                     correct_option=1, category=cls.categories[i % 2], difficulty=['easy', 'medium', 'hard'][i % 3])
+            for i in range(60)
+        ])
+
+    def setUp(self):
+        reset_caches()
+
+    def test_schedule_rotates_and_does_not_repeat(self):
+        start = timezone.now().date()
+        created = schedule_daily_questions(start=start, days=30, window=30)
+        self.assertEqual(len(created), 30)
+
+        rows = list(DailyQuestion.objects.filter(date__gte=start).order_by('date').select_related('question'))
+        self.assertEqual(len({row.question_id for row in rows}), 30)
+        category_ids = [category.id for category in self.categories]
+        self.assertEqual(
+            [(row.question.category_id, row.question.difficulty) for row in rows],
+            [rotation_for(row.date, category_ids) for row in rows],
+        )
+
+        # Rerunning leaves the scheduled days alone
+        self.assertEqual(schedule_daily_questions(start=start, days=30, window=30), [])
+
+    def test_lookup_costs_no_queries_once_cached(self):
+        schedule_daily_questions(days=1)
+        expected = DailyQuestion.objects.get(date=timezone.now().date()).question_id
+        self.assertEqual(get_daily_question().id, expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_daily_question().id, expected)
+
+    def test_unscheduled_day_is_filled_on_demand(self):
+        day = timezone.now().date() + timedelta(days=400)
+        question = get_daily_question(day)
+        self.assertEqual(DailyQuestion.objects.get(date=day).question_id, question.id)
+
+
+class AdaptiveQuizTests(TestCase):
+    """Adaptive quizzes lean toward weak categories and skip recently answered questions"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('adaptive', password='secret')
+        cls.weak, cls.strong = Category.objects.bulk_create([Category(name="Weak"), Category(name="Strong")])
+        Question.objects.bulk_create([
+            Question(question_text=f"Question {i}", option1='a', option2='b', option3='c', option4='d',
+                     correct_option=1, category=[cls.weak, cls.strong][i % 2], difficulty='medium')
+            for i in range(400)
+        ])
+        UserCategoryStats.objects.bulk_create([
+            UserCategoryStats(user=cls.user, category=cls.weak, attempted=100, correct=5),
+            UserCategoryStats(user=cls.user, category=cls.strong, attempted=100, correct=95),
+        ])
+        cls.recent = list(Question.objects.filter(category=cls.weak).values_list('id', flat=True)[:50])
+        UserAnswer.objects.bulk_create([
+            UserAnswer(user=cls.user, question_id=pk, selected_option=2, is_correct=False) for pk in cls.recent
+        ])
+
+    def setUp(self):
+        reset_caches()
+
+    def test_selection_favours_weak_categories_and_skips_recent(self):
+        with self.assertNumQueries(3):  # bank index load, category stats, recent answers
+            # Seeded so the weighted draw is reproducible
+            ids = select_adaptive_ids(self.user, 60, rng=np.random.default_rng(7))
+        self.assertEqual(len(set(ids)), 60)
+        self.assertFalse(set(ids) & set(self.recent))
+        weak = Question.objects.filter(id__in=ids, category=self.weak).count()
+        self.assertGreater(weak, 40)
+
+    def test_banks_with_more_buckets_than_int16_codes(self):
+        index = QuestionIndex()
+        index.build((pk, pk, 'medium') for pk in range(1, 40001))
+        bank = BankArrays(index)
+        bank.build()
+        self.assertEqual(int(bank.bucket_codes.max()), 39999)
+        self.assertEqual(bank.bucket_ids[int(bank.bucket_codes[-1])].tolist(), [40000])
+        ids = select_adaptive_ids(self.user, 50, rng=np.random.default_rng(7), bank=bank)
+        self.assertEqual(len(set(ids)), 50)
+        self.assertFalse(set(ids) & set(self.recent))
+
+    def test_adaptive_quiz_view(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('quiz'), {'type': 'adaptive'})
+        self.assertEqual(response.context['quiz_type'], 'adaptive')
+        self.assertEqual(len(response.context['attempt'].question_id_list), 100)
+
+
+class EffortModelTests(TestCase):
+    """The effort model is trained offline and its recommendations are precomputed per user"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Learners whose accuracy climbs with practice, starting from different levels
+        cls.users = [User.objects.create_user(f'learner-{i}') for i in range(6)]
+        results = []
+        for i, user in enumerate(cls.users):
+            for quiz in range(8):
+                results.append(QuizResult(user=user, score=min(20, 6 + i + quiz), total_questions=20, time_taken=60))
+        QuizResult.objects.bulk_create(results)
+        UserProgress.objects.bulk_create([
+            UserProgress(user=user, total_attempts=8, questions_answered=160, correct_answers=60 + 12 * i)
+            for i, user in enumerate(cls.users)
+        ])
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(QUIZ_EFFORT_MODEL_PATH=f'{directory.name}/effort.joblib')
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_train_save_and_score(self):
+        self.assertIsNone(score_users())
+        bundle = train_effort_model(batch_size=7)
+        self.assertEqual(bundle['samples'], 6 * 7)
+        save_effort_model(bundle)
+
+        self.assertEqual(score_users(batch_size=4), 6)
+        needed = list(EffortRecommendation.objects.order_by('accuracy').values_list('questions_needed', flat=True))
+        self.assertEqual(needed, sorted(needed, reverse=True))
+        self.assertGreater(needed[0], 0)
+
+        # Rescoring updates rows in place
+        self.assertEqual(score_users(user_ids=[self.users[0].id]), 1)
+        self.assertEqual(EffortRecommendation.objects.count(), 6)
+
+    def test_submission_job_rescores_with_a_trained_model(self):
+        save_effort_model(train_effort_model())
+        user = self.users[0]
+        result = QuizResult.objects.filter(user=user).first()
+        job = jobs.enqueue('quiz_submitted', user, f'quiz_submitted:{result.id}', {'score': 12, 'total_questions': 20})
+        jobs.run_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done', job.last_error)
+        self.assertTrue(EffortRecommendation.objects.filter(user=user).exists())
+
+    def test_upsert_conflict_target_is_dropped_where_unsupported(self):
+        self.assertEqual(conflict_target(EffortRecommendation, ['user']), ['user'])
+        # MySQL: ON DUPLICATE KEY UPDATE takes no target
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            self.assertIsNone(conflict_target(EffortRecommendation, ['user']))
+
+    def test_result_page_reads_stored_recommendation(self):
+        user = self.users[0]
+        EffortRecommendation.objects.create(user=user, accuracy=0.375, questions_needed=420,
+                                            model_trained_at=timezone.now())
+        self.client.force_login(user)
+        response = self.client.get(reverse('result', kwargs={'result_id': QuizResult.objects.filter(user=user)[0].pk}))
+        self.assertContains(response, 'about 420 more questions')
+
+
+class CalibrationTests(TestCase):
+    """calibrate_questions fits item difficulty from answers and resumes from its checkpoint"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.questions = Question.objects.bulk_create([
+            Question(question_text=f"Question {i}", option1='a', option2='b', option3='c', option4='d',
+                     correct_option=1, difficulty='medium')
+            for i in range(10)
+        ])
+        cls.users = [User.objects.create_user(f'calibrated-{i}') for i in range(40)]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(QUIZ_CALIBRATION_CHECKPOINT=f'{directory.name}/calibration.npz')
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def answer(self, rng):
+        # Question i is answered correctly with probability falling from 0.95 to 0.05
+        UserAnswer.objects.bulk_create([
+            UserAnswer(user=user, question=question, selected_option=1,
+                       is_correct=rng.random() < 0.95 - 0.1 * i)
+            for user in self.users for i, question in enumerate(self.questions)
+        ])
+
+    def test_full_then_incremental_calibration(self):
+        rng = random.Random(7)
+        self.answer(rng)
+        self.assertEqual(calibrate_questions(chunk_size=75, checkpoint_every=2, relabel=True), (400, 10))
+        fitted = list(Question.objects.order_by('id').values_list('irt_difficulty', 'irt_answers', 'difficulty'))
+        self.assertLess(fitted[0][0], 0)
+        self.assertGreater(fitted[-1][0], 0)
+        self.assertGreater(fitted[-1][0], fitted[0][0] + 1)
+        self.assertEqual({answers for _, answers, _ in fitted}, {40})
+        self.assertEqual((fitted[0][2], fitted[-1][2]), ('easy', 'hard'))
+
+        # Nothing new to read, then only the new answers
+        self.assertEqual(calibrate_questions(), (0, 0))
+        self.answer(rng)
+        self.assertEqual(calibrate_questions(chunk_size=75), (400, 10))
+        self.assertEqual(set(Question.objects.values_list('irt_answers', flat=True)), {80})
+
+
+class WindowedLeaderboardTests(TestCase):
+    """Weekly and monthly boards read per-user score buckets maintained on submission"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user('alice')
+        cls.bob = User.objects.create_user('bob')
+
+    def test_submissions_fill_day_week_and_month_buckets(self):
+        record_quiz_stats(self.alice, 3, 5)
+        record_quiz_stats(self.alice, 4, 5)
+        record_quiz_stats(self.bob, 5, 5)
+        today = timezone.localdate()
+        self.assertEqual(
+            set(ScoreBucket.objects.filter(user=self.alice).values_list('period', 'start', 'score')),
+            {('day', today, 7), ('week', period_start('week', today), 7), ('month', today.replace(day=1), 7)},
+        )
+
+        with self.assertNumQueries(1):  # the top of the week, users joined
+            self.client.get(reverse('leaderboard'), {'period': 'week'})
+        self.client.force_login(self.bob)
+        response = self.client.get(reverse('leaderboard'), {'period': 'week'})
+        self.assertEqual([(leader.user, leader.score, leader.position) for leader in response.context['leaders']],
+                         [(self.alice, 7, 1), (self.bob, 5, 2)])
+
+    def test_compaction_and_rebuild(self):
+        today = timezone.localdate()
+        old = today - timedelta(days=400)
+        ScoreBucket.objects.bulk_create([
+            ScoreBucket(user=self.alice, period=period, start=period_start(period, old), score=9)
+            for period in ('day', 'week', 'month')
+        ])
+        record_quiz_stats(self.alice, 2, 5)
+        self.assertEqual(compact_score_buckets(), 3)
+        self.assertEqual(ScoreBucket.objects.filter(user=self.alice).count(), 3)
+
+        QuizResult.objects.create(user=self.bob, score=4, total_questions=5, time_taken=30)
+        rebuild_score_buckets()
+        self.assertEqual(
+            set(ScoreBucket.objects.filter(period='week').values_list('user__username', 'score')),
+            {('bob', 4)},
+        )
+
+    def test_rebuild_replaces_buckets_one_user_range_at_a_time(self):
+        record_quiz_stats(self.alice, 3, 5)
+        QuizResult.objects.create(user=self.alice, score=3, total_questions=5, time_taken=30)
+        QuizResult.objects.create(user=self.bob, score=4, total_questions=5, time_taken=30)
+        # A stale bucket is replaced by the rebuilt totals
+        ScoreBucket.objects.filter(user=self.alice).update(score=99)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(rebuild_score_buckets(batch_size=1), 6)
+        deletes = [query['sql'] for query in queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 2)
+        self.assertEqual(
+            set(ScoreBucket.objects.filter(period='day').values_list('user__username', 'score')),
+            {('alice', 3), ('bob', 4)},
+        )
+
+
+class LeaderboardPaginationTests(TestCase):
+    """Leaderboard pages are keyset-paginated and a user can jump to their own position"""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = User.objects.bulk_create([User(username=f'player-{i:02}') for i in range(50)])
+        # Scores repeat so ties fall back to updated_at and id
+        Leaderboard.objects.bulk_create([Leaderboard(user=user, score=100 - i // 3) for i, user in enumerate(users)])
+        cls.expected = list(with_live_rank(Leaderboard.objects.all()).values_list('user__username', 'position'))
+        cls.me = users[34]
+
+    def test_pages_follow_the_live_ranking(self):
+        self.client.force_login(self.me)
+        seen = []
+        url = reverse('leaderboard')
+        while url:
+            with self.assertNumQueries(3):  # session, user, the page with users joined
+                response = self.client.get(url)
+            seen += [(leader.user.username, leader.position) for leader in response.context['leaders']]
+            url = response.context['next_url']
+        self.assertEqual(seen, self.expected)
+
+        # Walking back from the last page lands on the same rows
+        response = self.client.get(response.context['previous_url'])
+        self.assertEqual([(leader.user.username, leader.position) for leader in response.context['leaders']],
+                         self.expected[20:40])
+
+    def test_jump_to_my_position(self):
+        position = dict(self.expected)[self.me.username]
+        entry = Leaderboard.objects.get(user=self.me)
+        with self.assertNumQueries(1):
+            self.assertEqual(position_in(board(), entry), position)
+
+        self.client.force_login(self.me)
+        with self.assertNumQueries(6):  # session, user, own row, COUNT, rows above, rows below
+            response = self.client.get(reverse('leaderboard'), {'around': 'me'})
+        self.assertEqual(response.context['user_rank'], position)
+        self.assertEqual([(leader.user.username, leader.position) for leader in response.context['leaders']],
+                         self.expected[position - 11:position + 9])
+        self.assertContains(response, f'#{position}')
+
+
+class RenderCacheTests(TestCase):
+    """Quiz pages are assembled from cached question fragments and static pages come pre-rendered"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('renderer', password='pw')
+        category = Category.objects.create(name='Render')
+        cls.question = Question.objects.create(
+            question_text='Which tag?', option1='<div>', option2='span', option3='p', option4='a',
+            correct_option=1, category=category, difficulty='easy',
+        )
+
+    def setUp(self):
+        reset_caches()
+        static_pages.clear()
+
+    def test_fragments_are_cached_per_bank_version(self):
+        fragment, = question_fragments([self.question])
+        self.assertIn(f'name="question_{self.question.id}"', fragment)
+        self.assertIn('&lt;div&gt;', fragment)
+
+        # A cached fragment is served as stored, without rendering
+        self.question.option2 = 'section'
+        self.assertEqual(question_fragments([self.question]), [fragment])
+
+        # Saving bumps the bank version on commit, so the edit shows up
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.save()
+        self.assertIn('section', question_fragments([self.question])[0])
+
+    def test_quiz_page_renders_fragments(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('quiz'))
+        self.assertContains(response, f'id="q{self.question.id}_4"')
+        self.assertContains(response, 'Which tag?')
+
+    def test_static_pages_are_prerendered(self):
+        for name in ['about', 'terms_and_conditions', 'privacy_policy', 'terms_of_service']:
+            anonymous = self.client.get(reverse(name))
+            self.assertEqual(anonymous.status_code, 200)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(reverse(name)).content, anonymous.content)
+
+        # Signed-in visitors see their own navigation around the cached content
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('about'))
+        self.assertContains(response, 'Hello, renderer')
+        self.assertContains(response, 'About QuizMaster')
+
+
+# Routing tests need a replica with its own test database, e.g. a second SQLite file
+SEPARATE_REPLICA = 'replica' in settings.DATABASES and not settings.DATABASES['replica'].get('TEST', {}).get('MIRROR')
+
+
+@skipUnless(SEPARATE_REPLICA, "needs a 'replica' database that does not mirror the default one")
+@override_settings(QUIZ_READ_REPLICA='replica')
+class ReplicaRoutingTests(TransactionTestCase):
+    """Read-only views read from the replica, except after the client wrote or while the replica is down"""
+    databases = {'default', 'replica'} if SEPARATE_REPLICA else {'default'}
+
+    def setUp(self):
+        reset_caches()
+        routing._unavailable_until.clear()
+        # The two databases disagree, so every read shows where it came from
+        Category.objects.using('default').create(name='primary')
+        Category.objects.using('replica').create(name='replica')
+
+        @routing.read_from_replica
+        def category_view(request):
+            return HttpResponse(Category.objects.get().name)
+
+        self.view = category_view
+        self.request = RequestFactory().get('/')
+
+    def test_reads_follow_the_routing(self):
+        self.assertEqual(self.view(self.request).content, b'replica')
+        # Undecorated code keeps reading from the primary
+        self.assertEqual(Category.objects.get().name, 'primary')
+
+        self.request.COOKIES[routing.PIN_COOKIE] = '1'
+        self.assertEqual(self.view(self.request).content, b'primary')
+
+    def test_request_reads_its_own_writes(self):
+        @routing.read_from_replica
+        def write_then_read(request):
+            category = Category.objects.get()
+            category.description = 'edited'
+            category.save()
+            return HttpResponse(Category.objects.get().description)
+
+        self.assertEqual(write_then_read(self.request).content, b'edited')
+        # The object read from the replica was saved to the primary
+        self.assertEqual(Category.objects.using('default').get().description, 'edited')
+        self.assertEqual(Category.objects.using('replica').get().description, '')
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        middleware = routing.ReplicaPinMiddleware(lambda request: HttpResponse(Category.objects.count()))
+        self.assertNotIn(routing.PIN_COOKIE, middleware(self.request).cookies)
+
+        middleware = routing.ReplicaPinMiddleware(
+            lambda request: HttpResponse(Category.objects.create(name='new').pk)
+        )
+        response = middleware(self.request)
+        self.assertEqual(response.cookies[routing.PIN_COOKIE]['max-age'], settings.QUIZ_REPLICA_PIN_SECONDS)
+
+    def test_unavailable_replica_falls_back_to_the_primary(self):
+        replica = connections['replica']
+        replica.close()
+        with mock.patch.object(replica, 'ensure_connection', side_effect=OperationalError('down')) as connect:
+            self.assertEqual(self.view(self.request).content, b'primary')
+            # Skipped without another connection attempt until the retry window passes
+            self.assertEqual(self.view(self.request).content, b'primary')
+        self.assertEqual(connect.call_count, 1)
+
+    def test_routed_views_read_from_the_replica(self):
+        user = User.objects.using('replica').create(username='lagging')
+        Leaderboard.objects.using('replica').create(user=user, score=42)
+
+        response = self.client.get(reverse('leaderboard'))
+        self.assertContains(response, 'lagging')
+
+        self.client.cookies[routing.PIN_COOKIE] = '1'
+        response = self.client.get(reverse('leaderboard'))
+        self.assertNotContains(response, 'lagging')
+
+
+@skipUnless(SEPARATE_REPLICA, "needs a 'replica' database that does not mirror the default one")
+@override_settings(QUIZ_READ_REPLICA='replica', QUIZ_JOBS_EAGER=True,
+                   PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ReplicaViewPathTests(TransactionTestCase):
+    """Every view path works with reads routed to a separate replica that holds a copy of the primary"""
+    databases = {'default', 'replica'} if SEPARATE_REPLICA else {'default'}
+
+    # Views wrapped in read_from_replica
+    ROUTED = {'index', 'result', 'review_quiz', 'progress', 'leaderboard', 'leaderboard:week', 'leaderboard:month',
+              'export_results', 'export_results:all'}
+
+    def setUp(self):
+        reset_caches()
+        routing._unavailable_until.clear()
+
+    def replicate(self):
+        """Copy every row of the primary into the replica, as replication would"""
+        rows = connections['default'].creation.serialize_db_to_string()
+        replica = connections['replica']
+        # Saved with an explicit alias: the router sends every write to the primary
+        with transaction.atomic(using='replica'), replica.constraint_checks_disabled():
+            for obj in serializers.deserialize('json', rows, using='replica'):
+                obj.save(using='replica')
+
+    def test_every_view_path_reads_from_the_replica(self):
+        ScaleSeeder(seed=5).seed(**ScaleSeedTests.SIZES)
+        command = bench_views.Command()
+        command.staff = User.objects.create_user('bench-staff', password='bench-pass', is_staff=True, is_superuser=True)
+        command.member = User.objects.create_user('bench-member', password='bench-pass')
+        command.member_result = command.submit_quiz(command.new_client(command.member))
+        schedule_daily_questions()
+        self.replicate()
+
+        for scenario in command.scenarios():
+            replica_reads = metrics.QueryRecorder()
+            with connections['replica'].execute_wrapper(replica_reads):
+                report = command.measure(scenario, warmup=0, repeat=1)
+            self.assertLess(report['status'], 400, report['name'])
+            if scenario['name'] in self.ROUTED:
+                self.assertGreater(replica_reads.count, 0, report['name'])
@@ -24,6 +24,7 @@ urlpatterns = [
     # Quiz URLs
     path('quiz/', views.quiz, name='quiz'),
     path('result/<int:result_id>/', views.result, name='result'),
+    path('result/<int:result_id>/achievements/', views.result_achievements, name='result_achievements'),
     path('review/<int:result_id>/', views.review_quiz, name='review_quiz'),
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('add-question/', views.add_question, name='add_question'),
@@ -32,4 +33,7 @@ urlpatterns = [
     path('custom-quiz/', views.create_custom_quiz, name='custom_quiz'),
     path('daily-question/', views.question_of_the_day, name='daily_question'),
     path('export-results/', views.export_results, name='export_results'),
+
+    # Monitoring
+    path('metrics', views.metrics, name='metrics'),
 ]
\ No newline at end of file
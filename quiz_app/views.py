@@ -1,34 +1,49 @@
-from .models import Question, UserProgress, UserAnswer, Category, Leaderboard, Achievement, UserAchievement, DailyQuestion,QuizResult
+from .models import Question, UserProgress, UserAnswer, Category, Leaderboard, UserAchievement, QuizResult, EffortRecommendation, BackgroundJob
 from .forms import NewUserForm, QuestionForm, CustomQuizForm
-from .ml_utils import calculate_effort_recommendation, enhanced_effort_recommendation, check_achievements, get_weak_categories
+from .achievements import ANSWER_RECORDED, DAILY_ANSWERED, evaluate as evaluate_achievements
+from .sampling import sample_questions
+from .adaptive import adaptive_questions
+from .question_cache import get_questions
+from .fragments import quiz_items
+from .pages import static_pages
+from .daily import get_daily_question
+from .attempts import start_attempt, get_active_attempt, claim_attempt, attach_result
+from .ranking import PERIODS, board, board_page, page_around
+from .jobs import enqueue
+from .stats import record_answers, record_quiz_stats
+from .counters import get_counters
+from .metrics import registry as metrics_registry
+from .routing import read_from_replica
+from .exports import stream_csv, result_rows, answer_rows, filter_results, filter_answers
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.http import JsonResponse, HttpResponse, HttpResponseRedirect
+from django.http import JsonResponse, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.core.exceptions import PermissionDenied
+from django.utils.dateparse import parse_date
 from django.utils import timezone
-from django.db.models import Count, Q, F
-from django.utils import timezone
-from django.contrib.auth.models import User
-from .models import UserProgress
+from django.db import transaction
+from django.db.models import Q, F, FilteredRelation
 from django.urls import reverse
+from django.utils.http import urlencode
 from django.contrib import messages
-import random
-import time
-import csv
+from datetime import datetime, timedelta
 
 
 def is_admin(user):
     return user.is_staff
 
+def day_bounds(day):
+    """Half-open [start, end) datetime range for a date, so lookups can use an index"""
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    return start, start + timedelta(days=1)
+
 def register(request):
     if request.method == "POST":
         form = NewUserForm(request.POST)
         if form.is_valid():
             user = form.save()
             login(request, user)
-            # Create user progress record (should be handled by signals, but just in case)
-            UserProgress.objects.get_or_create(user=user)
-            Leaderboard.objects.get_or_create(user=user)
             return redirect("index")
         else:
             return render(request, "registration/register.html", {"form": form})
@@ -51,46 +66,49 @@ def logout_view(request):
     logout(request)
     return redirect('index')
 
+# index, result, progress_dashboard and leaderboard are deliberately sync.
+# Their reads are short indexed lookups, and on Django 5.2 the async ORM runs
+# gathered queries one at a time on the request's thread anyway: as async
+# views they served 0.70-0.94x the WSGI throughput in bench_asgi.
+@read_from_replica
 def index(request):
-    # Get daily question
-    today = timezone.now().date()
-    daily_question = DailyQuestion.objects.filter(date=today).first()
+    # Get daily question from its per-day cache entry
+    daily_question = get_daily_question()
     
     # Get leaderboard top 5
-    leaders = Leaderboard.objects.all()[:5]
+    leaders = Leaderboard.objects.select_related('user')[:5]
     
     # Get categories for filter
     categories = Category.objects.all()
     
-    # Get statistics for the homepage
-    total_questions = Question.objects.count()
-    total_users = User.objects.count()
-    total_quizzes = QuizResult.objects.count()
+    # Get statistics for the homepage from the cached site counters
+    site_counters = get_counters()
     
     return render(request, 'index.html', {
         'daily_question': daily_question,
         'leaders': leaders,
         'categories': categories,
-        'total_questions': total_questions,
-        'total_users': total_users,
-        'total_quizzes': total_quizzes,
+        'total_questions': site_counters['questions'],
+        'total_users': site_counters['users'],
+        'total_quizzes': site_counters['quizzes'],
     })
 
 @login_required
 def quiz(request):
     if request.method == 'POST':
-        # Process quiz results
+        # The attempt carries the drawn questions and the server-side start time
+        attempt = get_active_attempt(request.POST.get('attempt'), request.user)
+        if attempt is None:
+            messages.error(request, 'This quiz has expired or was already submitted.')
+            return redirect('index')
+        
         score = 0
         answers = request.POST
-        start_time = float(request.POST.get('start_time', time.time()))
-        time_taken = round(time.time() - start_time, 2)
-        
-        # Get quiz type
-        quiz_type = request.session.get('quiz_type', 'standard')
+        time_taken = round((timezone.now() - attempt.started_at).total_seconds(), 2)
+        quiz_type = attempt.quiz_type
         
-        # Get all questions from session
-        question_ids = request.session.get('quiz_questions', [])
-        questions = Question.objects.filter(id__in=question_ids)
+        # Grading reads cached correct options, checked against the current bank version
+        questions = get_questions(attempt.question_id_list, fresh=True)
         
         user_answers = []
         for question in questions:
@@ -103,92 +121,80 @@ def quiz(request):
                 # Save user answer
                 user_answers.append(UserAnswer(
                     user=request.user,
-                    question=question,
+                    question_id=question.id,
                     selected_option=int(user_answer),
                     is_correct=is_correct
                 ))
         
-        # Bulk create user answers
-        UserAnswer.objects.bulk_create(user_answers)
-        
-        # Save result
         total_questions = len(questions)
-        quiz_result = QuizResult.objects.create(
-            user=request.user,
-            score=score,
-            total_questions=total_questions,
-            time_taken=time_taken,
-            quiz_type=quiz_type
-        )
-        
-        # Update user progress
-        user_progress, created = UserProgress.objects.get_or_create(user=request.user)
-        user_progress.update_stats(score, total_questions)
-        
-        # Update leaderboard
-        leaderboard, created = Leaderboard.objects.get_or_create(user=request.user)
-        leaderboard.score = user_progress.correct_answers
-        leaderboard.save()
-        
-        # Update ranks
-        update_leaderboard_ranks()
-        
-        # Check for new achievements
-        new_achievements = check_achievements(request.user)
-        if new_achievements:
-            request.session['new_achievements'] = [achievement.name for achievement in new_achievements]
-        
-        # Clear session data
-        for key in ['quiz_questions', 'quiz_type', 'quiz_start_time']:
-            if key in request.session:
-                del request.session[key]
+        with transaction.atomic():
+            if not claim_attempt(attempt):
+                messages.error(request, 'This quiz was already submitted.')
+                return redirect('index')
+            
+            # Save result
+            quiz_result = QuizResult.objects.create(
+                user=request.user,
+                score=score,
+                total_questions=total_questions,
+                time_taken=time_taken,
+                quiz_type=quiz_type
+            )
+            attach_result(attempt, quiz_result)
+            
+            # Bulk create user answers linked to this attempt and fold them into category stats
+            for user_answer in user_answers:
+                user_answer.quiz_result = quiz_result
+            UserAnswer.objects.bulk_create(user_answers)
+            record_answers(request.user, user_answers, {question.id: question.category_id for question in questions})
+            
+            # Progress, leaderboard and achievements are updated in the background
+            enqueue('quiz_submitted', request.user, f'quiz_submitted:{quiz_result.id}', {
+                'score': score,
+                'total_questions': total_questions,
+            })
             
         return redirect('result', result_id=quiz_result.id)
     
     else:
         # Check if custom quiz
         quiz_type = request.GET.get('type', 'standard')
-        request.session['quiz_type'] = quiz_type
         
         if quiz_type == 'custom':
-            # Get custom quiz parameters from session
-            custom_params = request.session.get('custom_quiz_params', {})
-            categories = custom_params.get('categories', [])
-            difficulty = custom_params.get('difficulty', 'all')
-            question_count = custom_params.get('question_count', 20)
+            # Custom quiz parameters come in the query string from create_custom_quiz
+            form = CustomQuizForm(request.GET)
+            if not form.is_valid():
+                return redirect('custom_quiz')
+            categories = [category.id for category in form.cleaned_data['categories']]
             
-            # Build query
-            questions = Question.objects.all()
-            if categories:
-                questions = questions.filter(category__id__in=categories)
-            if difficulty != 'all':
-                questions = questions.filter(difficulty=difficulty)
-                
-            questions = list(questions)
-            if len(questions) > question_count:
-                questions = random.sample(questions, question_count)
+            # Draw from the in-memory ID index, then fetch only those rows
+            questions = sample_questions(
+                form.cleaned_data['question_count'],
+                categories=categories,
+                difficulty=form.cleaned_data['difficulty'],
+            )
                 
         elif quiz_type == 'daily':
             # Get today's daily question
-            today = timezone.now().date()
-            daily_question = DailyQuestion.objects.filter(date=today).first()
-            questions = [daily_question.question] if daily_question else []
+            daily_question = get_daily_question()
+            questions = [daily_question] if daily_question else []
+            
+        elif quiz_type == 'adaptive':
+            # 100 questions weighted toward the user's weak categories and difficulties
+            questions = adaptive_questions(request.user, 100)
             
         else:  # Standard quiz
+            quiz_type = 'standard'
             # Get 100 random questions
-            all_questions = list(Question.objects.all())
-            if len(all_questions) > 100:
-                questions = random.sample(all_questions, 100)
-            else:
-                questions = all_questions
+            questions = sample_questions(100)
                 
-        # Store question IDs in session
-        request.session['quiz_questions'] = [q.id for q in questions]
-        request.session['quiz_start_time'] = time.time()
+        # One INSERT records the drawn questions; the session is not touched
+        attempt = start_attempt(request.user, quiz_type, [q.id for q in questions])
         
+        # Options blocks come from the fragment cache; only the numbered shell renders per request
         return render(request, 'quiz.html', {
-            'questions': questions, 
-            'start_time': time.time(),
+            'quiz_items': quiz_items(questions),
+            'attempt': attempt,
             'quiz_type': quiz_type
         })
 
@@ -204,15 +210,16 @@ def create_custom_quiz(request):
             difficulty = form.cleaned_data['difficulty']
             question_count = form.cleaned_data['question_count']
             
-            # Store parameters in session
-            request.session['custom_quiz_params'] = {
+            # Pass parameters in the query string rather than the session
+            params = urlencode({
+                'type': 'custom',
                 'categories': [cat.id for cat in selected_categories],
                 'difficulty': difficulty,
                 'question_count': question_count
-            }
+            }, doseq=True)
             
             # Redirect to quiz page with custom type parameter
-            return redirect(f'{reverse("quiz")}?type=custom')
+            return redirect(f'{reverse("quiz")}?{params}')
         else:
             # Form is invalid, show errors
             messages.error(request, 'Please correct the errors below.')
@@ -225,35 +232,82 @@ def create_custom_quiz(request):
 
 
 @login_required
+@read_from_replica
 def result(request, result_id):
     result = get_object_or_404(QuizResult, id=result_id, user=request.user)
-    user_progress = UserProgress.objects.get(user=request.user)
-    effort_recommendation = enhanced_effort_recommendation(request.user)
+    
+    # The submission job has usually finished by the time the redirect lands;
+    # if not, the page fetches the achievements it unlocks once it has
+    job = BackgroundJob.objects.filter(key=submission_job_key(result)).values('status', 'result').first()
+    # Precomputed by the batch scorer and refreshed by the submission job
+    recommendation = EffortRecommendation.objects.filter(user=request.user).first()
+    if recommendation:
+        effort_recommendation = recommendation.message()
+    else:
+        effort_recommendation = "Complete a few more quizzes to get personalized recommendations."
     
     # Get new achievements if any
-    new_achievements = request.session.pop('new_achievements', [])
+    new_achievements = job_achievements(job)
+    pending = job is not None and job['status'] in ('pending', 'running')
     
     return render(request, 'result.html', {
         'result': result,
         'effort_recommendation': effort_recommendation,
-        'new_achievements': new_achievements
+        'new_achievements': new_achievements,
+        'achievements_url': reverse('result_achievements', kwargs={'result_id': result.id}) if pending else None,
     })
 
+def submission_job_key(result):
+    return f'quiz_submitted:{result.id}'
+
+def job_achievements(job):
+    """Names of the achievements a finished submission job unlocked"""
+    if job is None or job['status'] != 'done':
+        return []
+    return (job['result'] or {}).get('new_achievements', [])
+
 @login_required
+def result_achievements(request, result_id):
+    """Polled by the result page while the submission job is still running"""
+    result = get_object_or_404(QuizResult.objects.only('id'), id=result_id, user=request.user)
+    job = BackgroundJob.objects.filter(key=submission_job_key(result)).values('status', 'result').first()
+    return JsonResponse({
+        'status': job['status'] if job else 'missing',
+        'new_achievements': job_achievements(job),
+    })
+
+@login_required
+@read_from_replica
 def review_quiz(request, result_id):
-    result = get_object_or_404(QuizResult, id=result_id, user=request.user)
-    
-    # Get questions and user answers for this quiz
-    questions = Question.objects.filter(id__in=request.session.get('review_questions', []))
+    result = get_object_or_404(QuizResult.objects.select_related('quizattempt'), id=result_id, user=request.user)
+    attempt = getattr(result, 'quizattempt', None)
     user_answers = {}
     
-    for question in questions:
-        user_answer = UserAnswer.objects.filter(
-            user=request.user, 
-            question=question,
-            answered_at__date=result.completed_at.date()
-        ).first()
-        if user_answer:
+    if attempt is not None:
+        # Every question the attempt drew, in quiz order, with this attempt's
+        # answer left-joined so unanswered questions are listed too
+        question_ids = attempt.question_id_list
+        rows = Question.objects.filter(id__in=question_ids).annotate(
+            answer=FilteredRelation('useranswer', condition=Q(useranswer__quiz_result=result)),
+            answer_option=F('answer__selected_option'),
+            answer_is_correct=F('answer__is_correct'),
+        )
+        by_id = {question.id: question for question in rows}
+        questions = [by_id[pk] for pk in question_ids if pk in by_id]
+        for question in questions:
+            if question.answer_option is not None:
+                user_answers[question.id] = {
+                    'selected_option': question.answer_option,
+                    'is_correct': question.answer_is_correct
+                }
+            question.user_answer = user_answers.get(question.id)
+    else:
+        # Results from before attempts were stored: only the saved answers are known
+        questions = []
+        for user_answer in result.answers.select_related('question').order_by('id'):
+            question = user_answer.question
+            question.user_answer = user_answer
+            questions.append(question)
             user_answers[question.id] = {
                 'selected_option': user_answer.selected_option,
                 'is_correct': user_answer.is_correct
@@ -267,14 +321,12 @@ def review_quiz(request, result_id):
 
 @user_passes_test(is_admin)
 def admin_dashboard(request):
-    total_questions = Question.objects.count()
-    total_users = User.objects.count()
-    total_quizzes = QuizResult.objects.count()
+    site_counters = get_counters()
     
     return render(request, 'admin_dashboard.html', {
-        'total_questions': total_questions,
-        'total_users': total_users,
-        'total_quizzes': total_quizzes
+        'total_questions': site_counters['questions'],
+        'total_users': site_counters['users'],
+        'total_quizzes': site_counters['quizzes']
     })
 
 @user_passes_test(is_admin)
@@ -290,25 +342,24 @@ def add_question(request):
     return render(request, 'add_question.html', {'form': form})
 
 @login_required
+@read_from_replica
 def progress_dashboard(request):
-    # Get or create user progress
-    user_progress, created = UserProgress.objects.get_or_create(user=request.user)
+    # Progress is created with the first graded answer; until then show zeros
+    user_progress = UserProgress.objects.filter(user=request.user).first() or UserProgress(user=request.user)
     
     quiz_results = QuizResult.objects.filter(user=request.user).order_by('-completed_at')[:10]
     
-    # Category performance
-    categories = Category.objects.all()
+    # Category performance, read from the per-category stats rollup
+    categories = Category.objects.annotate(
+        stats=FilteredRelation('usercategorystats', condition=Q(usercategorystats__user=request.user)),
+        attempted=F('stats__attempted'),
+        correct=F('stats__correct'),
+    )
+    
     category_performance = []
     for category in categories:
-        correct = UserAnswer.objects.filter(
-            user=request.user, 
-            question__category=category, 
-            is_correct=True
-        ).count()
-        total = UserAnswer.objects.filter(
-            user=request.user, 
-            question__category=category
-        ).count()
+        correct = category.correct or 0
+        total = category.attempted or 0
         accuracy = (correct / total * 100) if total > 0 else 0
         category_performance.append({
             'category': category,
@@ -326,92 +377,153 @@ def progress_dashboard(request):
         'achievements': achievements
     })
 
+LEADERBOARD_TABS = [('all', 'All Time'), ('month', 'This Month'), ('week', 'This Week'), ('day', 'Today')]
+
+
+@read_from_replica
 def leaderboard(request):
-    leaders = Leaderboard.objects.all()[:20]
+    period = request.GET.get('period', 'all')
+    if period not in PERIODS:
+        period = 'all'
+    rows = board(period)
+    user = request.user
+    
+    # Keyset pages: a cursor names the row a page continues from
+    page = None
+    not_on_board = False
+    if request.GET.get('around') == 'me' and user.is_authenticated:
+        page = page_around(rows, user)
+        not_on_board = page is None
+    if page is None:
+        page = board_page(rows, after=request.GET.get('after'), before=request.GET.get('before'))
     
-    # Add rank numbers
-    for i, leader in enumerate(leaders):
-        leader.rank = i + 1
+    def page_url(**params):
+        if period != 'all':
+            params['period'] = period
+        return f'{reverse("leaderboard")}?{urlencode(params)}' if params else reverse('leaderboard')
     
-    return render(request, 'leaderboard.html', {'leaders': leaders})
+    return render(request, 'leaderboard.html', {
+        'user': user,
+        'leaders': page.entries,
+        'user_rank': next((leader.position for leader in page.entries if leader.user_id == user.pk), None),
+        'not_on_board': not_on_board,
+        'period': period,
+        'period_tabs': LEADERBOARD_TABS,
+        'previous_url': page_url(before=page.previous_cursor) if page.previous_cursor else None,
+        'next_url': page_url(after=page.next_cursor) if page.next_cursor else None,
+        'around_url': page_url(around='me'),
+    })
 
 @login_required
 def question_of_the_day(request):
     today = timezone.now().date()
     
-    # Get or create today's question
-    daily_question, created = DailyQuestion.objects.get_or_create(
-        date=today,
-        defaults={'question': Question.objects.order_by('?').first()}
-    )
+    # Today's question comes from the precomputed schedule via the per-day cache
+    question = get_daily_question(today)
+    if question is None:
+        messages.error(request, 'There is no question of the day yet.')
+        return redirect('index')
     
     if request.method == 'POST':
         selected_option = int(request.POST.get('answer'))
-        is_correct = (selected_option == daily_question.question.correct_option)
+        is_correct = (selected_option == question.correct_option)
         
         # Record answer
-        UserAnswer.objects.create(
-            user=request.user,
-            question=daily_question.question,
-            selected_option=selected_option,
-            is_correct=is_correct
-        )
+        with transaction.atomic():
+            user_answer = UserAnswer.objects.create(
+                user=request.user,
+                question_id=question.id,
+                selected_option=selected_option,
+                is_correct=is_correct
+            )
+            record_answers(request.user, [user_answer], {question.id: question.category_id})
+        
+        # Update user progress and leaderboard score
+        user_progress = record_quiz_stats(request.user, 1 if is_correct else 0, 1)
         
-        # Update user progress
-        user_progress, created = UserProgress.objects.get_or_create(user=request.user)
-        user_progress.update_stats(1 if is_correct else 0, 1)
+        # Check for new achievements
+        new_achievements = evaluate_achievements(request.user, [DAILY_ANSWERED, ANSWER_RECORDED], user_progress=user_progress)
         
         return render(request, 'daily_question_result.html', {
+            'new_achievements': [achievement.name for achievement in new_achievements],
             'is_correct': is_correct,
-            'correct_option': daily_question.question.correct_option,
-            'explanation': daily_question.question.explanation,
-            'question': daily_question.question
+            'correct_option': question.correct_option,
+            'explanation': question.explanation,
+            'question': question
         })
     
     # Check if user already answered today's question
+    day_start, day_end = day_bounds(today)
     already_answered = UserAnswer.objects.filter(
         user=request.user,
-        question=daily_question.question,
-        answered_at__date=today
+        question_id=question.id,
+        answered_at__gte=day_start,
+        answered_at__lt=day_end
     ).exists()
     
     return render(request, 'daily_question.html', {
-        'question': daily_question.question,
+        'question': question,
         'already_answered': already_answered
     })
 
 @login_required
+@read_from_replica
 def export_results(request):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="quizmaster_results.csv"'
+    """
+    Stream quiz results as CSV. Staff can pass scope=all to export every
+    user's results (kind=results) or answers (kind=answers), optionally
+    filtered by start/end date (YYYY-MM-DD, inclusive) and category ID.
+    """
+    if request.GET.get('scope') != 'all':
+        results = QuizResult.objects.filter(user=request.user)
+        rows = stream_csv(
+            ['Date', 'Score', 'Total Questions', 'Percentage', 'Time Taken', 'Quiz Type'],
+            result_rows(results),
+        )
+        return csv_response(rows, 'quizmaster_results.csv')
+    
+    if not request.user.is_staff:
+        raise PermissionDenied
     
-    writer = csv.writer(response)
-    writer.writerow(['Date', 'Score', 'Total Questions', 'Percentage', 'Time Taken', 'Quiz Type'])
+    try:
+        start = parse_date(request.GET.get('start') or '')
+        end = parse_date(request.GET.get('end') or '')
+        category_id = int(request.GET['category']) if request.GET.get('category') else None
+    except ValueError:
+        return HttpResponseBadRequest("Invalid start, end or category")
+    if (request.GET.get('start') and not start) or (request.GET.get('end') and not end):
+        return HttpResponseBadRequest("Dates must be YYYY-MM-DD")
     
-    results = QuizResult.objects.filter(user=request.user).order_by('-completed_at')
-    for result in results:
-        writer.writerow([
-            result.completed_at.strftime('%Y-%m-%d %H:%M'),
-            result.score,
-            result.total_questions,
-            f"{result.percentage()}%",
-            f"{result.time_taken}s",
-            result.get_quiz_type_display()
-        ])
+    # Turn inclusive dates into a half-open datetime range
+    start = day_bounds(start)[0] if start else None
+    end = day_bounds(end)[1] if end else None
     
+    if request.GET.get('kind') == 'answers':
+        answers = filter_answers(UserAnswer.objects.all(), start, end, category_id)
+        rows = stream_csv(
+            ['Username', 'Answered At', 'Quiz Result', 'Question', 'Category', 'Selected Option', 'Correct'],
+            answer_rows(answers),
+        )
+        return csv_response(rows, 'quizmaster_all_answers.csv')
+    
+    results = filter_results(QuizResult.objects.all(), start, end, category_id)
+    rows = stream_csv(
+        ['Username', 'Date', 'Score', 'Total Questions', 'Percentage', 'Time Taken', 'Quiz Type'],
+        result_rows(results, include_username=True),
+    )
+    return csv_response(rows, 'quizmaster_all_results.csv')
+
+def csv_response(rows, filename):
+    response = StreamingHttpResponse(rows, content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
 
-def update_leaderboard_ranks():
-    # Update all leaderboard ranks based on score and last updated time
-    leaders = Leaderboard.objects.all().order_by('-score', 'updated_at')
-    
-    for rank, leader in enumerate(leaders, start=1):
-        if leader.rank != rank:
-            leader.rank = rank
-            leader.save()
+@user_passes_test(is_admin)
+def metrics(request):
+    return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 def about(request):
-    return render(request, 'about.html')
+    return static_pages.render(request, 'about.html')
 
 def contact(request):
     if request.method == 'POST':
@@ -427,10 +539,10 @@ def contact(request):
     return render(request, 'contact.html')
 
 def Terms_and_Conditions(request):
-    return render(request, 'terms_and_conditions.html')
+    return static_pages.render(request, 'Terms_and_Conditions.html')
 
 def Privacy_policy(request):
-    return render(request, 'privacy_policy.html')
+    return static_pages.render(request, 'Privacy_policy.html')
 
 def Terms_of_service(request):
-    return render(request,'Terms_of_service.html')
\ No newline at end of file
+    return static_pages.render(request, 'Terms_of_service.html')
\ No newline at end of file
@@ -58,8 +58,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'quiz_app.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'quiz_app.routing.ReplicaPinMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -73,8 +75,14 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept per process; the quiz page renders one partial per question
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -114,6 +122,26 @@ DATABASES = {
     }
 }
 
+# Optional read replica of the default database. Views decorated with
+# read_from_replica send their reads here (see quiz_app/routing.py).
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        # Tests run against the primary's test database
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['quiz_app.routing.ReplicaRouter']
+QUIZ_READ_REPLICA = 'replica' if 'replica' in DATABASES else None
+
+# How long a client reads from the primary after a request that wrote
+QUIZ_REPLICA_PIN_SECONDS = int(os.getenv('QUIZ_REPLICA_PIN_SECONDS', '10'))
+
+# How long an unreachable replica is skipped before it is tried again
+QUIZ_REPLICA_RETRY_SECONDS = int(os.getenv('QUIZ_REPLICA_RETRY_SECONDS', '30'))
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -161,4 +189,33 @@ EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
-EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
\ No newline at end of file
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+
+# Background jobs (progress, leaderboard and achievement updates)
+QUIZ_JOBS_WORKERS = int(os.getenv('QUIZ_JOBS_WORKERS', '4'))
+QUIZ_JOBS_EAGER = os.getenv('QUIZ_JOBS_EAGER', '') == 'True'
+
+# Shared cache for question payloads, rendered fragments, attempts and site
+# totals. The default is per process; correctness does not depend on it being
+# shared, since the question bank version lives in the database.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Seconds a process trusts its last read of the question bank version
+QUIZ_BANK_VERSION_TTL = float(os.getenv('QUIZ_BANK_VERSION_TTL', '2'))
+
+# Upper bound on question payloads held in each process's local cache
+QUESTION_CACHE_MAX_ENTRIES = int(os.getenv('QUESTION_CACHE_MAX_ENTRIES', '5000'))
+
+# Seconds an unsubmitted quiz attempt stays valid
+QUIZ_ATTEMPT_TTL = int(os.getenv('QUIZ_ATTEMPT_TTL', str(6 * 60 * 60)))
+
+# Where train_effort_model saves the fitted effort-recommendation model
+QUIZ_EFFORT_MODEL_PATH = os.getenv('QUIZ_EFFORT_MODEL_PATH', str(BASE_DIR / 'effort_model.joblib'))
+
+# Parameters and cursor that calibrate_questions resumes from
+QUIZ_CALIBRATION_CHECKPOINT = os.getenv('QUIZ_CALIBRATION_CHECKPOINT', str(BASE_DIR / 'calibration.npz'))